@@ -1,11 +1,26 @@
-from .ai_manager import AIManager
-from .comment_manager import CommentManager
-from .note_manager import NoteManager
-from .publish_manager import PublishManager
-
-__all__ = [
-    'AIManager',
-    'CommentManager', 
-    'NoteManager',
-    'PublishManager'
-]
\ No newline at end of file
+"""业务模块（按需导入：只用 AIManager 的脚本不会加载 selenium）"""
+import importlib
+from typing import Any, List
+
+_LAZY_ATTRS = {
+    'AIManager': 'business.ai_manager',
+    'CommentManager': 'business.comment_manager',
+    'NoteManager': 'business.note_manager',
+    'PublishManager': 'business.publish_manager',
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str) -> Any:
+    """首次访问时导入子模块并缓存到包命名空间"""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -4,14 +4,24 @@
 支持多种风格：小仙女、逆天言论、引战、250风格等。
 """
 
-from typing import Optional, List
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Awaitable, List, Optional, TypeVar
 
-from core import BaseAIClient, AIClientFactory
-from core.exceptions import XHSException
+from core.ai_client import AIClientFactory, BaseAIClient, amap
+from core.ai_cache import no_cache
+from core.ai_usage import usage_scope
+from core.config import config
+from core.exceptions import TokenBudgetExceeded, XHSException
 from core.logger import logger
+from core.tracing import tracer
 from core.models import Comment
 from .xhs_content_styles import ContentStyleFactory
 
+T = TypeVar("T")
+
 
 class AIManager:
     """AI 管理器 - 负责生成小红书风格文案和智能评论回复
@@ -38,10 +48,12 @@ class AIManager:
                 raise ValueError("客户端必须是 BaseAIClient 的实例")
             self.client = client
         else:
-            self.client = AIClientFactory.create_client(client_type)
+            # 复用进程内已创建的同类型客户端，共享已建立的连接
+            self.client = AIClientFactory.get_client(client_type)
 
         logger.info(f" AI 管理器初始化成功 - 客户端: {self.client.get_client_info()}")
 
+    @tracer.traced("AIManager.generate_xiaohongshu_post", category="workflow")
     def generate_xiaohongshu_post(
             self,
             topic: str = None,
@@ -64,36 +76,75 @@ class AIManager:
             
         Raises:
             XHSException: AI 客户端不可用或生成失败
+            TokenBudgetExceeded: token 预算已用尽
             ValueError: 不支持的风格类型
         """
-        if not self.client.is_available():
-            raise XHSException("AI 客户端不可用，请检查配置")
+        system_prompt, user_prompt = self._prepare_post_prompts(topic, style, word_count)
 
-        # 使用策略模式获取内容风格
         try:
-            content_style = ContentStyleFactory.create_style(style)
-        except ValueError as e:
-            raise ValueError(f"不支持的风格: {style}") from e
+            # 随机主题依赖每次生成的多样性，不使用响应缓存
+            with usage_scope("generate_xiaohongshu_post", style=style), \
+                    no_cache() if topic is None else nullcontext():
+                content = self.client.generate_text(
+                    prompt=user_prompt,
+                    system_prompt=system_prompt,
+                    temperature=0.9  # 高温度增加创意性
+                )
 
-        system_prompt = content_style.get_system_prompt()
-        user_prompt = content_style.get_user_prompt(topic, word_count)
+            logger.info(f" 文案生成成功，长度: {len(content)} 字")
+            return content
 
-        logger.info(f"开始生成小红书文案 - 风格: {style}, 主题: {topic or '随机'}")
+        except TokenBudgetExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"文案生成失败: {e}")
+            raise XHSException(f"文案生成失败: {e}")
+
+    @tracer.traced("AIManager.agenerate_xiaohongshu_post", category="workflow")
+    async def agenerate_xiaohongshu_post(
+            self,
+            topic: str = None,
+            style: str = "fairy",
+            word_count: int = 100
+    ) -> str:
+        """异步生成小红书风格短文，参数同 generate_xiaohongshu_post"""
+        system_prompt, user_prompt = self._prepare_post_prompts(topic, style, word_count)
 
         try:
-            content = self.client.generate_text(
-                prompt=user_prompt,
-                system_prompt=system_prompt,
-                temperature=0.9  # 高温度增加创意性
-            )
+            with usage_scope("generate_xiaohongshu_post", style=style), \
+                    no_cache() if topic is None else nullcontext():
+                content = await self.client.agenerate_text(
+                    prompt=user_prompt,
+                    system_prompt=system_prompt,
+                    temperature=0.9
+                )
 
             logger.info(f" 文案生成成功，长度: {len(content)} 字")
             return content
 
+        except TokenBudgetExceeded:
+            raise
         except Exception as e:
             logger.error(f"文案生成失败: {e}")
             raise XHSException(f"文案生成失败: {e}")
 
+    def _prepare_post_prompts(self, topic: Optional[str], style: str, word_count: int):
+        """校验客户端和风格，返回 (系统提示词, 用户提示词)"""
+        if not self.client.is_available():
+            raise XHSException("AI 客户端不可用，请检查配置")
+
+        # 使用策略模式获取内容风格
+        try:
+            content_style = ContentStyleFactory.create_style(style)
+        except ValueError as e:
+            raise ValueError(f"不支持的风格: {style}") from e
+
+        logger.info(f"开始生成小红书文案 - 风格: {style}, 主题: {topic or '随机'}")
+        tracer.annotate(style=style, topic=topic)
+
+        return content_style.get_system_prompt(), content_style.get_user_prompt(topic, word_count)
+
+    @tracer.traced("AIManager.generate_comment_reply", category="workflow")
     def generate_comment_reply(
             self,
             comment: Comment,
@@ -114,29 +165,63 @@ class AIManager:
             
         Raises:
             XHSException: AI 客户端不可用或生成失败
+            TokenBudgetExceeded: token 预算已用尽
         """
-        if not self.client.is_available():
-            raise XHSException("AI 客户端不可用，请检查配置")
+        system_prompt, user_prompt = self._prepare_reply_prompts(comment, style)
 
-        system_prompt = self._get_reply_system_prompt(style)
-        user_prompt = self._get_reply_user_prompt(comment, style)
+        try:
+            with usage_scope("generate_comment_reply", style=style):
+                reply = self.client.generate_text(
+                    prompt=user_prompt,
+                    system_prompt=system_prompt,
+                    temperature=0.8
+                )
 
-        logger.info(f"生成评论回复 - 风格: {style}, 评论: {comment.content[:30]}...")
+            logger.info(f" 回复生成成功: {reply[:50]}...")
+            return reply
+
+        except TokenBudgetExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"回复生成失败: {e}")
+            raise XHSException(f"回复生成失败: {e}")
+
+    @tracer.traced("AIManager.agenerate_comment_reply", category="workflow")
+    async def agenerate_comment_reply(
+            self,
+            comment: Comment,
+            style: str = "aggressive"
+    ) -> str:
+        """异步生成评论回复，参数同 generate_comment_reply"""
+        system_prompt, user_prompt = self._prepare_reply_prompts(comment, style)
 
         try:
-            reply = self.client.generate_text(
-                prompt=user_prompt,
-                system_prompt=system_prompt,
-                temperature=0.8
-            )
+            with usage_scope("generate_comment_reply", style=style):
+                reply = await self.client.agenerate_text(
+                    prompt=user_prompt,
+                    system_prompt=system_prompt,
+                    temperature=0.8
+                )
 
             logger.info(f" 回复生成成功: {reply[:50]}...")
             return reply
 
+        except TokenBudgetExceeded:
+            raise
         except Exception as e:
             logger.error(f"回复生成失败: {e}")
             raise XHSException(f"回复生成失败: {e}")
 
+    def _prepare_reply_prompts(self, comment: Comment, style: str):
+        """校验客户端，返回 (系统提示词, 用户提示词)"""
+        if not self.client.is_available():
+            raise XHSException("AI 客户端不可用，请检查配置")
+
+        logger.info(f"生成评论回复 - 风格: {style}, 评论: {comment.content[:30]}...")
+        tracer.annotate(style=style, comment_id=comment.comment_id)
+
+        return self._get_reply_system_prompt(style), self._get_reply_user_prompt(comment, style)
+
     # ==================== 评论回复 Prompt 模板 ====================
 
     @staticmethod
@@ -197,31 +282,97 @@ class AIManager:
 
     # ==================== 辅助方法 ====================
 
+    def _run_sync(self, coro: Awaitable[T]) -> T:
+        """在新的事件循环中执行协程并等待结果
+
+        结束前释放客户端绑定该事件循环的异步连接池。调用方已处于事件循环中时（asyncio.run 不能嵌套），
+        在工作线程中执行，上下文（截止时间、用量作用域等）一并传入。
+        """
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.client.aclose()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(run())
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="xhs-ai-batch") as executor:
+            return executor.submit(context.run, asyncio.run, run()).result()
+
+    @tracer.traced("AIManager.batch_generate_posts", category="workflow")
     def batch_generate_posts(
             self,
             count: int,
             style: str = "fairy",
-            topics: Optional[List[str]] = None
+            topics: Optional[List[str]] = None,
+            concurrency: Optional[int] = None
     ) -> List[str]:
-        """批量生成文案
+        """批量生成文案（并发请求；已在事件循环中调用时在工作线程中执行，异步代码中建议直接使用 abatch_generate_posts）
         
         Args:
             count: 生成数量
             style: 风格类型
             topics: 主题列表，None 则随机
+            concurrency: 最大并发数，None 则使用 config.ai.max_concurrency
         
         Returns:
-            成功生成的文案列表
+            成功生成的文案列表（保持输入顺序）
         """
+        return self._run_sync(self.abatch_generate_posts(count, style, topics, concurrency))
+
+    async def abatch_generate_posts(
+            self,
+            count: int,
+            style: str = "fairy",
+            topics: Optional[List[str]] = None,
+            concurrency: Optional[int] = None
+    ) -> List[str]:
+        """异步批量生成文案，参数同 batch_generate_posts"""
+        topic_list = [topics[i] if topics and i < len(topics) else None for i in range(count)]
+        results = await amap(
+            lambda topic: self.agenerate_xiaohongshu_post(topic=topic, style=style),
+            topic_list,
+            concurrency or config.ai.max_concurrency
+        )
+
         posts = []
-        for i in range(count):
-            topic = topics[i] if topics and i < len(topics) else None
-            try:
-                post = self.generate_xiaohongshu_post(topic=topic, style=style)
-                posts.append(post)
-                logger.info(f" 已生成第 {i + 1}/{count} 篇文案")
-            except Exception as e:
-                logger.error(f"第 {i + 1} 篇文案生成失败: {e}")
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.error(f"第 {i + 1} 篇文案生成失败: {result}")
                 continue
-
+            posts.append(result)
+        logger.info(f" 批量生成完成: {len(posts)}/{count} 篇")
         return posts
+
+    def batch_generate_replies(
+            self,
+            comments: List[Comment],
+            style: str = "aggressive",
+            concurrency: Optional[int] = None
+    ) -> List[Optional[str]]:
+        """并发为多条评论生成回复
+        
+        Args:
+            comments: 评论列表
+            style: 回复风格
+            concurrency: 最大并发数，None 则使用 config.ai.max_concurrency
+        
+        Returns:
+            与 comments 一一对应的回复，生成失败的位置为 None
+        """
+        results = self._run_sync(amap(
+            lambda comment: self.agenerate_comment_reply(comment, style),
+            comments,
+            concurrency or config.ai.max_concurrency
+        ))
+
+        replies: List[Optional[str]] = []
+        for comment, result in zip(comments, results):
+            if isinstance(result, Exception):
+                logger.error(f"评论 {comment.comment_id} 回复生成失败: {result}")
+                result = None
+            replies.append(result)
+        return replies
@@ -1,18 +1,41 @@
 """评论管理模块"""
 import json
+import logging
 import re
 import time
-from typing import List
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
 
 from core.browser_manager import BrowserManager
-from core.decorators import log_execution
-from core.logger import logger
+from core.config import config
+from core.data_logger import log_record
+from core.decorators import log_execution, with_deadline
+from core.logger import Logger, lazy_json, logger
+from core.metrics import metrics
+from core.models import Comment, NoteInfo
+from core.tracing import tracer
 from utils import CommentParser
 
+COMMENT_PAGES_TOTAL = metrics.counter(
+    "xhs_comment_pages_captured_total", "捕获到的评论接口响应页数", ["phase"]
+)
+COMMENT_BODIES_EVICTED_TOTAL = metrics.counter(
+    "xhs_comment_bodies_evicted_total", "因浏览器缓冲区淘汰而丢失的评论响应体数量", ["phase"]
+)
+SCROLL_CONTAINER_LOOKUPS_TOTAL = metrics.counter(
+    "xhs_scroll_container_lookups_total", "评论滚动容器查找结果（cached 为命中缓存的选择器）", ["result"]
+)
+
+# 可能是评论滚动容器的候选元素
+SCROLL_CONTAINER_CANDIDATES = "div.list-container, div.comment-container, div[class*='comment'], div[class*='scroll']"
+# 每次滚动的距离（像素）与等待滚动停止的最长时间（毫秒）
+SCROLL_STEP_PX = 1200
+SCROLL_SETTLE_MS = 500
+
 
 class CommentManager:
     """评论管理器 - 负责评论相关操作（获取、回复等）"""
@@ -24,7 +47,13 @@ class CommentManager:
             browser_manager: 浏览器管理器实例
         """
         self.browser = browser_manager
+        # 当前打开的帖子（由 XHSClient 在打开帖子后设置），用于回复记录
+        self.current_note: Optional[NoteInfo] = None
+        # 最近一次获取的评论（评论ID -> 评论，含子评论），用于回复记录
+        self._fetched_comments: Dict[str, Comment] = {}
+        self._fetched_note_id: Optional[str] = None
 
+    @tracer.traced("CommentManager.extract_comments", category="parse")
     def _extract_comments_from_response(self, response_body):
         """从响应数据中提取并解析评论列表
         
@@ -37,15 +66,16 @@ class CommentManager:
         try:
             comments = CommentParser.parse_response(response_body)
 
-            # 调试: 打印第一条评论的原始数据
-            if comments:
+            # 调试: 打印第一条评论的原始数据（仅在 DEBUG 级别启用时才重新解析响应体）
+            if comments and Logger.is_enabled_for(logging.DEBUG):
                 try:
                     data = json.loads(response_body)
                     if 'data' in data and 'comments' in data['data']:
                         first_comment = data['data']['comments'][0] if data['data']['comments'] else None
                         if first_comment and 'pictures' in first_comment:
                             logger.debug(
-                                f"\n第一条评论的pictures字段结构: {json.dumps(first_comment.get('pictures', []), indent=2, ensure_ascii=False)}")
+                                "\n第一条评论的pictures字段结构: %s",
+                                lazy_json(first_comment.get('pictures', []), indent=2))
                 except:
                     pass
 
@@ -54,6 +84,40 @@ class CommentManager:
             logger.error(f"提取评论列表失败: {e}")
             return []
 
+    def _page_type(self) -> str:
+        """当前页面类型（URL 路径的第一段，如 explore、user），用于按页面类型缓存选择器"""
+        path = urlparse(self.browser.get_current_url()).path.strip('/')
+        return path.split('/')[0] or 'home'
+
+    def _find_scroll_container(self) -> Optional[WebElement]:
+        """查找可滚动的评论容器
+        
+        同类页面上次找到的容器选择器记录在 DOM 数据库中，先在页面内验证它是否仍然可滚动，
+        失效时才逐个检查候选元素；查找和验证都在一次脚本调用中完成。
+        
+        Returns:
+            容器元素，没有可滚动容器时返回 None
+        """
+        meta_key = f"scroll_container:{self._page_type()}"
+        mapper = self.browser.dom_manager.mapper
+        cached_selector = mapper.get_meta(meta_key)
+
+        info = self.browser.page_scripts.call("findScrollContainer", cached_selector, SCROLL_CONTAINER_CANDIDATES)
+        if not info:
+            SCROLL_CONTAINER_LOOKUPS_TOTAL.inc(result="miss")
+            return None
+
+        if info['cached']:
+            SCROLL_CONTAINER_LOOKUPS_TOTAL.inc(result="cached")
+        else:
+            SCROLL_CONTAINER_LOOKUPS_TOTAL.inc(result="discovered")
+            if info['selector']:
+                mapper.set_meta(meta_key, info['selector'])
+        logger.info(f"找到可滚动容器: {info['class_name'][:50]}")
+        logger.debug(f"  容器高度: {info['client_height']}px, 可滚动高度: {info['scroll_height']}px")
+        return info['element']
+
+    @tracer.traced("CommentManager._scroll_page", category="workflow")
     def _scroll_page(self, scroll_count=3, scroll_pause=2, note_id=None):
         """滚动页面以加载更多评论，并实时收集评论接口响应
         
@@ -74,43 +138,15 @@ class CommentManager:
             # 等待评论区域加载
             time.sleep(2)
 
-            # 尝试找到真正可滚动的评论容器
+            # 尝试找到真正可滚动的评论容器（一次调用完成查找，选择器按页面类型缓存）
             scroll_element = None
-            scroll_method = None
-
-            # 方法1: 尝试找到外层可滚动的评论容器
             try:
-                possible_containers = self.browser.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div.list-container, div.comment-container, div[class*='comment'], div[class*='scroll']"
-                )
-
-                for container in possible_containers:
-                    info = self.browser.execute_script("""
-                        const elem = arguments[0];
-                        return {
-                            scrollHeight: elem.scrollHeight,
-                            clientHeight: elem.clientHeight,
-                            hasScroll: elem.scrollHeight > elem.clientHeight,
-                            overflow: window.getComputedStyle(elem).overflow,
-                            overflowY: window.getComputedStyle(elem).overflowY,
-                            className: elem.className
-                        };
-                    """, container)
-
-                    # 找到第一个可滚动的容器
-                    if info['hasScroll'] and info['overflowY'] in ['auto', 'scroll']:
-                        scroll_element = container
-                        scroll_method = 'container'
-                        logger.info(f"找到可滚动容器: {info['className'][:50]}")
-                        logger.debug(f"  容器高度: {info['clientHeight']}px, 可滚动高度: {info['scrollHeight']}px")
-                        break
+                scroll_element = self._find_scroll_container()
             except Exception as e:
                 logger.warning(f"查找可滚动容器失败: {e}")
 
-            # 方法2: 如果没找到可滚动容器,使用整页滚动
+            # 如果没找到可滚动容器,使用整页滚动
             if not scroll_element:
-                scroll_method = 'window'
                 logger.info("未找到可滚动容器,将使用整页滚动")
                 try:
                     # 使用DOM缓存功能查找评论区域
@@ -126,43 +162,19 @@ class CommentManager:
 
             # 开始滚动
             for i in range(scroll_count):
-                logs_before = len(self.browser.get_network_logs())
-
-                if scroll_method == 'container':
-                    # 滚动容器元素
-                    scroll_top_before = self.browser.execute_script("return arguments[0].scrollTop;", scroll_element)
-                    self.browser.execute_script("arguments[0].scrollTop += 1200;", scroll_element)
-                    time.sleep(0.5)
-                    scroll_top_after = self.browser.execute_script("return arguments[0].scrollTop;", scroll_element)
-                    scroll_distance = scroll_top_after - scroll_top_before
-                else:
-                    # 滚动窗口
-                    scroll_top_before = self.browser.execute_script(
-                        "return document.documentElement.scrollTop || document.body.scrollTop;"
-                    )
-                    self.browser.execute_script("""
-                        const currentScroll = document.documentElement.scrollTop || document.body.scrollTop;
-                        window.scrollTo({
-                            top: currentScroll + 1200,
-                            behavior: 'smooth'
-                        });
-                    """)
-                    time.sleep(0.5)
-                    scroll_top_after = self.browser.execute_script(
-                        "return document.documentElement.scrollTop || document.body.scrollTop;"
-                    )
-                    scroll_distance = scroll_top_after - scroll_top_before
+                # 滚动并等待滚动停止，一次调用返回前后位置（scroll_element 为 None 时滚动整页）
+                step = self.browser.page_scripts.call("scrollStep", scroll_element, SCROLL_STEP_PX, SCROLL_SETTLE_MS)
+                scroll_distance = step['distance']
 
-                logger.info(f"第 {i + 1}/{scroll_count} 次滚动 (距离: {scroll_distance}px, 位置: {scroll_top_after}px)")
+                logger.info(f"第 {i + 1}/{scroll_count} 次滚动 (距离: {scroll_distance}px, 位置: {step['after']}px)")
 
                 # 等待接口请求
                 time.sleep(1.5)
 
-                # 检查并处理评论接口
-                logs_after = self.browser.get_network_logs()
+                # 检查并处理评论接口（性能日志每次读取后即清空，读到的都是上次读取之后的新日志）
                 new_comment_requests = 0
 
-                for log in logs_after[logs_before:]:
+                for log in self.browser.get_network_logs():
                     try:
                         message = json.loads(log['message'])['message']
                         if message['method'] == 'Network.responseReceived':
@@ -190,6 +202,7 @@ class CommentManager:
 
                                     if 'body' in response_body:
                                         processed_request_ids.add(request_id)
+                                        COMMENT_PAGES_TOTAL.inc(phase="scroll")
                                         logger.info(f"    成功获取响应体 (ID: {request_id[:8]}...)")
 
                                         # 提取评论
@@ -199,7 +212,9 @@ class CommentManager:
 
                                 except Exception as e:
                                     error_msg = str(e)
-                                    if 'No resource with given identifier found' not in error_msg:
+                                    if 'No resource with given identifier found' in error_msg:
+                                        COMMENT_BODIES_EVICTED_TOTAL.inc(phase="scroll")
+                                    else:
                                         logger.error(f"    获取失败: {error_msg}")
                     except:
                         continue
@@ -207,8 +222,8 @@ class CommentManager:
                 if new_comment_requests > 0:
                     logger.info(f"  本次滚动检测到 {new_comment_requests} 个评论接口请求")
                 else:
-                    if scroll_distance == 0:
-                        logger.debug(f"    滚动距离为0且无新接口，已到底部")
+                    if step['at_end']:
+                        logger.debug(f"    已滚动到底部且无新接口")
                         logger.info(f"  提前结束滚动")
                         break
                     else:
@@ -228,9 +243,13 @@ class CommentManager:
             traceback.print_exc()
             return all_comments
 
+    @tracer.traced("CommentManager.fetch_comments", category="workflow")
     def fetch_comments(self, note_id=None, enable_scroll=False, scroll_count=3):
         """获取帖子评论
         
+        获取期间临时切换到 config.browser.comment_network_profile 网络配置（默认 read_only，
+        不加载图片、视频和字体，评论接口不受影响），结束后恢复。
+        
         Args:
             note_id: 帖子ID，如果不提供则从当前URL中提取
             enable_scroll: 是否启用自动滚动加载更多评论
@@ -239,6 +258,22 @@ class CommentManager:
         Returns:
             评论列表，失败返回空列表
         """
+        with self.browser.network_profile_scope(config.browser.comment_network_profile):
+            comments = self._fetch_comments(note_id, enable_scroll, scroll_count)
+        self._remember_comments(note_id, comments)
+        return comments
+
+    def _remember_comments(self, note_id: Optional[str], comments: List[Comment]):
+        """记下获取到的评论，回复时用于记录被回复的评论内容"""
+        self._fetched_comments = {}
+        self._fetched_note_id = note_id or (self.current_note.note_id if self.current_note else None)
+        for comment in comments:
+            self._fetched_comments[comment.comment_id] = comment
+            for sub in comment.sub_comments:
+                self._fetched_comments[sub.comment_id] = sub
+
+    def _fetch_comments(self, note_id, enable_scroll, scroll_count):
+        """获取帖子评论（fetch_comments 的实现）"""
         try:
             # 如果没有提供note_id，从当前URL中提取
             if not note_id:
@@ -290,6 +325,7 @@ class CommentManager:
 
                                 if 'body' in response_body:
                                     processed_request_ids.add(request_id)
+                                    COMMENT_PAGES_TOTAL.inc(phase="initial")
                                     logger.info(f"  获取初始评论接口响应 (ID: {request_id[:8]}...)")
 
                                     # 提取评论
@@ -299,7 +335,9 @@ class CommentManager:
                                     logger.info(f"  获取 {len(comments)} 条初始评论")
                             except Exception as e:
                                 error_msg = str(e)
-                                if 'No resource with given identifier found' not in error_msg:
+                                if 'No resource with given identifier found' in error_msg:
+                                    COMMENT_BODIES_EVICTED_TOTAL.inc(phase="initial")
+                                else:
                                     logger.error(f"  获取失败: {error_msg}")
                 except:
                     continue
@@ -385,6 +423,7 @@ class CommentManager:
             logger.info(f"\n{'-' * 80}")
 
     @log_execution
+    @with_deadline()
     def reply_to_comment(self, comment_id: str, reply_text: str) -> bool:
         """回复评论
         
@@ -486,8 +525,10 @@ class CommentManager:
             try:
                 send_button_selector = ".engage-bar .right-btn-area button.btn.submit"
 
-                send_button = WebDriverWait(self.browser.driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, send_button_selector))
+                send_button = self.browser.find_element_with_dom_cache(
+                    send_button_selector,
+                    timeout=5,
+                    element_description="发送按钮"
                 )
                 logger.info(f"  找到发送按钮")
 
@@ -498,10 +539,8 @@ class CommentManager:
                 # 如果按钮被禁用，等待最多3秒直到可用
                 if is_disabled:
                     logger.debug(f"  等待按钮变为可用...")
-                    send_button = WebDriverWait(self.browser.driver, 3).until(
-                        lambda d: d.find_element(By.CSS_SELECTOR, send_button_selector)
-                                  and not d.find_element(By.CSS_SELECTOR, send_button_selector).get_attribute(
-                            'disabled')
+                    WebDriverWait(self.browser.driver, 3).until(
+                        lambda d: not send_button.get_attribute('disabled')
                     )
                     logger.info(f"  按钮已可用")
 
@@ -511,6 +550,7 @@ class CommentManager:
                 time.sleep(2)
 
                 logger.info(f"\n 回复成功！")
+                self._log_reply(comment_id, reply_text)
                 return True
 
             except Exception as e:
@@ -533,4 +573,17 @@ class CommentManager:
             logger.error(f"\n[ERROR] 回复评论失败: {e}")
             import traceback
             traceback.print_exc()
-            return False
\ No newline at end of file
+            return False
+
+    def _log_reply(self, comment_id: str, reply_text: str):
+        """记录回复（只入队，由后台线程写入 data/reply.jsonl）"""
+        comment = self._fetched_comments.get(comment_id)
+        note_id = self._fetched_note_id or (self.current_note.note_id if self.current_note else "")
+        note = self.current_note if self.current_note and self.current_note.note_id == note_id else None
+        log_record("reply", {
+            "note_id": note_id,
+            "note_title": note.title if note else "",
+            "comment_id": comment_id,
+            "comment_content": comment.content if comment else "",
+            "reply_content": reply_text,
+        })
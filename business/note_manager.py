@@ -1,27 +1,39 @@
 """笔记管理模块"""
+import json
+import re
 import time
-from typing import Optional
-
-from selenium.webdriver.common.by import By
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 
 from core.browser_manager import BrowserManager
 from core.config import config
-from core.decorators import log_execution
+from core.decorators import log_execution, with_deadline
 from core.logger import logger
 from core.models import NoteInfo
+from core.note_catalog import NOTE_CATALOG_LOOKUPS_TOTAL, NoteCatalog, note_list_user_id, parse_note_list
 from utils import URLExtractor
 
+# 个人主页每次滚动的距离（像素）与等待滚动停止的最长时间（毫秒）
+PROFILE_SCROLL_STEP_PX = 2000
+PROFILE_SCROLL_SETTLE_MS = 500
+
 
 class NoteManager:
     """笔记管理器 - 负责笔记相关操作（搜索、打开等）"""
 
     def __init__(self, browser_manager: BrowserManager):
         """初始化笔记管理器
-        
+
         Args:
             browser_manager: 浏览器管理器实例
         """
         self.browser = browser_manager
+        self.catalog = NoteCatalog(config.xhs.note_catalog_path)
+
+    @staticmethod
+    def _profile_user_id() -> str:
+        """个人主页地址中的用户ID"""
+        return urlparse(config.xhs.user_profile_url).path.rstrip("/").split("/")[-1]
 
     @log_execution
     def open_user_profile(self):
@@ -29,79 +41,40 @@ class NoteManager:
         self.browser.navigate_to(config.xhs.user_profile_url, "个人主页")
 
     @log_execution
+    @with_deadline()
     def search_and_open_note(self, keyword: str) -> Optional[NoteInfo]:
-        """在个人主页搜索帖子并打开
-        
+        """搜索帖子并打开
+
+        先在笔记目录中按标题查找，命中时直接打开笔记；未命中时打开个人主页，
+        从已渲染的笔记和笔记列表接口响应中增量更新目录，必要时向下滚动加载更早的笔记。
+
         Args:
             keyword: 要搜索的帖子标题关键词
-            
+
         Returns:
             打开的帖子信息或None
         """
         try:
             logger.info(f"开始搜索包含关键词 '{keyword}' 的帖子...")
-
-            # 1. 先打开个人主页
-            self.open_user_profile()
-
-            # 2. 等待帖子列表加载
-            time.sleep(config.wait.page_load_timeout)
-
-            # 3. 查找所有帖子标题
-            # 使用DOM缓存功能查找元素
-            note_item_selector = config.xhs.selectors["note_item"]
-            title_elements = self.browser.driver.find_elements(
-                By.CSS_SELECTOR,
-                note_item_selector
-            )
-
-            logger.info(f" 找到 {len(title_elements)} 个帖子")
-
-            # 4. 遍历所有标题，查找包含关键词的帖子
-            for i, title_element in enumerate(title_elements):
-                title_text = title_element.text.strip()
-                logger.debug(f"  [{i + 1}] {title_text}")
-
-                if keyword in title_text:
-                    logger.info(f" 找到匹配的帖子: {title_text}")
-
-                    # 5. 找到对应的链接并点击
-                    note_section = title_element.find_element(
-                        By.XPATH,
-                        "./ancestor::section[@class='note-item']"
-                    )
-
-                    # 使用DOM缓存功能查找笔记封面
-                    note_cover_selector = config.xhs.selectors["note_cover"]
-                    note_link = note_section.find_element(
-                        By.CSS_SELECTOR,
-                        note_cover_selector
-                    )
-
-                    note_url = note_link.get_attribute("href")
-                    logger.info(f" 帖子链接: {note_url}")
-
-                    # 6. 点击链接
-                    note_link.click()
-                    logger.info(" 已点击帖子，等待页面跳转...")
-
-                    # 7. 等待跳转到帖子详情页
-                    time.sleep(config.wait.page_load_timeout)
-
-                    # 8. 验证是否成功跳转
-                    current_url = self.browser.get_current_url()
-                    if "/explore/" in current_url:
-                        note_id = URLExtractor.extract_note_id(current_url)
-                        logger.info(f" 成功跳转到帖子详情页: {current_url}")
-
-                        return NoteInfo(
-                            note_id=note_id or "",
-                            title=title_text,
-                            url=current_url
-                        )
-                    else:
-                        logger.warning(f"跳转异常，当前URL: {current_url}")
-                        return None
+            user_id = self._profile_user_id()
+
+            # 1. 笔记目录命中时直接打开，不经过个人主页
+            matches = self.catalog.search(keyword, user_id=user_id, limit=1)
+            if matches:
+                NOTE_CATALOG_LOOKUPS_TOTAL.inc(result="hit")
+                note_info = self._open_note(matches[0])
+                if note_info:
+                    return note_info
+                # 笔记已删除或无法打开
+                NOTE_CATALOG_LOOKUPS_TOTAL.inc(result="stale")
+                self.catalog.remove(matches[0]["note_id"])
+            else:
+                NOTE_CATALOG_LOOKUPS_TOTAL.inc(result="miss")
+
+            # 2. 打开个人主页，更新笔记目录后再查找
+            matches = self._refresh_catalog(keyword, user_id)
+            if matches:
+                return self._open_note(matches[0])
 
             # 如果没找到匹配的帖子
             logger.warning(f"未找到包含关键词 '{keyword}' 的帖子")
@@ -109,4 +82,109 @@ class NoteManager:
 
         except Exception as e:
             logger.error(f"搜索帖子时出错: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _open_note(self, match: Dict[str, str]) -> Optional[NoteInfo]:
+        """打开目录中的笔记并确认跳转到了该笔记的详情页
+        
+        打开笔记是为了读取和回复评论，导航期间使用 config.browser.comment_network_profile 网络配置，
+        页面加载耗时和传输字节数记录在该配置下。
+        """
+        logger.info(f" 找到匹配的帖子: {match['title']}")
+        with self.browser.network_profile_scope(config.browser.comment_network_profile):
+            self.browser.navigate_to(match["url"], "帖子详情页")
+
+        current_url = self.browser.get_current_url()
+        note_id = URLExtractor.extract_note_id(current_url)
+        if note_id != match["note_id"]:
+            logger.warning(f"跳转异常，当前URL: {current_url}")
+            return None
+
+        logger.info(f" 成功跳转到帖子详情页: {current_url}")
+        return NoteInfo(note_id=note_id, title=match["title"], url=current_url)
+
+    def _refresh_catalog(self, keyword: str, user_id: str) -> List[Dict[str, str]]:
+        """打开个人主页增量更新笔记目录，直到找到关键词或没有更早的笔记
+
+        笔记列表接口按新到旧分页返回；目录已完整收录过一次时，滚动到一页全是已知笔记就停止。
+
+        Returns:
+            匹配的笔记列表
+        """
+        self.open_user_profile()
+        complete_key = f"complete:{user_id}"
+        complete = self.catalog.get_meta(complete_key) == "1"
+
+        # 首屏笔记由服务端渲染，不经过笔记列表接口
+        added = self._harvest_rendered_notes(user_id)
+        new_from_api, has_more = self._harvest_note_lists(user_id)
+        added += new_from_api
+        logger.info(f" 笔记目录新增 {added} 条，共 {self.catalog.count(user_id)} 条")
+
+        for page in range(config.xhs.note_catalog_scroll_pages + 1):
+            matches = self.catalog.search(keyword, user_id=user_id, limit=1)
+            if matches or page == config.xhs.note_catalog_scroll_pages:
+                return matches
+            if has_more is False:
+                self.catalog.set_meta(complete_key, "1")
+                return []
+            if complete and added == 0:
+                logger.info(" 没有新的笔记，停止加载")
+                return []
+
+            step = self.browser.page_scripts.call(
+                "scrollStep", None, PROFILE_SCROLL_STEP_PX, PROFILE_SCROLL_SETTLE_MS
+            )
+            time.sleep(config.wait.action_delay)
+            added, page_has_more = self._harvest_note_lists(user_id)
+            added += self._harvest_rendered_notes(user_id)
+            if page_has_more is not None:
+                has_more = page_has_more
+            elif step["at_end"]:
+                has_more = False
+            logger.info(f" 第 {page + 1} 次滚动，笔记目录新增 {added} 条")
+        return []
+
+    def _harvest_rendered_notes(self, user_id: str) -> int:
+        """把页面上已渲染的笔记卡片写入目录，返回新增笔记数"""
+        notes = []
+        for item in self.browser.page_scripts.call(
+                "renderedNotes", config.xhs.selectors["note_item"], config.xhs.selectors["note_cover"]
+        ) or []:
+            match = re.search(r'/([0-9a-f]{24})(?:\?|$)', item.get("href") or "")
+            if not match:
+                continue
+            notes.append({
+                "note_id": match.group(1),
+                "title": item.get("title") or "",
+                "xsec_token": parse_qs(urlparse(item["href"]).query).get("xsec_token", [""])[0],
+                "note_type": "",
+                "user_id": user_id,
+            })
+        return self.catalog.upsert(notes, user_id)
+
+    def _harvest_note_lists(self, user_id: str) -> Tuple[int, Optional[bool]]:
+        """把性能日志中笔记列表接口的响应写入目录
+
+        Returns:
+            (新增笔记数, 最后一页是否还有更多；没有捕获到接口响应时为 None)
+        """
+        added, has_more = 0, None
+        for log in self.browser.get_network_logs():
+            try:
+                message = json.loads(log['message'])['message']
+                if message['method'] != 'Network.responseReceived':
+                    continue
+                response_url = message['params']['response']['url']
+                if config.xhs.note_list_api_pattern not in response_url:
+                    continue
+                if note_list_user_id(response_url) not in ("", user_id):
+                    continue
+                response = self.browser.execute_cdp_cmd(
+                    'Network.getResponseBody', {'requestId': message['params']['requestId']}
+                )
+                notes, has_more = parse_note_list(response['body'])
+                added += self.catalog.upsert(notes, user_id)
+            except Exception as e:
+                logger.debug(f"读取笔记列表接口响应失败: {e}")
+        return added, has_more
@@ -5,7 +5,8 @@ from selenium.webdriver.common.by import By
 
 from core.browser_manager import BrowserManager
 from core.config import config
-from core.decorators import log_execution
+from core.data_logger import log_record
+from core.decorators import deadline, log_execution
 from core.exceptions import PublishError
 from core.logger import logger
 from core.models import PublishContent
@@ -83,6 +84,7 @@ class PublishManager:
                 config.xhs.selectors["next_button"],
                 "下一步按钮"
             )
+            self.browser.new_page()
             logger.info("等待跳转到发布页面...")
             time.sleep(config.wait.page_load_timeout)
             return True
@@ -146,20 +148,30 @@ class PublishManager:
             logger.info("开始小红书自动发布流程")
             logger.info("=" * 50 + "\n")
 
-            # 1. 打开发布页
-            self.open_publish_page()
-
-            # 2. 文字生成图片
-            self.create_text_to_image(publish_content.content)
-
-            # 3. 进入发布页面
-            self.proceed_to_publish_page()
-
-            # 4. 填写并发布
-            self.fill_and_publish(
-                publish_content.title,
-                publish_content.description
-            )
+            # 整个流程共享一个时间预算，各步骤的元素等待和重试都不会超出
+            with deadline(config.wait.workflow_timeout):
+                # 1. 打开发布页
+                self.open_publish_page()
+
+                # 2. 文字生成图片
+                self.create_text_to_image(publish_content.content)
+
+                # 3. 进入发布页面
+                self.proceed_to_publish_page()
+
+                # 4. 填写并发布
+                self.fill_and_publish(
+                    publish_content.title,
+                    publish_content.description
+                )
+
+            # 记录已发布的帖子（只入队，由后台线程写入 data/post.jsonl）
+            log_record("post", {
+                "title": publish_content.title,
+                "content": publish_content.content,
+                "description": publish_content.description,
+                "tags": publish_content.tags,
+            })
 
             logger.info("\n" + "=" * 50)
             logger.info(" 所有步骤完成")
@@ -1,40 +1,51 @@
-""" 小红书自动化工具 - 核心模块"""
+""" 小红书自动化工具 - 核心模块
 
+包级别的名称按需导入（PEP 562）：`import core` 或 `from core.models import ...` 不会连带加载
+selenium、AI SDK 等重量级依赖，首次访问 `core.BrowserManager` 之类的属性时才导入对应子模块。
+"""
+import importlib
+from typing import Any, List
+
+# config/logger 与子模块同名，保持直接导入（子模块导入后会以模块对象覆盖包属性）
 from core.config import config
 from core.logger import logger
-from core.browser_manager import BrowserManager
-# 注意： XHSClient 不在这里导入，避免循环依赖
+
+# 注意： XHSClient 不在这里导出，避免循环依赖
 # 使用时请直接: from core.xhs_client import XHSClient
-from core.models import Comment, NoteInfo, PublishContent, UserInfo, AIConfig
-from core.ai_client import BaseAIClient, OpenAIClient, ZhipuAIClient, AIClientFactory
-from core.dom_manager import DOMManager, DOMCacheManager
-from core.dom_mapper import DOMElementMapper
-from core.exceptions import (
-    XHSPublisherException,
-    BrowserInitError,
-    ElementNotFoundError,
-    PublishError
-)
-
-__all__ = [
-    'config',
-    'logger',
-    'BrowserManager',
-    # 'XHSClient',  # 已移除，避免循环导入
-    'Comment',
-    'NoteInfo',
-    'PublishContent',
-    'UserInfo',
-    'AIConfig',
-    'BaseAIClient',
-    'OpenAIClient',
-    'ZhipuAIClient',
-    'AIClientFactory',
-    'DOMManager',
-    'DOMCacheManager',
-    'DOMElementMapper',
-    'XHSPublisherException',
-    'BrowserInitError',
-    'ElementNotFoundError',
-    'PublishError',
-]
+_LAZY_ATTRS = {
+    'BrowserManager': 'core.browser_manager',
+    'Comment': 'core.models',
+    'NoteInfo': 'core.models',
+    'PublishContent': 'core.models',
+    'UserInfo': 'core.models',
+    'AIConfig': 'core.models',
+    'BaseAIClient': 'core.ai_client',
+    'OpenAIClient': 'core.ai_client',
+    'ZhipuAIClient': 'core.ai_client',
+    'OllamaClient': 'core.ai_client',
+    'AIClientFactory': 'core.ai_client',
+    'CachedAIClient': 'core.ai_cache',
+    'DOMManager': 'core.dom_manager',
+    'DOMCacheManager': 'core.dom_manager',
+    'DOMElementMapper': 'core.dom_mapper',
+    'XHSPublisherException': 'core.exceptions',
+    'BrowserInitError': 'core.exceptions',
+    'ElementNotFoundError': 'core.exceptions',
+    'PublishError': 'core.exceptions',
+}
+
+__all__ = ['config', 'logger', *_LAZY_ATTRS]
+
+
+def __getattr__(name: str) -> Any:
+    """首次访问时导入子模块并缓存到包命名空间"""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,358 @@
+"""AI 响应缓存模块 - 内存 LRU + SQLite 持久化"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.ai_client import BaseAIClient
+from core.ai_usage import usage_ledger
+from core.logger import logger
+from core.metrics import metrics
+from core.models import AIUsage
+from core.tracing import tracer
+
+AI_CACHE_REQUESTS_TOTAL = metrics.counter(
+    "xhs_ai_cache_requests_total", "AI 响应缓存查询次数（按结果）", ["result"]
+)
+AI_CACHE_ENTRIES = metrics.gauge(
+    "xhs_ai_cache_entries", "AI 响应缓存条目数", ["tier"]
+)
+
+_cache_bypassed: ContextVar[bool] = ContextVar('xhs_ai_cache_bypassed', default=False)
+
+
+@contextmanager
+def no_cache():
+    """在此上下文中的 AI 调用跳过缓存（用于需要多样性的创作类调用）"""
+    token = _cache_bypassed.set(True)
+    try:
+        yield
+    finally:
+        _cache_bypassed.reset(token)
+
+
+class AIResponseStore:
+    """AI 响应的 SQLite 持久化存储"""
+
+    def __init__(self, db_path: str = "cache/ai_responses.db", max_entries: int = 10000):
+        """初始化存储
+
+        Args:
+            db_path: 数据库文件路径
+            max_entries: 最大条目数，超出后按最近访问时间淘汰
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+
+    def init_database(self):
+        """初始化数据库表结构"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ai_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON ai_responses(last_access)')
+            conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        """读取未过期的响应
+
+        Returns:
+            (响应文本, 过期时间)，不存在或已过期返回 None
+        """
+        now = time.time()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    'SELECT response, expires_at FROM ai_responses WHERE cache_key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] is not None and row[1] <= now:
+                    conn.execute('DELETE FROM ai_responses WHERE cache_key = ?', (key,))
+                    return None
+                conn.execute('UPDATE ai_responses SET last_access = ? WHERE cache_key = ?', (now, key))
+                return row[0], row[1]
+        except Exception as e:
+            logger.warning(f"读取 AI 响应缓存失败: {e}")
+            return None
+
+    def set(self, key: str, response: str, expires_at: Optional[float]):
+        """写入响应并按容量淘汰最久未访问的条目"""
+        now = time.time()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO ai_responses (cache_key, response, created_at, expires_at, last_access)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (key, response, now, expires_at, now))
+                conn.execute('DELETE FROM ai_responses WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,))
+                conn.execute('''
+                    DELETE FROM ai_responses WHERE cache_key IN (
+                        SELECT cache_key FROM ai_responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_entries,))
+        except Exception as e:
+            logger.warning(f"写入 AI 响应缓存失败: {e}")
+
+    def count(self) -> int:
+        """条目数"""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute('SELECT COUNT(*) FROM ai_responses').fetchone()[0]
+
+    def clear(self):
+        """清空存储"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM ai_responses')
+
+
+class CachedAIClient(BaseAIClient):
+    """带缓存的 AI 客户端包装器
+
+    可以包装任意 BaseAIClient（包括通过 AIClientFactory 注册的自定义客户端）。
+    相同的 (客户端, 模型, 消息, temperature, max_tokens) 请求直接返回缓存结果：
+    先查内存 LRU，再查 SQLite，都未命中才真正请求 AI 服务。
+
+    Example:
+        >>> client = CachedAIClient(AIClientFactory.create_client("openai"), ttl=86400)
+        >>> client.generate_text("你好")       # 请求 AI
+        >>> client.generate_text("你好")       # 命中缓存
+        >>> with no_cache():
+        ...     client.generate_text("你好")   # 跳过缓存
+    """
+
+    def __init__(
+        self,
+        client: BaseAIClient,
+        db_path: Optional[str] = "cache/ai_responses.db",
+        ttl: Optional[float] = 7 * 24 * 3600,
+        memory_size: int = 256,
+        max_entries: int = 10000,
+        max_cacheable_temperature: Optional[float] = None
+    ):
+        """初始化缓存客户端
+
+        Args:
+            client: 被包装的 AI 客户端
+            db_path: SQLite 缓存路径，None 表示只使用内存缓存
+            ttl: 缓存有效期（秒），None 表示永不过期
+            memory_size: 内存 LRU 容量
+            max_entries: SQLite 最大条目数
+            max_cacheable_temperature: 高于此温度的请求不缓存，None 表示不限制
+        """
+        if not isinstance(client, BaseAIClient):
+            raise ValueError("被包装的客户端必须是 BaseAIClient 的实例")
+        self.client = client
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.max_cacheable_temperature = max_cacheable_temperature
+        self.store = AIResponseStore(db_path, max_entries) if db_path else None
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        """未定义的属性（如 model、temperature）转发给被包装的客户端"""
+        return getattr(self.__dict__['client'], name)
+
+    def _cache_key(self, messages: List[Dict[str, str]], temperature: Optional[float],
+                   max_tokens: Optional[int]) -> str:
+        """生成规范化的请求哈希"""
+        info = self.client.get_client_info()
+        payload = {
+            'client': info.get('name', type(self.client).__name__),
+            'model': info.get('model'),
+            'base_url': info.get('base_url'),
+            'messages': [{'role': m.get('role'), 'content': m.get('content')} for m in messages],
+            'temperature': temperature if temperature is not None else getattr(self.client, 'temperature', None),
+            'max_tokens': max_tokens if max_tokens is not None else getattr(self.client, 'max_tokens', None),
+        }
+        canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _should_cache(self, temperature: Optional[float]) -> bool:
+        """判断本次请求是否使用缓存"""
+        if _cache_bypassed.get():
+            return False
+        if self.max_cacheable_temperature is None:
+            return True
+        effective = temperature if temperature is not None else getattr(self.client, 'temperature', None)
+        return effective is None or effective <= self.max_cacheable_temperature
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        """从内存 LRU 读取"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return response
+
+    def _memory_set(self, key: str, response: str, expires_at: Optional[float]):
+        """写入内存 LRU"""
+        with self._lock:
+            self._memory[key] = (response, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+            AI_CACHE_ENTRIES.set(len(self._memory), tier="memory")
+
+    def _lookup(self, key: str) -> Optional[str]:
+        """依次查询内存和磁盘缓存，未命中返回 None"""
+        start_time = time.perf_counter()
+        with tracer.span("ai.cache_lookup", category="ai") as span:
+            response = self._memory_get(key)
+            if response is not None:
+                span.set_attribute("tier", "memory")
+                AI_CACHE_REQUESTS_TOTAL.inc(result="memory_hit")
+                self._record_hit(time.perf_counter() - start_time)
+                return response
+
+            if self.store is not None:
+                stored = self.store.get(key)
+                if stored is not None:
+                    span.set_attribute("tier", "disk")
+                    AI_CACHE_REQUESTS_TOTAL.inc(result="disk_hit")
+                    self._record_hit(time.perf_counter() - start_time)
+                    self._memory_set(key, *stored)
+                    return stored[0]
+            span.set_attribute("tier", "miss")
+
+        AI_CACHE_REQUESTS_TOTAL.inc(result="miss")
+        self.misses += 1
+        return None
+
+    def _record_hit(self, elapsed: float):
+        """记录一次缓存命中（不消耗 token）"""
+        self.hits += 1
+        info = self.client.get_client_info()
+        # 与被包装客户端真实调用的记录使用同一个提供方标识，按提供方汇总时命中与付费调用归入同一组
+        usage_ledger.record(AIUsage(
+            provider=self.provider,
+            model=info.get('model') or '',
+            latency=elapsed,
+            cached=True
+        ))
+
+    def _save(self, key: str, response: str):
+        """写入内存和磁盘缓存"""
+        expires_at = time.time() + self.ttl if self.ttl else None
+        self._memory_set(key, response, expires_at)
+        if self.store is not None:
+            self.store.set(key, response, expires_at)
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """带缓存的 chat"""
+        if not self._should_cache(temperature):
+            AI_CACHE_REQUESTS_TOTAL.inc(result="bypass")
+            return self.client.chat(messages, temperature=temperature, max_tokens=max_tokens)
+
+        key = self._cache_key(messages, temperature, max_tokens)
+        response = self._lookup(key)
+        if response is None:
+            response = self.client.chat(messages, temperature=temperature, max_tokens=max_tokens)
+            self._save(key, response)
+        return response
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """带缓存的异步 chat，未命中时调用被包装客户端的 achat"""
+        if not self._should_cache(temperature):
+            AI_CACHE_REQUESTS_TOTAL.inc(result="bypass")
+            return await self.client.achat(messages, temperature=temperature, max_tokens=max_tokens)
+
+        key = self._cache_key(messages, temperature, max_tokens)
+        response = self._lookup(key)
+        if response is None:
+            response = await self.client.achat(messages, temperature=temperature, max_tokens=max_tokens)
+            self._save(key, response)
+        return response
+
+    async def aclose(self):
+        """释放被包装客户端的异步资源"""
+        await self.client.aclose()
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """带缓存的流式 chat：命中时一次性产出，未命中时边转发边收集，完整结束后写入缓存"""
+        if not self._should_cache(temperature):
+            AI_CACHE_REQUESTS_TOTAL.inc(result="bypass")
+            yield from self.client.chat_stream(messages, temperature=temperature, max_tokens=max_tokens)
+            return
+
+        key = self._cache_key(messages, temperature, max_tokens)
+        response = self._lookup(key)
+        if response is not None:
+            yield response
+            return
+
+        parts = []
+        for delta in self.client.chat_stream(messages, temperature=temperature, max_tokens=max_tokens):
+            parts.append(delta)
+            yield delta
+        # 与 chat() 的返回值保持一致（非流式客户端会去掉首尾空白）
+        self._save(key, "".join(parts).strip())
+
+    def is_available(self) -> bool:
+        """检查被包装的客户端是否可用"""
+        return self.client.is_available()
+
+    @property
+    def provider(self) -> str:
+        """被包装客户端的提供方标识"""
+        return getattr(self.client, 'provider', type(self.client).__name__)
+
+    def get_client_info(self) -> Dict[str, Any]:
+        """获取客户端信息"""
+        info = dict(self.client.get_client_info())
+        info['cached'] = True
+        return info
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'memory_entries': len(self._memory),
+            'disk_entries': self.store.count() if self.store else 0,
+        }
+
+    def clear(self):
+        """清空内存和磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+        if self.store is not None:
+            self.store.clear()
@@ -1,10 +1,249 @@
 """AI 客户端模块 - 工厂模式"""
+import asyncio
+import atexit
+import contextvars
+import functools
+import hashlib
+import importlib
+import json
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from dataclasses import asdict, is_dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar, Union
 from .config import config
+from .decorators import RetryPolicy, bounded_timeout
 from .logger import logger
+from .metrics import metrics
+from .tracing import tracer
 from .exceptions import XHSException
-from .models import AIConfig
+from .models import AIConfig, AIUsage
+from .ai_usage import usage_ledger
+
+
+AI_REQUEST_SECONDS = metrics.histogram(
+    "xhs_ai_request_seconds", "AI 请求耗时（秒）", ["provider", "model"]
+)
+AI_REQUESTS_TOTAL = metrics.counter(
+    "xhs_ai_requests_total", "AI 请求次数", ["provider", "status"]
+)
+AI_TOKENS_TOTAL = metrics.counter(
+    "xhs_ai_tokens_total", "AI token 消耗（completion_estimated 为流式响应未返回 usage 时按片段数估算的值）",
+    ["provider", "kind"]
+)
+AI_CLIENT_REGISTRY_TOTAL = metrics.counter(
+    "xhs_ai_client_registry_total", "AIClientFactory.get_client 的复用情况", ["client", "result"]
+)
+AI_TIME_TO_FIRST_TOKEN_SECONDS = metrics.histogram(
+    "xhs_ai_time_to_first_token_seconds", "流式请求首个文本片段的到达时间（秒）", ["provider", "model"]
+)
+AI_TOKENS_PER_SECOND = metrics.histogram(
+    "xhs_ai_tokens_per_second", "流式请求首片段之后的生成速度（token/秒）", ["provider", "model"],
+    buckets=(1, 5, 10, 20, 40, 80, 160, 320)
+)
+
+
+# 服务端瞬时错误（限流、超时、5xx）才重试；认证、参数错误直接失败
+_RETRYABLE_AI_ERRORS = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "APIServerError", "APIReachLimitError", "ConnectError", "ReadTimeout",
+    "ConnectionError", "Timeout", "ConnectTimeout",
+}
+_FATAL_AI_ERRORS = {
+    "AuthenticationError", "PermissionDeniedError", "BadRequestError", "NotFoundError",
+    "APIAuthenticationError", "APIRequestFailedError", "UnprocessableEntityError",
+}
+
+
+def _classify_ai_error(exc: BaseException) -> Optional[bool]:
+    """按异常类型名和 HTTP 状态码判断 AI 请求错误是否可重试"""
+    name = type(exc).__name__
+    if name in _FATAL_AI_ERRORS:
+        return False
+    if name in _RETRYABLE_AI_ERRORS:
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        # requests.HTTPError 的状态码在 response 上
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return None
+
+
+AI_RETRY_POLICY = RetryPolicy(
+    max_attempts=3,
+    base_delay=1.0,
+    max_delay=10.0,
+    retryable=(ConnectionError, TimeoutError),
+    classifier=_classify_ai_error,
+    name="ai.chat"
+)
+
+
+def _record_ai_usage(provider: str, model: str, elapsed: float, prompt_tokens: int = 0, completion_tokens: int = 0):
+    """记录一次成功 AI 请求的耗时与 token：更新指标并写入用量账本"""
+    AI_REQUEST_SECONDS.observe(elapsed, provider=provider, model=model)
+    AI_REQUESTS_TOTAL.inc(provider=provider, status="ok")
+    AI_TOKENS_TOTAL.inc(prompt_tokens, provider=provider, kind="prompt")
+    AI_TOKENS_TOTAL.inc(completion_tokens, provider=provider, kind="completion")
+    usage_ledger.record(AIUsage(
+        provider=provider,
+        model=model,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        latency=elapsed
+    ))
+
+
+def _record_ai_metrics(provider: str, model: str, elapsed: float, response: Any = None):
+    """从 OpenAI 格式的响应中取出 usage 并记录"""
+    usage = getattr(response, "usage", None)
+    _record_ai_usage(
+        provider, model, elapsed,
+        getattr(usage, "prompt_tokens", 0) or 0,
+        getattr(usage, "completion_tokens", 0) or 0
+    )
+
+
+class _StreamMeter:
+    """流式请求计量：首片段时间、生成速度以及请求总耗时"""
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model or ""
+        self.start_time = time.perf_counter()
+        self.first_time: Optional[float] = None
+        self.chunks = 0
+        self.prompt_tokens = 0
+        self.completion_tokens: Optional[int] = None
+
+    def on_delta(self):
+        """收到一个文本片段"""
+        if self.first_time is None:
+            self.first_time = time.perf_counter()
+            AI_TIME_TO_FIRST_TOKEN_SECONDS.observe(
+                self.first_time - self.start_time, provider=self.provider, model=self.model
+            )
+        self.chunks += 1
+
+    def finish(self):
+        """流结束，记录生成速度与请求指标
+
+        服务端未返回 usage 时片段数只是估算值：计入 ``kind="completion_estimated"``，
+        不计入真实 token、生成速度、用量账本和预算。
+        """
+        end_time = time.perf_counter()
+        tokens = self.completion_tokens
+        if tokens is None:
+            AI_TOKENS_TOTAL.inc(self.chunks, provider=self.provider, kind="completion_estimated")
+            tokens = 0
+        elif self.first_time is not None and tokens > 1 and end_time > self.first_time:
+            # 首片段之前的时间已计入 TTFT，这里只统计后续片段的生成速度
+            AI_TOKENS_PER_SECOND.observe(
+                (tokens - 1) / (end_time - self.first_time), provider=self.provider, model=self.model
+            )
+        _record_ai_usage(self.provider, self.model, end_time - self.start_time, self.prompt_tokens, tokens)
+
+
+def _iter_openai_compatible_stream(stream: Iterable[Any], meter: _StreamMeter) -> Iterator[str]:
+    """从 OpenAI 兼容的流式响应中逐个取出文本片段并计量"""
+    try:
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage is not None and getattr(usage, "completion_tokens", None):
+                meter.completion_tokens = usage.completion_tokens
+                meter.prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                meter.on_delta()
+                yield delta
+    except Exception as e:
+        AI_REQUESTS_TOTAL.inc(provider=meter.provider, status="error")
+        logger.error(f"{meter.provider} 流式响应中断: {e}")
+        raise XHSException(f"{meter.provider} 流式响应中断: {e}")
+    meter.finish()
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def amap(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    concurrency: int = 4
+) -> List[Union[R, Exception]]:
+    """以有限并发执行协程函数，结果顺序与输入一致
+
+    单个条目失败不会影响其他条目，失败位置返回对应的异常对象。
+
+    Args:
+        func: 对每个条目调用的协程函数
+        items: 输入条目
+        concurrency: 最大并发数
+
+    Returns:
+        与 items 一一对应的结果或异常
+
+    Example:
+        >>> results = await amap(lambda t: client.agenerate_text(t), prompts, concurrency=4)
+        >>> ok = [r for r in results if not isinstance(r, Exception)]
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+
+async def _openai_compatible_achat(
+    client: Any,
+    provider: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    timeout: float
+) -> str:
+    """通过 OpenAI 兼容的异步客户端发送聊天请求"""
+    start_time = time.perf_counter()
+    try:
+        with tracer.span("ai.achat", category="ai", provider=provider, model=model):
+            response = await AI_RETRY_POLICY.acall(
+                lambda: client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=bounded_timeout(timeout)
+                )
+            )
+        _record_ai_metrics(provider, model, time.perf_counter() - start_time, response)
+
+        content = response.choices[0].message.content
+        logger.debug("AI 响应: %s...", content[:100])
+        return content.strip()
+
+    except Exception as e:
+        AI_REQUESTS_TOTAL.inc(provider=provider, status="error")
+        logger.error(f"{provider} 异步请求失败: {e}")
+        raise XHSException(f"{provider} 异步请求失败: {e}")
+
+
+async def _close_async_client(async_client):
+    """关闭 AsyncOpenAI 实例（连接属于已经关闭的事件循环时无法正常关闭，只能交给垃圾回收）"""
+    if async_client is None:
+        return
+    try:
+        await async_client.close()
+    except Exception as e:
+        logger.debug("关闭异步 AI 客户端失败: %s", e)
 
 
 class BaseAIClient(ABC):
@@ -68,14 +307,129 @@ class BaseAIClient(ABC):
         Returns:
             生成的文本
         """
+        messages = self._build_messages(prompt, system_prompt)
+        
+        with tracer.span("ai.generate_text", category="ai", client=self.__class__.__name__):
+            return self.chat(messages, temperature=temperature)
+    
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        异步发送聊天请求（默认实现，可选覆盖）
+        
+        默认在线程池中执行同步的 chat()，自定义客户端无需额外实现即可并发调用。
+        有原生异步 SDK 的客户端应覆盖此方法。
+        
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大生成 token 数
+        
+        Returns:
+            AI 回复的文本内容
+        """
+        # 与 asyncio.to_thread（Python 3.9+）等价：复制上下文（截止时间、用量作用域）后在默认线程池中执行
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(
+            None, functools.partial(ctx.run, self.chat, messages, temperature, max_tokens)
+        )
+    
+    async def aclose(self):
+        """
+        释放异步调用占用的资源（如绑定当前事件循环的连接池，可选覆盖）
+        
+        同步入口通过 asyncio.run 执行批量任务时，在事件循环结束前调用。
+        """
+    
+    async def agenerate_text(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> str:
+        """
+        异步生成文本，内部调用 achat()
+        
+        Args:
+            prompt: 用户提示词
+            system_prompt: 系统提示词（可选）
+            temperature: 温度参数（可选）
+        
+        Returns:
+            生成的文本
+        """
+        messages = self._build_messages(prompt, system_prompt)
+        
+        with tracer.span("ai.agenerate_text", category="ai", client=self.__class__.__name__):
+            return await self.achat(messages, temperature=temperature)
+    
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        流式发送聊天请求，逐个产出文本片段（默认实现，可选覆盖）
+        
+        默认调用 chat() 并一次性产出完整结果，此时首片段时间即完整请求耗时。
+        支持流式输出的客户端应覆盖此方法。
+        
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大生成 token 数
+        
+        Yields:
+            文本片段
+        """
+        start_time = time.perf_counter()
+        content = self.chat(messages, temperature=temperature, max_tokens=max_tokens)
+        AI_TIME_TO_FIRST_TOKEN_SECONDS.observe(
+            time.perf_counter() - start_time,
+            provider=self.provider, model=getattr(self, "model", "") or ""
+        )
+        yield content
+    
+    def generate_text_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> Iterator[str]:
+        """
+        流式生成文本，内部调用 chat_stream()
+        
+        Args:
+            prompt: 用户提示词
+            system_prompt: 系统提示词（可选）
+            temperature: 温度参数（可选）
+        
+        Yields:
+            文本片段
+        """
+        return self.chat_stream(self._build_messages(prompt, system_prompt), temperature=temperature)
+    
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        """组装单轮对话消息"""
         messages = []
         
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         
         messages.append({"role": "user", "content": prompt})
-        
-        return self.chat(messages, temperature=temperature)
+        return messages
+    
+    @property
+    def provider(self) -> str:
+        """指标与用量账本中的提供方标识（内置客户端为 openai / zhipu / ollama，自定义客户端默认为类名）"""
+        return self.__class__.__name__
     
     def get_client_info(self) -> Dict[str, Any]:
         """
@@ -93,6 +447,8 @@ class OpenAIClient(BaseAIClient):
     这是默认的 AI 客户端实现，支持 OpenAI 及其兼容 API。
     """
     
+    provider = "openai"
+    
     def __init__(self, ai_config: Optional[AIConfig] = None, **kwargs):
         """
         初始化 OpenAI 客户端
@@ -129,6 +485,8 @@ class OpenAIClient(BaseAIClient):
             self.timeout = kwargs.get('timeout') or config.ai.timeout
         
         self.client: Optional[OpenAI] = None
+        self._async_client = None
+        self._async_loop = None
         self._init_client()
     
     def _init_client(self):
@@ -143,7 +501,9 @@ class OpenAIClient(BaseAIClient):
             self.client = OpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
-                timeout=self.timeout
+                timeout=self.timeout,
+                max_retries=0,  # 重试由 AI_RETRY_POLICY 统一处理
+                http_client=AIClientFactory.get_http_client(self)  # 共享连接池，复用 TLS 连接
             )
             logger.info(f" OpenAI 客户端初始化成功 - 模型: {self.model}")
         except Exception as e:
@@ -159,23 +519,104 @@ class OpenAIClient(BaseAIClient):
         """实现 chat 方法"""
         if not self.client:
             raise XHSException("OpenAI 客户端未初始化，请检查配置")
+        usage_ledger.check_budget()
         
+        start_time = time.perf_counter()
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature or self.temperature,
-                max_tokens=max_tokens or self.max_tokens
-            )
+            with tracer.span("ai.chat", category="ai", provider=self.provider, model=self.model):
+                response = AI_RETRY_POLICY.call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature or self.temperature,
+                        max_tokens=max_tokens or self.max_tokens,
+                        timeout=bounded_timeout(self.timeout)
+                    )
+                )
+            _record_ai_metrics(self.provider, self.model, time.perf_counter() - start_time, response)
             
             content = response.choices[0].message.content
-            logger.debug(f"AI 响应: {content[:100]}...")
+            logger.debug("AI 响应: %s...", content[:100])
             return content.strip()
         
         except Exception as e:
+            AI_REQUESTS_TOTAL.inc(provider=self.provider, status="error")
             logger.error(f"OpenAI 请求失败: {e}")
             raise XHSException(f"OpenAI 请求失败: {e}")
     
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """使用 stream=True 的流式实现"""
+        if not self.client:
+            raise XHSException("OpenAI 客户端未初始化，请检查配置")
+        usage_ledger.check_budget()
+        
+        meter = _StreamMeter(self.provider, self.model)
+        try:
+            # 只有建立连接的阶段可以安全重试，开始产出片段后不再重试
+            with tracer.span("ai.chat_stream", category="ai", provider=self.provider, model=self.model):
+                stream = AI_RETRY_POLICY.call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature or self.temperature,
+                        max_tokens=max_tokens or self.max_tokens,
+                        timeout=bounded_timeout(self.timeout),
+                        stream=True,
+                        # 要求服务端在最后一个片段中返回 usage，否则只能按片段数估算
+                        stream_options={"include_usage": True}
+                    )
+                )
+        except Exception as e:
+            AI_REQUESTS_TOTAL.inc(provider=self.provider, status="error")
+            logger.error(f"OpenAI 流式请求失败: {e}")
+            raise XHSException(f"OpenAI 流式请求失败: {e}")
+        
+        yield from _iter_openai_compatible_stream(stream, meter)
+    
+    async def _get_async_client(self):
+        """获取当前事件循环的 AsyncOpenAI 客户端（连接池绑定事件循环，换循环时关闭旧客户端后重建）"""
+        from openai import AsyncOpenAI
+        
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            # 先替换再关闭旧客户端，关闭期间并发进入的协程直接使用新客户端
+            stale = self._async_client
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                max_retries=0
+            )
+            self._async_loop = loop
+            await _close_async_client(stale)
+        return self._async_client
+    
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """使用 AsyncOpenAI 的原生异步实现"""
+        if not self.client:
+            raise XHSException("OpenAI 客户端未初始化，请检查配置")
+        usage_ledger.check_budget()
+        
+        return await _openai_compatible_achat(
+            await self._get_async_client(), self.provider, self.model, messages,
+            temperature or self.temperature, max_tokens or self.max_tokens, self.timeout
+        )
+    
+    async def aclose(self):
+        """关闭异步客户端的连接池"""
+        async_client, self._async_client, self._async_loop = self._async_client, None, None
+        await _close_async_client(async_client)
+    
     def is_available(self) -> bool:
         """检查客户端是否可用"""
         return self.client is not None
@@ -195,6 +636,11 @@ class ZhipuAIClient(BaseAIClient):
     支持智谱 AI 的 GLM 系列模型。
     """
     
+    provider = "zhipu"
+    
+    # 智谱的 OpenAI 兼容端点（用于异步调用）
+    OPENAI_COMPATIBLE_BASE_URL = "https://open.bigmodel.cn/api/paas/v4/"
+    
     def __init__(self, ai_config: Optional[AIConfig] = None, **kwargs):
         """
         初始化智谱 AI 客户端
@@ -226,6 +672,8 @@ class ZhipuAIClient(BaseAIClient):
             self.max_tokens = kwargs.get('max_tokens') or config.ai.max_tokens
         
         self.client: Optional[ZhipuAI] = None
+        self._async_client = None
+        self._async_loop = None
         self._init_client()
     
     def _init_client(self):
@@ -237,7 +685,12 @@ class ZhipuAIClient(BaseAIClient):
             return
         
         try:
-            self.client = ZhipuAI(api_key=self.api_key)
+            # 重试由 AI_RETRY_POLICY 统一处理；与其他客户端共享连接池
+            self.client = ZhipuAI(
+                api_key=self.api_key,
+                max_retries=0,
+                http_client=AIClientFactory.get_http_client(self)
+            )
             logger.info(f" 智谱 AI 客户端初始化成功 - 模型: {self.model}")
         except Exception as e:
             logger.error(f"智谱 AI 客户端初始化失败: {e}")
@@ -252,23 +705,114 @@ class ZhipuAIClient(BaseAIClient):
         """实现 chat 方法"""
         if not self.client:
             raise XHSException("智谱 AI 客户端未初始化，请检查配置")
+        usage_ledger.check_budget()
         
+        start_time = time.perf_counter()
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature or self.temperature,
-                max_tokens=max_tokens or self.max_tokens
-            )
+            with tracer.span("ai.chat", category="ai", provider=self.provider, model=self.model):
+                response = AI_RETRY_POLICY.call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature or self.temperature,
+                        max_tokens=max_tokens or self.max_tokens,
+                        timeout=bounded_timeout(config.ai.timeout)
+                    )
+                )
+            _record_ai_metrics(self.provider, self.model, time.perf_counter() - start_time, response)
             
             content = response.choices[0].message.content
-            logger.debug(f"AI 响应: {content[:100]}...")
+            logger.debug("AI 响应: %s...", content[:100])
             return content.strip()
         
         except Exception as e:
+            AI_REQUESTS_TOTAL.inc(provider=self.provider, status="error")
             logger.error(f"智谱 AI 请求失败: {e}")
             raise XHSException(f"智谱 AI 请求失败: {e}")
     
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """使用 stream=True 的流式实现（zhipuai SDK 的流式响应与 OpenAI 格式一致）"""
+        if not self.client:
+            raise XHSException("智谱 AI 客户端未初始化，请检查配置")
+        usage_ledger.check_budget()
+        
+        meter = _StreamMeter(self.provider, self.model)
+        try:
+            with tracer.span("ai.chat_stream", category="ai", provider=self.provider, model=self.model):
+                stream = AI_RETRY_POLICY.call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature or self.temperature,
+                        max_tokens=max_tokens or self.max_tokens,
+                        timeout=bounded_timeout(config.ai.timeout),
+                        stream=True,
+                        # zhipuai SDK 的 create() 没有 stream_options 参数，通过 extra_body 传给服务端
+                        extra_body={"stream_options": {"include_usage": True}}
+                    )
+                )
+        except Exception as e:
+            AI_REQUESTS_TOTAL.inc(provider=self.provider, status="error")
+            logger.error(f"智谱 AI 流式请求失败: {e}")
+            raise XHSException(f"智谱 AI 流式请求失败: {e}")
+        
+        yield from _iter_openai_compatible_stream(stream, meter)
+    
+    async def _get_async_client(self):
+        """获取当前事件循环的异步客户端
+        
+        zhipuai SDK 没有异步的 chat 接口，这里通过智谱的 OpenAI 兼容端点使用 AsyncOpenAI；
+        未安装 openai 时返回 None。
+        """
+        try:
+            from openai import AsyncOpenAI
+        except ImportError:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            # 先替换再关闭旧客户端，关闭期间并发进入的协程直接使用新客户端
+            stale = self._async_client
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.OPENAI_COMPATIBLE_BASE_URL,
+                timeout=config.ai.timeout,
+                max_retries=0
+            )
+            self._async_loop = loop
+            await _close_async_client(stale)
+        return self._async_client
+    
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """原生异步实现，未安装 openai 时退回线程池"""
+        if not self.client:
+            raise XHSException("智谱 AI 客户端未初始化，请检查配置")
+        usage_ledger.check_budget()
+        
+        async_client = await self._get_async_client()
+        if async_client is None:
+            return await super().achat(messages, temperature, max_tokens)
+        
+        return await _openai_compatible_achat(
+            async_client, self.provider, self.model, messages,
+            temperature or self.temperature, max_tokens or self.max_tokens, config.ai.timeout
+        )
+    
+    async def aclose(self):
+        """关闭异步客户端的连接池"""
+        async_client, self._async_client, self._async_loop = self._async_client, None, None
+        await _close_async_client(async_client)
+    
     def is_available(self) -> bool:
         """检查客户端是否可用"""
         return self.client is not None
@@ -282,6 +826,195 @@ class ZhipuAIClient(BaseAIClient):
         }
 
 
+class OllamaClient(BaseAIClient):
+    """Ollama 本地模型客户端
+    
+    使用 Ollama 原生的 /api/chat 接口（保留 system/user/assistant 角色），
+    通过持久 HTTP 会话复用连接，并用 keep_alive 让模型常驻内存。
+    构造时发送一次预热请求加载模型，首个真实请求不再承担模型加载时间。
+    """
+    
+    provider = "ollama"
+    
+    def __init__(self, ai_config: Optional[AIConfig] = None, **kwargs):
+        """
+        初始化 Ollama 客户端
+        
+        Args:
+            ai_config: 与其他客户端保持一致的构造参数。其中的 model / temperature / max_tokens / timeout
+                是 OpenAI 兼容接口的设置，不会覆盖 Ollama 的配置，Ollama 的设置通过 kwargs 传入
+            **kwargs: 单独传入的参数
+                host: Ollama 服务地址，默认 config.ai.ollama_host
+                model: 模型名称，默认 config.ai.ollama_model
+                temperature: 温度参数
+                max_tokens: 最大生成 token 数（对应 num_predict）
+                timeout: 超时时间
+                keep_alive: 模型常驻时间（如 "30m"，-1 表示一直常驻）
+                warm_up: 是否在构造时预热模型，默认 True
+        """
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+        except ImportError:
+            raise XHSException("请安装 requests: pip install requests")
+        
+        self.host = (kwargs.get('host') or config.ai.ollama_host).rstrip('/')
+        self.model = kwargs.get('model') or config.ai.ollama_model
+        self.temperature = kwargs.get('temperature') or config.ai.temperature
+        self.max_tokens = kwargs.get('max_tokens') or config.ai.max_tokens
+        self.timeout = kwargs.get('timeout') or config.ai.timeout
+        self.keep_alive = kwargs.get('keep_alive', config.ai.ollama_keep_alive)
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.ai.http_pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._available = False
+        if kwargs.get('warm_up', True):
+            self.warm_up()
+    
+    def warm_up(self) -> bool:
+        """
+        预热模型：发送空消息的 chat 请求，Ollama 只加载模型不生成内容
+        
+        Returns:
+            True 如果模型已加载
+        """
+        start_time = time.perf_counter()
+        try:
+            response = self.session.post(
+                f"{self.host}/api/chat",
+                json={"model": self.model, "messages": [], "keep_alive": self.keep_alive},
+                timeout=max(self.timeout, 120)  # 首次加载大模型可能较慢
+            )
+            response.raise_for_status()
+            self._available = True
+            logger.info(f" Ollama 模型已加载 - {self.model} ({time.perf_counter() - start_time:.2f}s)")
+        except Exception as e:
+            self._available = False
+            logger.warning(f"Ollama 模型预热失败（{self.host}）: {e}")
+        return self._available
+    
+    def _payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        stream: bool
+    ) -> Dict[str, Any]:
+        """构造 /api/chat 请求体"""
+        return {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": temperature or self.temperature,
+                "num_predict": max_tokens or self.max_tokens,
+            },
+        }
+    
+    def _post(self, payload: Dict[str, Any], stream: bool = False):
+        """发送 /api/chat 请求，HTTP 错误转换为异常"""
+        response = self.session.post(
+            f"{self.host}/api/chat",
+            json=payload,
+            timeout=bounded_timeout(self.timeout),
+            stream=stream
+        )
+        response.raise_for_status()
+        return response
+    
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """实现 chat 方法"""
+        usage_ledger.check_budget()
+        payload = self._payload(messages, temperature, max_tokens, stream=False)
+        start_time = time.perf_counter()
+        try:
+            with tracer.span("ai.chat", category="ai", provider=self.provider, model=self.model):
+                result = AI_RETRY_POLICY.call(lambda: self._post(payload).json())
+            _record_ai_usage(
+                self.provider, self.model, time.perf_counter() - start_time,
+                result.get("prompt_eval_count", 0), result.get("eval_count", 0)
+            )
+            
+            content = result["message"]["content"]
+            logger.debug("AI 响应: %s...", content[:100])
+            return content.strip()
+        
+        except Exception as e:
+            AI_REQUESTS_TOTAL.inc(provider=self.provider, status="error")
+            logger.error(f"Ollama 请求失败: {e}")
+            raise XHSException(f"Ollama 请求失败: {e}")
+    
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """流式实现：Ollama 每行返回一个 JSON 片段，最后一行带 done 和 eval_count"""
+        usage_ledger.check_budget()
+        payload = self._payload(messages, temperature, max_tokens, stream=True)
+        meter = _StreamMeter(self.provider, self.model)
+        try:
+            with tracer.span("ai.chat_stream", category="ai", provider=self.provider, model=self.model):
+                response = AI_RETRY_POLICY.call(lambda: self._post(payload, stream=True))
+        except Exception as e:
+            AI_REQUESTS_TOTAL.inc(provider=self.provider, status="error")
+            logger.error(f"Ollama 流式请求失败: {e}")
+            raise XHSException(f"Ollama 流式请求失败: {e}")
+        
+        with response:
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise XHSException(chunk["error"])
+                    delta = chunk.get("message", {}).get("content")
+                    if delta:
+                        meter.on_delta()
+                        yield delta
+                    if chunk.get("done"):
+                        meter.completion_tokens = chunk.get("eval_count")
+                        meter.prompt_tokens = chunk.get("prompt_eval_count", 0)
+            except Exception as e:
+                AI_REQUESTS_TOTAL.inc(provider=self.provider, status="error")
+                logger.error(f"Ollama 流式响应中断: {e}")
+                raise XHSException(f"Ollama 流式响应中断: {e}")
+        meter.finish()
+    
+    def is_available(self) -> bool:
+        """检查服务是否可用（预热成功后不再重复探测）"""
+        if self._available:
+            return True
+        try:
+            self._available = self.session.get(f"{self.host}/api/tags", timeout=3).status_code == 200
+        except Exception:
+            self._available = False
+        return self._available
+    
+    def close(self):
+        """关闭 HTTP 会话"""
+        self.session.close()
+    
+    def get_client_info(self) -> Dict[str, Any]:
+        """获取客户端信息"""
+        return {
+            "name": "Ollama",
+            "model": self.model,
+            "base_url": self.host
+        }
+
+
 class AIClientFactory:
     """
     AI 客户端工厂类
@@ -294,12 +1027,25 @@ class AIClientFactory:
     _clients: Dict[str, type] = {
         "openai": OpenAIClient,
         "zhipu": ZhipuAIClient,
+        "ollama": OllamaClient,
+        # 组合客户端在独立模块中实现，首次使用时再导入（"模块:类名"）
+        "router": "core.ai_router:RoutingAIClient",
     }
     
     # 默认客户端类型
     # 使用 openai 可以兼容 Ollama 本地模型（通过配置 base_url）
     _default_client = "openai"
     
+    # 进程内复用的客户端实例：键为 "类型:配置哈希"
+    _instances: Dict[str, BaseAIClient] = {}
+    _instances_lock = threading.Lock()
+    
+    # 所有同步客户端共享的 HTTP 连接池（httpx.Client）
+    _http_client = None
+    # 各连接池的持有者（客户端实例）数量；shutdown 后仍被持有的旧连接池在最后一个持有者释放时关闭
+    _http_client_holders: Dict[Any, int] = {}
+    _http_client_lock = threading.RLock()
+    
     @classmethod
     def register_client(cls, name: str, client_class: type):
         """
@@ -346,12 +1092,18 @@ class AIClientFactory:
         logger.info(f" 设置默认 AI 客户端: {name}")
     
     @classmethod
-    def create_client(cls, client_type: Optional[str] = None, **kwargs) -> BaseAIClient:
+    def create_client(
+        cls,
+        client_type: Optional[str] = None,
+        cached: Optional[bool] = None,
+        **kwargs
+    ) -> BaseAIClient:
         """
         创建 AI 客户端实例
         
         Args:
             client_type: 客户端类型，为 None 则使用默认类型
+            cached: 是否用 CachedAIClient 包装，为 None 则使用 config.ai.cache_enabled
             **kwargs: 传递给客户端构造函数的参数
             
         Returns:
@@ -363,6 +1115,7 @@ class AIClientFactory:
         Example:
             >>> client = AIClientFactory.create_client("openai", api_key="sk-xxx")
             >>> client = AIClientFactory.create_client()  # 使用默认
+            >>> client = AIClientFactory.create_client("zhipu", cached=True)  # 带响应缓存
         """
         client_type = (client_type or cls._default_client).lower()
         
@@ -373,7 +1126,144 @@ class AIClientFactory:
             )
         
         client_class = cls._clients[client_type]
-        return client_class(**kwargs)
+        if isinstance(client_class, str):
+            module_name, class_name = client_class.split(":")
+            client_class = getattr(importlib.import_module(module_name), class_name)
+            cls._clients[client_type] = client_class
+        client = client_class(**kwargs)
+
+        if cached is None:
+            cached = config.ai.cache_enabled
+        if cached:
+            from .ai_cache import CachedAIClient
+            client = CachedAIClient(
+                client,
+                db_path=config.ai.cache_path,
+                ttl=config.ai.cache_ttl,
+                max_entries=config.ai.cache_max_entries,
+                max_cacheable_temperature=config.ai.cache_max_temperature
+            )
+        return client
+    
+    @classmethod
+    def get_client(
+        cls,
+        client_type: Optional[str] = None,
+        cached: Optional[bool] = None,
+        **kwargs
+    ) -> BaseAIClient:
+        """
+        获取可复用的 AI 客户端实例
+        
+        相同类型、相同参数（以及相同的 config.ai 配置）返回同一个实例，
+        不同的 AIManager 因此共用已建立的连接。参数同 create_client。
+        
+        Returns:
+            AI 客户端实例
+            
+        Example:
+            >>> AIClientFactory.get_client("zhipu") is AIClientFactory.get_client("zhipu")
+            True
+        """
+        client_type = (client_type or cls._default_client).lower()
+        if cached is None:
+            cached = config.ai.cache_enabled
+        key = f"{client_type}:{cls._config_hash(cached, kwargs)}"
+        
+        with cls._instances_lock:
+            client = cls._instances.get(key)
+            if client is not None:
+                AI_CLIENT_REGISTRY_TOTAL.inc(client=client_type, result="hit")
+                return client
+            client = cls.create_client(client_type, cached=cached, **kwargs)
+            cls._instances[key] = client
+            AI_CLIENT_REGISTRY_TOTAL.inc(client=client_type, result="create")
+            return client
+    
+    @staticmethod
+    def _config_hash(cached: bool, kwargs: Dict[str, Any]) -> str:
+        """计算客户端配置哈希（包含构造参数和当前的 config.ai）"""
+        payload = {
+            'cached': cached,
+            'config': asdict(config.ai),
+            'kwargs': {k: asdict(v) if is_dataclass(v) else v for k, v in kwargs.items()},
+        }
+        canonical = json.dumps(payload, sort_keys=True, default=repr)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+    
+    @classmethod
+    def get_http_client(cls, holder: Any = None):
+        """
+        获取共享的 httpx.Client（keep-alive 连接池，大小由 config.ai.http_pool_size 控制）
+        
+        Args:
+            holder: 使用连接池的客户端实例。登记后 shutdown() 不会关闭它仍在使用的连接池，
+                改为在该连接池的最后一个持有者被回收时关闭
+        
+        Returns:
+            httpx.Client，未安装 httpx 时返回 None（SDK 自行创建连接池）
+        """
+        with cls._http_client_lock:
+            if cls._http_client is None:
+                try:
+                    import httpx
+                except ImportError:
+                    return None
+                cls._http_client = httpx.Client(
+                    timeout=config.ai.timeout,
+                    limits=httpx.Limits(
+                        max_connections=config.ai.http_pool_size,
+                        max_keepalive_connections=config.ai.http_pool_size,
+                        keepalive_expiry=config.ai.http_keepalive_expiry
+                    )
+                )
+            http_client = cls._http_client
+            if holder is not None:
+                cls._http_client_holders[http_client] = cls._http_client_holders.get(http_client, 0) + 1
+                weakref.finalize(holder, cls._release_http_client, http_client)
+            return http_client
+    
+    @classmethod
+    def _release_http_client(cls, http_client):
+        """持有者被回收：已从工厂摘下的连接池在没有持有者后关闭"""
+        with cls._http_client_lock:
+            remaining = cls._http_client_holders.get(http_client, 0) - 1
+            if remaining > 0:
+                cls._http_client_holders[http_client] = remaining
+                return
+            cls._http_client_holders.pop(http_client, None)
+            if http_client is not cls._http_client:
+                http_client.close()
+                logger.debug("AI 旧连接池的最后一个持有者已释放，连接池已关闭")
+    
+    @classmethod
+    def shutdown(cls):
+        """
+        释放所有复用的客户端并摘下共享连接池
+        
+        之后再调用 get_client / create_client 会使用新的连接池。
+        旧连接池仍被注册表之外的客户端（create_client 创建、传给 AIManager 或被 CachedAIClient
+        包装的实例）持有时不会立即关闭，这些客户端可以继续使用，最后一个持有者被回收时再关闭。
+        """
+        with cls._instances_lock:
+            instances = list(cls._instances.values())
+            cls._instances.clear()
+        for client in instances:
+            close = getattr(client, 'close', None)
+            if callable(close):
+                close()
+        # 释放引用，只被注册表持有的客户端随即回收，不再占用连接池
+        instances = client = None
+        with cls._http_client_lock:
+            http_client, cls._http_client = cls._http_client, None
+            if http_client is None:
+                return
+            holders = cls._http_client_holders.get(http_client, 0)
+            if holders:
+                logger.debug(f"AI 共享连接池仍有 {holders} 个客户端在使用，最后一个释放时关闭")
+            else:
+                http_client.close()
+                logger.debug("AI 共享连接池已关闭")
     
     @classmethod
     def list_clients(cls) -> List[str]:
@@ -386,5 +1276,7 @@ class AIClientFactory:
         return list(cls._clients.keys())
 
 
+atexit.register(AIClientFactory.shutdown)
+
 # 为了向后兼容，保留 AIClient 别名
 AIClient = OpenAIClient
@@ -0,0 +1,316 @@
+"""AI 路由模块 - 按延迟选择后端，带熔断与对冲请求"""
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from core.ai_client import AIClientFactory, BaseAIClient
+from core.ai_usage import usage_ledger
+from core.config import config
+from core.exceptions import XHSException
+from core.logger import logger
+from core.metrics import metrics
+from core.tracing import tracer
+
+ROUTER_REQUESTS_TOTAL = metrics.counter(
+    "xhs_ai_router_requests_total", "路由客户端对各后端的请求结果", ["backend", "outcome"]
+)
+ROUTER_HEDGES_TOTAL = metrics.counter(
+    "xhs_ai_router_hedges_total", "对冲请求次数（按最终胜出方）", ["winner"]
+)
+ROUTER_CIRCUIT_OPEN = metrics.gauge(
+    "xhs_ai_router_circuit_open", "后端熔断状态（1 为熔断中）", ["backend"]
+)
+
+
+class _BackendFailed(Exception):
+    """一轮尝试中所有已发出的请求都失败"""
+
+    def __init__(self, tried: List['Backend'], errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.tried = tried
+        self.errors = errors
+
+
+class Backend:
+    """路由中的一个后端及其滚动统计（延迟分位数、错误率、熔断状态）"""
+
+    def __init__(self, name: str, client: BaseAIClient, window: int = 50):
+        """初始化后端
+
+        Args:
+            name: 后端名称
+            client: AI 客户端
+            window: 滚动窗口大小（最近 N 次请求）
+        """
+        self.name = name
+        self.client = client
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, elapsed: float):
+        """记录成功请求，关闭熔断"""
+        with self._lock:
+            self.latencies.append(elapsed)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+        ROUTER_CIRCUIT_OPEN.set(0, backend=self.name)
+
+    def record_failure(self, failure_threshold: int, cooldown: float):
+        """记录失败请求，连续失败达到阈值时熔断 cooldown 秒"""
+        with self._lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            tripped = self.consecutive_failures >= failure_threshold
+            if tripped:
+                self.open_until = time.monotonic() + cooldown
+        if tripped:
+            ROUTER_CIRCUIT_OPEN.set(1, backend=self.name)
+            logger.warning(f"AI 后端 {self.name} 连续失败 {self.consecutive_failures} 次，熔断 {cooldown:.0f}s")
+
+    @property
+    def circuit_open(self) -> bool:
+        """是否处于熔断期（冷却结束后放行请求试探，成功即恢复）"""
+        return time.monotonic() < self.open_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        """滚动窗口内的延迟分位数，没有样本时返回 None"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+        return samples[index]
+
+    @property
+    def error_rate(self) -> float:
+        """滚动窗口内的错误率"""
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def score(self) -> float:
+        """路由评分（越小越好）：p50 按成功率放大；没有样本的后端优先试探"""
+        p50 = self.percentile(0.5)
+        if p50 is None:
+            return 0.0
+        return p50 / max(1.0 - self.error_rate, 0.1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'error_rate': self.error_rate,
+            'samples': len(self.outcomes),
+            'circuit_open': self.circuit_open,
+        }
+
+
+class RoutingAIClient(BaseAIClient):
+    """组合 AI 客户端 - 把请求路由到当前最快的健康后端
+
+    - 每个后端记录最近请求的 p50/p95 延迟和错误率，按成功率修正后的 p50 排序
+    - 连续失败达到阈值的后端熔断一段时间，期间不参与路由
+    - 请求失败时依次切换到下一个后端
+    - 开启对冲时，首选后端超过其 p95 仍未返回，就向下一个后端再发一次请求，取先返回的结果
+
+    Example:
+        >>> client = AIClientFactory.create_client("router", backends=["zhipu", "ollama"], hedge=True)
+        >>> manager = AIManager(client=client)
+    """
+
+    def __init__(
+        self,
+        backends: Optional[Sequence[Union[str, BaseAIClient]]] = None,
+        hedge: Optional[bool] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        window: int = 50,
+        hedge_min_samples: int = 10
+    ):
+        """初始化路由客户端
+
+        Args:
+            backends: 后端列表，元素为客户端类型名（通过 AIClientFactory.get_client 获取）或客户端实例；
+                      None 则使用 config.ai.router_backends
+            hedge: 是否开启对冲请求，None 则使用 config.ai.router_hedge
+            failure_threshold: 触发熔断的连续失败次数，None 则使用 config.ai.router_failure_threshold
+            cooldown: 熔断时长（秒），None 则使用 config.ai.router_cooldown
+            window: 延迟统计的滚动窗口大小
+            hedge_min_samples: 首选后端至少有多少个样本后才按 p95 对冲
+        """
+        if backends is None:
+            backends = [name.strip() for name in config.ai.router_backends.split(",") if name.strip()]
+        if not backends:
+            raise ValueError("路由客户端至少需要一个后端，请传入 backends 或配置 config.ai.router_backends")
+
+        self.backends: List[Backend] = []
+        for item in backends:
+            if isinstance(item, str):
+                self.backends.append(Backend(item, AIClientFactory.get_client(item), window))
+            elif isinstance(item, BaseAIClient):
+                name = item.get_client_info().get('name', type(item).__name__)
+                self.backends.append(Backend(name, item, window))
+            else:
+                raise ValueError(f"不支持的后端: {item!r}")
+
+        self.hedge = config.ai.router_hedge if hedge is None else hedge
+        self.failure_threshold = failure_threshold or config.ai.router_failure_threshold
+        self.cooldown = config.ai.router_cooldown if cooldown is None else cooldown
+        self.hedge_min_samples = hedge_min_samples
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, 2 * len(self.backends)), thread_name_prefix="xhs-ai-router"
+        )
+        logger.info(f" AI 路由客户端初始化 - 后端: {[b.name for b in self.backends]}, 对冲: {self.hedge}")
+
+    def _rank(self) -> List[Backend]:
+        """按评分排序的未熔断后端"""
+        healthy = [b for b in self.backends if not b.circuit_open]
+        return sorted(healthy, key=lambda b: b.score())
+
+    def _timed_call(self, backend: Backend, call: Callable[[BaseAIClient], str]) -> str:
+        """调用单个后端并记录延迟与结果"""
+        start_time = time.perf_counter()
+        try:
+            with tracer.span("ai.router.backend", category="ai", backend=backend.name):
+                result = call(backend.client)
+        except Exception:
+            backend.record_failure(self.failure_threshold, self.cooldown)
+            ROUTER_REQUESTS_TOTAL.inc(backend=backend.name, outcome="error")
+            raise
+        backend.record_success(time.perf_counter() - start_time)
+        ROUTER_REQUESTS_TOTAL.inc(backend=backend.name, outcome="ok")
+        return result
+
+    def _submit(self, backend: Backend, call: Callable[[BaseAIClient], str]):
+        """在线程池中调用后端（携带当前上下文：截止时间、缓存开关、追踪 span）"""
+        return self._executor.submit(contextvars.copy_context().run, self._timed_call, backend, call)
+
+    def _attempt(self, primary: Backend, secondary: Optional[Backend], call: Callable[[BaseAIClient], str]) -> str:
+        """向首选后端发请求，必要时对冲到 secondary
+
+        Raises:
+            _BackendFailed: 所有已发出的请求都失败
+        """
+        hedge_delay = None
+        if secondary is not None and len(primary.latencies) >= self.hedge_min_samples:
+            hedge_delay = primary.percentile(0.95)
+
+        if hedge_delay is None:
+            try:
+                return self._timed_call(primary, call)
+            except Exception as e:
+                raise _BackendFailed([primary], [f"{primary.name}: {e}"])
+
+        futures = {self._submit(primary, call): primary}
+        done, _ = wait(futures, timeout=hedge_delay)
+        if not done:
+            logger.debug("AI 后端 %s 超过 p95 (%.2fs)，对冲到 %s", primary.name, hedge_delay, secondary.name)
+            futures[self._submit(secondary, call)] = secondary
+
+        errors = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(f"{futures[future].name}: {e}")
+                    continue
+                if len(futures) > 1:
+                    # 落后的请求在后台继续完成，结果只用于更新统计
+                    ROUTER_HEDGES_TOTAL.inc(winner="primary" if futures[future] is primary else "hedge")
+                return result
+        raise _BackendFailed(list(futures.values()), errors)
+
+    def _route(self, call: Callable[[BaseAIClient], str]) -> str:
+        """按排序依次尝试后端，直到成功"""
+        candidates = self._rank()
+        if not candidates:
+            raise XHSException("没有可用的 AI 后端（全部处于熔断中）")
+
+        errors: List[str] = []
+        while candidates:
+            primary = candidates.pop(0)
+            secondary = candidates[0] if self.hedge and candidates else None
+            try:
+                return self._attempt(primary, secondary, call)
+            except _BackendFailed as e:
+                errors.extend(e.errors)
+                candidates = [b for b in candidates if b not in e.tried]
+                if candidates:
+                    logger.warning(f"AI 后端 {primary.name} 请求失败，切换到 {candidates[0].name}")
+        raise XHSException(f"所有 AI 后端均请求失败: {'; '.join(errors)}")
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """路由 chat 请求"""
+        usage_ledger.check_budget()
+        with tracer.span("ai.router.chat", category="ai"):
+            return self._route(lambda client: client.chat(messages, temperature=temperature, max_tokens=max_tokens))
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """流式请求：使用排序最靠前的后端，只在产出首个片段前失败时切换（不对冲）"""
+        errors: List[str] = []
+        for backend in self._rank():
+            start_time = time.perf_counter()
+            started = False
+            try:
+                for delta in backend.client.chat_stream(messages, temperature=temperature, max_tokens=max_tokens):
+                    started = True
+                    yield delta
+            except Exception as e:
+                backend.record_failure(self.failure_threshold, self.cooldown)
+                ROUTER_REQUESTS_TOTAL.inc(backend=backend.name, outcome="error")
+                if started:
+                    raise
+                errors.append(f"{backend.name}: {e}")
+                continue
+            backend.record_success(time.perf_counter() - start_time)
+            ROUTER_REQUESTS_TOTAL.inc(backend=backend.name, outcome="ok")
+            return
+        raise XHSException(f"所有 AI 后端均请求失败: {'; '.join(errors) or '全部处于熔断中'}")
+
+    def is_available(self) -> bool:
+        """任一未熔断的后端可用即可用"""
+        return any(b.client.is_available() for b in self._rank())
+
+    def get_client_info(self) -> Dict[str, Any]:
+        """获取客户端信息"""
+        return {
+            "name": "Router",
+            "backends": [b.name for b in self.backends],
+            "hedge": self.hedge,
+        }
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各后端的延迟、错误率和熔断状态"""
+        return {b.name: b.get_stats() for b in self.backends}
+
+    async def aclose(self):
+        """释放各后端客户端的异步资源"""
+        for backend in self.backends:
+            await backend.client.aclose()
+
+    def close(self):
+        """关闭线程池（后端客户端由各自的所有者管理）"""
+        self._executor.shutdown(wait=False)
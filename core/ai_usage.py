@@ -0,0 +1,241 @@
+"""AI 用量统计模块 - 按业务操作与风格归集 token、延迟和缓存命中"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.config import config
+from core.exceptions import TokenBudgetExceeded
+from core.logger import logger
+from core.metrics import metrics
+from core.models import AIUsage
+
+AI_BUDGET_REJECTIONS_TOTAL = metrics.counter(
+    "xhs_ai_budget_rejections_total", "因 token 预算用尽被拒绝的 AI 调用次数"
+)
+
+_GROUP_FIELDS = ('operation', 'style', 'provider', 'model')
+
+
+class UsageScope:
+    """一段代码内的 AI 调用归属（业务操作、风格），同时收集范围内的用量记录"""
+
+    def __init__(self, operation: Optional[str], style: Optional[str], parent: Optional['UsageScope']):
+        self.operation = operation or (parent.operation if parent else None)
+        self.style = style or (parent.style if parent else None)
+        self.parent = parent
+        self.usages: List[AIUsage] = []
+
+    @property
+    def total_tokens(self) -> int:
+        """范围内消耗的总 token 数"""
+        return sum(u.total_tokens for u in self.usages)
+
+
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar('xhs_ai_usage_scope', default=None)
+
+
+@contextmanager
+def usage_scope(operation: Optional[str] = None, style: Optional[str] = None):
+    """把范围内的 AI 调用归属到指定的业务操作和风格
+
+    嵌套时未指定的字段继承外层；内层的用量同时计入外层范围。
+
+    Example:
+        >>> with usage_scope("generate_xiaohongshu_post", style="fairy") as scope:
+        ...     client.generate_text("...")
+        >>> scope.total_tokens
+    """
+    scope = UsageScope(operation, style, _current_scope.get())
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+class UsageLedger:
+    """AI 用量账本
+
+    进程内按 (操作, 风格, provider, 模型) 聚合，可选持久化到 SQLite，
+    并支持 token 硬预算：累计用量达到预算后，新的 AI 请求直接抛出 TokenBudgetExceeded。
+    """
+
+    def __init__(self, db_path: Optional[str] = None, token_budget: int = 0):
+        """初始化账本
+
+        Args:
+            db_path: SQLite 路径，None 或空字符串表示只在内存中统计
+            token_budget: token 预算，0 表示不限制
+        """
+        self.db_path = db_path or None
+        self.token_budget = token_budget
+        self._lock = threading.Lock()
+        self._aggregates: Dict[tuple, Dict[str, float]] = {}
+        self._tokens_used = 0
+        self._db_ready = False
+
+    def _init_database(self):
+        """首次写入时创建表结构"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ai_usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    model TEXT,
+                    operation TEXT,
+                    style TEXT,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    latency REAL NOT NULL,
+                    cached INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_usage_created_at ON ai_usage(created_at)')
+        self._db_ready = True
+
+    def record(self, usage: AIUsage) -> AIUsage:
+        """记录一次调用（未指定归属时使用当前 usage_scope）
+
+        Args:
+            usage: 用量记录
+
+        Returns:
+            补全归属后的记录
+        """
+        scope = _current_scope.get()
+        if scope is not None:
+            usage.operation = usage.operation or scope.operation
+            usage.style = usage.style or scope.style
+        while scope is not None:
+            scope.usages.append(usage)
+            scope = scope.parent
+
+        key = (usage.operation, usage.style, usage.provider, usage.model)
+        with self._lock:
+            bucket = self._aggregates.setdefault(key, {
+                'calls': 0, 'cached_calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'latency': 0.0
+            })
+            bucket['calls'] += 1
+            bucket['cached_calls'] += int(usage.cached)
+            bucket['prompt_tokens'] += usage.prompt_tokens
+            bucket['completion_tokens'] += usage.completion_tokens
+            bucket['latency'] += usage.latency
+            self._tokens_used += usage.total_tokens
+
+        if self.db_path:
+            self._persist(usage)
+        return usage
+
+    def _persist(self, usage: AIUsage):
+        """写入 SQLite（失败只记录日志，不影响 AI 调用）"""
+        try:
+            if not self._db_ready:
+                self._init_database()
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('''
+                    INSERT INTO ai_usage (created_at, provider, model, operation, style,
+                                          prompt_tokens, completion_tokens, latency, cached)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    usage.created_at.isoformat(), usage.provider, usage.model, usage.operation, usage.style,
+                    usage.prompt_tokens, usage.completion_tokens, usage.latency, int(usage.cached)
+                ))
+        except Exception as e:
+            logger.warning(f"写入 AI 用量记录失败: {e}")
+
+    def check_budget(self):
+        """预算已用尽时抛出 TokenBudgetExceeded（在发起 AI 请求前调用）"""
+        if self.token_budget and self._tokens_used >= self.token_budget:
+            AI_BUDGET_REJECTIONS_TOTAL.inc()
+            raise TokenBudgetExceeded(
+                f"AI token 预算已用尽: 已用 {self._tokens_used} / 预算 {self.token_budget}"
+            )
+
+    def set_budget(self, token_budget: int):
+        """设置 token 预算，0 表示不限制"""
+        self.token_budget = token_budget
+
+    @property
+    def tokens_used(self) -> int:
+        """本进程已消耗的 token 数"""
+        return self._tokens_used
+
+    def summary(self, by: str = 'operation') -> Dict[Any, Dict[str, float]]:
+        """按字段汇总进程内的用量
+
+        Args:
+            by: 分组字段，operation / style / provider / model
+
+        Returns:
+            {分组值: {'calls', 'cached_calls', 'prompt_tokens', 'completion_tokens', 'total_tokens', 'avg_latency'}}
+        """
+        if by not in _GROUP_FIELDS:
+            raise ValueError(f"不支持的分组字段: {by}，可用: {_GROUP_FIELDS}")
+        index = _GROUP_FIELDS.index(by)
+
+        result: Dict[Any, Dict[str, float]] = {}
+        with self._lock:
+            for key, bucket in self._aggregates.items():
+                group = result.setdefault(key[index], {
+                    'calls': 0, 'cached_calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'latency': 0.0
+                })
+                for name, value in bucket.items():
+                    group[name] += value
+        return {group: _finalize(values) for group, values in result.items()}
+
+    def query(self, by: str = 'operation', since: Optional[datetime] = None) -> Dict[Any, Dict[str, float]]:
+        """从 SQLite 账本按字段汇总历史用量（跨进程）
+
+        Args:
+            by: 分组字段，operation / style / provider / model
+            since: 只统计此时间之后的记录
+
+        Returns:
+            格式同 summary()
+        """
+        if by not in _GROUP_FIELDS:
+            raise ValueError(f"不支持的分组字段: {by}，可用: {_GROUP_FIELDS}")
+        if not self.db_path or not Path(self.db_path).exists():
+            return {}
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(f'''
+                SELECT {by}, COUNT(*), SUM(cached), SUM(prompt_tokens), SUM(completion_tokens), SUM(latency)
+                FROM ai_usage WHERE created_at >= ? GROUP BY {by}
+            ''', ((since or datetime.min).isoformat(),)).fetchall()
+        return {
+            row[0]: _finalize({
+                'calls': row[1], 'cached_calls': row[2], 'prompt_tokens': row[3],
+                'completion_tokens': row[4], 'latency': row[5]
+            })
+            for row in rows
+        }
+
+    def reset(self):
+        """清空进程内的统计（不影响 SQLite 账本）"""
+        with self._lock:
+            self._aggregates.clear()
+            self._tokens_used = 0
+
+
+def _finalize(values: Dict[str, float]) -> Dict[str, float]:
+    """补充总 token 和平均延迟"""
+    calls = values['calls']
+    return {
+        'calls': calls,
+        'cached_calls': values['cached_calls'],
+        'prompt_tokens': values['prompt_tokens'],
+        'completion_tokens': values['completion_tokens'],
+        'total_tokens': values['prompt_tokens'] + values['completion_tokens'],
+        'avg_latency': values['latency'] / calls if calls else 0.0,
+    }
+
+
+# 全局用量账本（设置 config.ai.usage_db_path 后持久化）
+usage_ledger = UsageLedger(config.ai.usage_db_path, config.ai.token_budget)
@@ -0,0 +1,227 @@
+"""常驻浏览器模块 - 每个用户数据目录一个带调试端口的 Chrome，供多次运行接管"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.config import config
+from core.exceptions import BrowserInitError
+from core.logger import logger
+
+# 写在用户数据目录下的状态文件，记录常驻浏览器的进程号和调试端口
+STATE_FILE_NAME = "xhs_daemon.json"
+
+
+def find_chrome_binary() -> Optional[str]:
+    """查找 Chrome 可执行文件（优先使用 config.browser.chrome_binary）"""
+    if config.browser.chrome_binary:
+        return config.browser.chrome_binary
+
+    if sys.platform == "win32":
+        candidates = [
+            os.path.join(os.environ.get(env, ""), "Google", "Chrome", "Application", "chrome.exe")
+            for env in ("PROGRAMFILES", "PROGRAMFILES(X86)", "LOCALAPPDATA")
+        ]
+    elif sys.platform == "darwin":
+        candidates = ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"]
+    else:
+        candidates = [shutil.which(name) for name in
+                      ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")]
+    return next((c for c in candidates if c and os.path.exists(c)), None)
+
+
+def cached_driver_path(force_refresh: bool = False) -> str:
+    """获取 chromedriver 路径，解析结果缓存到 config.browser.driver_cache_path
+
+    ChromeDriverManager().install() 每次都要解析 Chrome 版本（可能访问网络），
+    缓存有效期内直接复用上次的路径；Chrome 升级导致会话创建失败时调用方应传 force_refresh=True。
+
+    Args:
+        force_refresh: 忽略缓存重新解析
+
+    Returns:
+        chromedriver 可执行文件路径
+    """
+    cache_path = Path(config.browser.driver_cache_path)
+    if not force_refresh and cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            fresh = time.time() - cached["resolved_at"] < config.browser.driver_cache_ttl
+            if fresh and os.path.exists(cached["path"]):
+                return cached["path"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"chromedriver 路径缓存无效: {e}")
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({"path": path, "resolved_at": time.time()}), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"写入 chromedriver 路径缓存失败: {e}")
+    return path
+
+
+class BrowserDaemon:
+    """常驻浏览器
+
+    以 --remote-debugging-port 启动一个长期运行的 Chrome，BrowserManager 通过 debuggerAddress 接管，
+    短任务不再承担 Chrome 冷启动和大体积用户目录的加载时间。进程号和端口记录在用户数据目录下，
+    同一个用户数据目录只会有一个常驻浏览器。
+
+    Example:
+        >>> daemon = BrowserDaemon()
+        >>> daemon.start()              # 或命令行: python -m core.browser_daemon start
+        >>> daemon.is_alive()
+        True
+    """
+
+    def __init__(self, user_data_dir: Optional[str] = None, port: Optional[int] = None):
+        """初始化常驻浏览器
+
+        Args:
+            user_data_dir: 用户数据目录，None 则使用 config.browser.get_user_data_dir()
+            port: 调试端口，None 则使用 config.browser.debug_port
+        """
+        self.user_data_dir = os.path.abspath(user_data_dir or config.browser.get_user_data_dir())
+        self.state_path = Path(self.user_data_dir) / STATE_FILE_NAME
+        state = self._read_state()
+        self.port = port or state.get("port") or config.browser.debug_port
+
+    @property
+    def debugger_address(self) -> str:
+        """供 ChromeOptions.debugger_address 使用的地址"""
+        return f"127.0.0.1:{self.port}"
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def version_info(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """请求调试端口的 /json/version，端口无响应时返回 None"""
+        try:
+            with urllib.request.urlopen(f"http://{self.debugger_address}/json/version", timeout=timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except (OSError, ValueError, urllib.error.URLError):
+            return None
+
+    def is_alive(self, timeout: float = 1.0) -> bool:
+        """存活检查：调试端口能正常返回版本信息"""
+        return self.version_info(timeout) is not None
+
+    def _command(self, chrome: str) -> List[str]:
+        """常驻浏览器的启动参数（与 BrowserManager 普通启动保持一致）"""
+        args = [
+            chrome,
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={self.user_data_dir}",
+            *config.browser.launch_arguments(),
+        ]
+        for arg in ("--no-first-run", "--no-default-browser-check"):
+            if arg not in args:
+                args.append(arg)
+        if config.browser.disable_automation:
+            args.append("--disable-blink-features=AutomationControlled")
+        return args
+
+    def start(self, timeout: float = 30.0) -> str:
+        """启动常驻浏览器（已在运行时直接返回）
+
+        Args:
+            timeout: 等待调试端口就绪的超时时间（秒）
+
+        Returns:
+            调试地址
+
+        Raises:
+            BrowserInitError: 找不到 Chrome 或超时未就绪
+        """
+        if self.is_alive():
+            return self.debugger_address
+
+        chrome = find_chrome_binary()
+        if not chrome:
+            raise BrowserInitError("未找到 Chrome 可执行文件，请设置 config.browser.chrome_binary")
+
+        Path(self.user_data_dir).mkdir(parents=True, exist_ok=True)
+        popen_kwargs: Dict[str, Any] = {
+            "stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL,
+        }
+        # 与当前进程脱离，退出 Python 后浏览器继续运行
+        if sys.platform == "win32":
+            popen_kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            popen_kwargs["start_new_session"] = True
+        process = subprocess.Popen(self._command(chrome), **popen_kwargs)
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.is_alive(timeout=0.5):
+                self.state_path.write_text(json.dumps({
+                    "pid": process.pid, "port": self.port, "chrome": chrome, "started_at": time.time()
+                }), encoding="utf-8")
+                logger.info(f"常驻浏览器已启动: pid={process.pid}, 调试地址 {self.debugger_address}")
+                return self.debugger_address
+            if process.poll() is not None:
+                raise BrowserInitError(f"常驻浏览器启动后立即退出（退出码 {process.returncode}），"
+                                       f"用户数据目录可能正被其他 Chrome 占用")
+            time.sleep(0.2)
+        raise BrowserInitError(f"常驻浏览器在 {timeout:.0f}s 内未就绪: {self.debugger_address}")
+
+    def stop(self):
+        """关闭常驻浏览器并删除状态文件"""
+        pid = self._read_state().get("pid")
+        # 端口无响应说明记录的进程已经退出，进程号可能已被复用，不能再发信号
+        if pid and self.is_alive():
+            try:
+                if sys.platform == "win32":
+                    subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"], capture_output=True)
+                else:
+                    # 浏览器以新会话启动，进程号即进程组号，一并结束渲染进程
+                    os.killpg(pid, signal.SIGTERM)
+                logger.info(f"常驻浏览器已关闭: pid={pid}")
+            except ProcessLookupError:
+                pass
+        self.state_path.unlink(missing_ok=True)
+
+    def status(self) -> Dict[str, Any]:
+        """状态信息"""
+        info = self.version_info()
+        return {
+            "user_data_dir": self.user_data_dir,
+            "debugger_address": self.debugger_address,
+            "alive": info is not None,
+            "browser": info.get("Browser") if info else None,
+            "pid": self._read_state().get("pid"),
+        }
+
+
+def main():
+    """命令行入口: python -m core.browser_daemon start|stop|status"""
+    parser = argparse.ArgumentParser(description="常驻浏览器管理")
+    parser.add_argument("action", choices=["start", "stop", "status"])
+    parser.add_argument("--user-data-dir", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args()
+
+    daemon = BrowserDaemon(args.user_data_dir, args.port)
+    if args.action == "start":
+        daemon.start()
+    elif args.action == "stop":
+        daemon.stop()
+    print(json.dumps(daemon.status(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,122 @@
 """浏览器管理模块"""
+import fnmatch
+import json
 import time
-from typing import Optional
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
 
 from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, StaleElementReferenceException, TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
 
+from core.browser_daemon import BrowserDaemon, cached_driver_path
 from core.config import config
-from core.decorators import retry, log_execution
-from core.exceptions import BrowserInitError, ElementNotFoundError
+from core.decorators import RetryPolicy, bounded_timeout, log_execution
+from core.exceptions import BrowserInitError, DeadlineExceeded, ElementNotFoundError
 from core.logger import logger
+from core.memory_governor import MemoryGovernor
+from core.metrics import metrics
+from core.page_scripts import PageScripts
+from core.tracing import tracer
+
+WEBDRIVER_CALL_SECONDS = metrics.histogram(
+    "xhs_webdriver_call_seconds", "WebDriver 命令往返耗时（秒）", ["op"]
+)
+CDP_CALL_SECONDS = metrics.histogram(
+    "xhs_cdp_call_seconds", "CDP 命令往返耗时（秒）", ["method"]
+)
+ELEMENT_WAIT_SECONDS = metrics.histogram(
+    "xhs_element_wait_seconds", "等待元素出现的耗时（秒）", ["outcome"]
+)
+ELEMENT_HANDLES_TOTAL = metrics.counter(
+    "xhs_element_handles_total", "元素句柄缓存结果（hit 不产生往返，stale 为过期后重新定位）", ["result"]
+)
+INPUT_ACTIONS_TOTAL = metrics.counter(
+    "xhs_input_actions_total", "点击/输入操作次数（fallback 为 cdp 方式失败后回退 webdriver）", ["action", "backend"]
+)
+PAGE_LOAD_SECONDS = metrics.histogram(
+    "xhs_page_load_seconds", "页面加载耗时（秒，导航开始到 load 事件），按网络配置区分", ["profile"]
+)
+PAGE_TRANSFER_BYTES_TOTAL = metrics.counter(
+    "xhs_page_transfer_bytes_total",
+    "页面传输字节数（性能日志中 Network.loadingFinished 的 encodedDataLength），按网络配置区分", ["profile"]
+)
+# 为统计传输字节数提前读出、尚未经 get_network_logs 返回的性能日志最多保留的条数
+NETWORK_LOG_BACKLOG_LIMIT = 10000
+
+BROWSER_START_SECONDS = metrics.histogram(
+    "xhs_browser_start_seconds", "浏览器就绪耗时（秒），attach 为接管常驻浏览器，launch 为冷启动", ["mode"]
+)
+
+# 元素查找：等待超时已经耗尽了 element_timeout，再等一遍没有意义；只有元素过期才值得重试
+ELEMENT_RETRY_POLICY = RetryPolicy(
+    max_attempts=2,
+    base_delay=0.5,
+    max_delay=2.0,
+    retryable=(StaleElementReferenceException,),
+    fatal=(ElementNotFoundError,),
+    name="browser.find_element_with_dom_cache"
+)
+
+# 页面导航：页面加载超时属于瞬时错误，可以退避后重试
+NAVIGATION_RETRY_POLICY = RetryPolicy(
+    max_attempts=3,
+    base_delay=1.0,
+    max_delay=8.0,
+    retryable=(TimeoutException,),
+    name="browser.navigate_to"
+)
+
+
+class CachedElement(WebElement):
+    """当前页面缓存的元素句柄
+
+    与普通 WebElement 用法相同；元素被页面重新渲染而过期（StaleElementReferenceException）时，
+    按原来的定位方式重新查找并替换句柄，然后重试这一次操作。
+    """
+
+    def __init__(self, element: WebElement, resolve: Callable[[], WebElement], epoch: int):
+        """初始化缓存句柄
+
+        Args:
+            element: 已定位到的元素
+            resolve: 重新定位元素的函数
+            epoch: 定位时的页面代数
+        """
+        super().__init__(element.parent, element.id)
+        self._resolve = resolve
+        self.epoch = epoch
+        # 最近一次测量的中心点坐标及测量时的布局代数（cdp 点击时作为复用候选，仍需命中检测）
+        self.box: Optional[dict] = None
+        self.box_epoch = -1
+
+    def refresh(self):
+        """重新定位元素，替换过期的句柄"""
+        ELEMENT_HANDLES_TOTAL.inc(result="stale")
+        self._id = self._resolve().id
+        self.box = None
+
+    def _retry_stale(self, action: Callable):
+        try:
+            return action()
+        except StaleElementReferenceException:
+            self.refresh()
+            return action()
+
+    def _execute(self, command, params=None):
+        return self._retry_stale(lambda: super(CachedElement, self)._execute(command, params))
+
+    # 以下方法通过 execute_script 实现，不经过 _execute
+    def get_attribute(self, name):
+        return self._retry_stale(lambda: super(CachedElement, self).get_attribute(name))
+
+    def is_displayed(self):
+        return self._retry_stale(lambda: super(CachedElement, self).is_displayed())
 
 
 class BrowserManager:
@@ -23,53 +126,183 @@ class BrowserManager:
         """初始化浏览器管理器"""
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
+        # 是否接管的常驻浏览器（quit 时只断开，不关闭浏览器）
+        self.attached = False
         # 延迟导入DOMManager以避免循环导入
         from core.dom_manager import DOMManager
         self.dom_manager: DOMManager = DOMManager()  # 添加DOM管理器
+        # 页面辅助脚本（每个文档注入一次，按名称调用）
+        self.page_scripts = PageScripts(self)
+        # 页面代数：每次导航加一，元素句柄只在同一代页面内复用
+        self.page_epoch = 0
+        self._handles: Dict[Tuple, CachedElement] = {}
+        # 布局代数：每次执行页面脚本（可能滚动页面）加一，缓存的元素坐标只在同一代内有效
+        self.layout_epoch = 0
+        # 当前网络配置（config.browser.network_profiles 中的名称）
+        self.network_profile = "default"
+        # 已读出但还没有交给 get_network_logs 调用方的性能日志（浏览器端读取后即清空）
+        self._network_log_backlog = []
+        # 内存治理：后台只采样进程树内存（PSS）；页面指标的采样以及清理/回收标签页/重启都在 checkpoint() 中执行
+        self.memory_governor = MemoryGovernor(self)
         self._init_driver()
+        if config.memory.enabled:
+            self.memory_governor.start()
 
+    @tracer.traced("browser.init_driver", category="browser")
     def _init_driver(self):
-        """配置并启动Chrome浏览器"""
+        """配置并启动Chrome浏览器（常驻浏览器模式下优先接管已运行的浏览器）"""
+        start_time = time.perf_counter()
         try:
-            options = webdriver.ChromeOptions()
-
-            # 浏览器配置
-            options.add_argument(config.browser.window_size)
-            options.add_argument(f"user-data-dir={config.browser.get_user_data_dir()}")
-
-            if config.browser.disable_automation:
-                options.add_argument("--disable-blink-features=AutomationControlled")
-                options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                options.add_experimental_option('useAutomationExtension', False)
-
-            if config.browser.headless:
-                options.add_argument("--headless")
-
-            # 启用网络日志
-            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
-
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=options
-            )
+            if not (config.browser.daemon_mode and self._attach_daemon()):
+                self.driver = self._create_driver(self.launch_options())
             self.wait = WebDriverWait(self.driver, config.wait.default_timeout)
 
             # 初始化DOM元素到数据库
             self._init_dom_elements()
 
-            logger.info("浏览器初始化成功")
+            mode = "attach" if self.attached else "launch"
+            BROWSER_START_SECONDS.observe(time.perf_counter() - start_time, mode=mode)
+            logger.info(f"浏览器初始化成功（{'接管常驻浏览器' if self.attached else '新启动'}）")
         except Exception as e:
             logger.error(f"浏览器初始化失败: {e}")
             raise BrowserInitError(f"浏览器初始化失败: {e}")
 
+    @staticmethod
+    def launch_options(preset: Optional[str] = None, user_data_dir: Optional[str] = None) -> webdriver.ChromeOptions:
+        """冷启动使用的浏览器选项
+
+        Args:
+            preset: 启动预设名称，None 时使用 config.browser.launch_preset
+            user_data_dir: 用户数据目录，None 时使用配置中的目录
+
+        Returns:
+            ChromeOptions
+        """
+        options = webdriver.ChromeOptions()
+
+        # 浏览器配置（窗口大小、无头模式与启动预设）
+        for arg in config.browser.launch_arguments(preset):
+            options.add_argument(arg)
+        options.add_argument(f"user-data-dir={user_data_dir or config.browser.get_user_data_dir()}")
+
+        if config.browser.disable_automation:
+            options.add_argument("--disable-blink-features=AutomationControlled")
+            options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            options.add_experimental_option('useAutomationExtension', False)
+
+        # 启用网络日志
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return options
+
+    @staticmethod
+    def _create_driver(options: webdriver.ChromeOptions) -> webdriver.Chrome:
+        """使用缓存的 chromedriver 路径创建会话，版本不匹配时重新解析一次"""
+        try:
+            return webdriver.Chrome(service=Service(cached_driver_path()), options=options)
+        except SessionNotCreatedException as e:
+            # Chrome 升级后缓存的 chromedriver 版本不再匹配
+            logger.info(f"chromedriver 与浏览器版本不匹配，重新解析: {e.msg}")
+            return webdriver.Chrome(service=Service(cached_driver_path(force_refresh=True)), options=options)
+
+    def _attach_daemon(self) -> bool:
+        """接管当前用户数据目录的常驻浏览器，不可用时返回 False（由调用方回退为冷启动）"""
+        daemon = BrowserDaemon()
+        if not daemon.is_alive():
+            if not config.browser.daemon_autostart:
+                logger.info(f"常驻浏览器未运行（{daemon.debugger_address}），使用普通启动")
+                return False
+            try:
+                daemon.start()
+            except BrowserInitError as e:
+                logger.warning(f"常驻浏览器启动失败，使用普通启动: {e}")
+                return False
+
+        options = webdriver.ChromeOptions()
+        options.debugger_address = daemon.debugger_address
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        try:
+            self.driver = self._create_driver(options)
+        except Exception as e:
+            logger.warning(f"接管常驻浏览器失败，使用普通启动: {e}")
+            return False
+        self.attached = True
+        return True
+
+    def is_alive(self) -> bool:
+        """存活检查：浏览器会话仍能响应 WebDriver 命令"""
+        if self.driver is None:
+            return False
+        try:
+            with WEBDRIVER_CALL_SECONDS.time(op="window_handles"):
+                return bool(self.driver.window_handles)
+        except Exception:
+            return False
+
     def _init_dom_elements(self):
         """初始化DOM元素到数据库"""
         # 从配置中的选择器初始化DOM元素
         selectors = config.xhs.selectors
         if selectors:
-            self.dom_manager.batch_insert_initial_elements(selectors, self.get_current_url())
-            logger.info(f"已初始化 {len(selectors)} 个DOM元素到数据库")
+            # 配置未变化时不写数据库、不清缓存
+            self.dom_manager.seed_selectors(selectors, self.get_current_url())
+        if config.dom.maintenance_enabled:
+            self.dom_manager.start_maintenance()
+
+    @staticmethod
+    def locator_type(selector: str) -> str:
+        """根据选择器判断定位方式：以 / 或 ( 开头的是 XPath，其余按 CSS 选择器处理"""
+        return By.XPATH if selector.startswith(('/', '(')) else By.CSS_SELECTOR
 
+    def new_page(self):
+        """页面已切换（导航、刷新或单页应用内跳转）：页面代数加一，丢弃上一页的元素句柄"""
+        self.page_epoch += 1
+        self.layout_epoch += 1
+        self._handles.clear()
+
+    def _cached_handle(self, key: Tuple, resolve: Callable[[], WebElement]) -> Tuple[CachedElement, bool]:
+        """从当前页面的句柄缓存获取元素，没有时调用 resolve 定位并缓存
+        
+        Args:
+            key: 逻辑元素的缓存键
+            resolve: 定位元素的函数（同时用于句柄过期后重新定位）
+            
+        Returns:
+            (元素句柄, 是否命中缓存)
+        """
+        handle = self._handles.get(key)
+        if handle is not None and handle.epoch == self.page_epoch:
+            ELEMENT_HANDLES_TOTAL.inc(result="hit")
+            return handle, True
+        ELEMENT_HANDLES_TOTAL.inc(result="miss")
+        handle = CachedElement(resolve(), resolve, self.page_epoch)
+        self._handles[key] = handle
+        return handle, False
+
+    def _wait_for_element(self, by, value, timeout, clickable=False):
+        """等待元素出现（或可点击），并记录等待耗时
+        
+        Args:
+            by: 查找方式
+            value: 查找值
+            timeout: 超时时间
+            clickable: 是否等待可点击
+            
+        Returns:
+            找到的元素
+        """
+        condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+        # 受外层 deadline 约束，嵌套调用不会超出整体时间预算
+        timeout = bounded_timeout(timeout)
+        wait_start = time.perf_counter()
+        try:
+            element = WebDriverWait(self.driver, timeout).until(condition((by, value)))
+        except Exception:
+            ELEMENT_WAIT_SECONDS.observe(time.perf_counter() - wait_start, outcome="timeout")
+            raise
+        ELEMENT_WAIT_SECONDS.observe(time.perf_counter() - wait_start, outcome="found")
+        return element
+
+    @tracer.traced("browser.find_element", category="browser")
     def find_element(self, by, value, timeout=None, clickable=False, element_description=None):
         """查找元素，支持等待，优先从缓存/数据库获取
         
@@ -85,6 +318,7 @@ class BrowserManager:
         """
         if timeout is None:
             timeout = config.wait.element_timeout
+        tracer.annotate(selector=value, clickable=clickable, timeout=timeout)
 
         # 尝试从DOM管理器获取元素信息
         dom_element = None
@@ -92,17 +326,14 @@ class BrowserManager:
             dom_element = self.dom_manager.get_element(value)
         
         try:
-            if clickable:
-                element = WebDriverWait(self.driver, timeout).until(
-                    EC.element_to_be_clickable((by, value))
-                )
-            else:
-                element = WebDriverWait(self.driver, timeout).until(
-                    EC.presence_of_element_located((by, value))
-                )
+            element, cached = self._cached_handle(
+                ("find", by, value, clickable),
+                lambda: self._wait_for_element(by, value, timeout, clickable)
+            )
+            tracer.annotate(handle="cached" if cached else "resolved")
             
-            # 如果找到了元素且有描述，更新DOM信息到数据库
-            if element_description and element:
+            # 如果找到了元素且有描述，更新DOM信息到数据库（同一页面内只在首次定位时更新）
+            if element_description and not cached:
                 from core.models import DOMElement
                 from datetime import datetime
                 
@@ -137,11 +368,14 @@ class BrowserManager:
                     self.dom_manager.update_element(updated_dom_element)
             
             return element
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"查找元素失败 [{value}]: {e}")
             raise ElementNotFoundError(f"元素未找到: {value}")
 
-    @retry(max_attempts=2, delay=1.0)
+    @ELEMENT_RETRY_POLICY
+    @tracer.traced("browser.find_element_with_dom_cache", category="browser")
     def find_element_with_dom_cache(self, selector, timeout=None, clickable=False, element_description=None):
         """使用DOM缓存查找元素
         
@@ -157,19 +391,23 @@ class BrowserManager:
         if timeout is None:
             timeout = config.wait.element_timeout
 
+        # 同一页面内再次访问同一逻辑元素：直接返回缓存的句柄，不产生任何往返
+        handle = self._handles.get(("dom", selector, clickable))
+        if handle is not None and handle.epoch == self.page_epoch:
+            ELEMENT_HANDLES_TOTAL.inc(result="hit")
+            tracer.annotate(selector=selector, handle="cached")
+            return handle
+
         # 优先从DOM管理器获取元素信息
         dom_element = self.dom_manager.get_element(selector)
         actual_selector = dom_element.selector if dom_element else selector
+        tracer.annotate(selector=actual_selector, clickable=clickable, timeout=timeout, handle="resolved")
 
         try:
-            if clickable:
-                element = WebDriverWait(self.driver, timeout).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR if actual_selector.startswith('.') else By.XPATH, actual_selector))
-                )
-            else:
-                element = WebDriverWait(self.driver, timeout).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR if actual_selector.startswith('.') else By.XPATH, actual_selector))
-                )
+            element, _ = self._cached_handle(
+                ("dom", selector, clickable),
+                lambda: self._wait_for_element(self.locator_type(actual_selector), actual_selector, timeout, clickable)
+            )
             
             # 更新DOM元素信息
             if dom_element:
@@ -192,12 +430,14 @@ class BrowserManager:
                 self.dom_manager.update_element(updated_dom_element)
             
             return element
+        except (StaleElementReferenceException, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"使用DOM缓存查找元素失败 [{actual_selector}]: {e}")
             # 如果缓存中的选择器失败，尝试原始选择器
             if actual_selector != selector:
                 logger.info(f"尝试原始选择器: {selector}")
-                return self.find_element(By.CSS_SELECTOR if selector.startswith('.') else By.XPATH, selector, timeout, clickable)
+                return self.find_element(self.locator_type(selector), selector, timeout, clickable)
             raise ElementNotFoundError(f"元素未找到: {selector}")
 
     @log_execution
@@ -213,10 +453,21 @@ class BrowserManager:
             是否成功
         """
         element = self.find_element(by, value, clickable=True, element_description=description)
+        backend = "webdriver"
+        if config.browser.input_backend == "cdp":
+            try:
+                self._cdp_click(element)
+                INPUT_ACTIONS_TOTAL.inc(action="click", backend="cdp")
+                logger.info(f"已点击 '{description}'")
+                return True
+            except Exception as e:
+                logger.debug("cdp 点击失败，回退为 webdriver: %s", e)
+                backend = "fallback"
         # 滚动到元素可见
         ActionChains(self.driver).move_to_element(element).perform()
         time.sleep(config.wait.action_delay)
         element.click()
+        INPUT_ACTIONS_TOTAL.inc(action="click", backend=backend)
         logger.info(f"已点击 '{description}'")
         return True
 
@@ -234,13 +485,164 @@ class BrowserManager:
             是否成功
         """
         element = self.find_element(by, value, element_description=description)
+        backend = "webdriver"
+        if config.browser.input_backend == "cdp":
+            try:
+                self._cdp_insert_text(element, text)
+                INPUT_ACTIONS_TOTAL.inc(action="input", backend="cdp")
+                logger.info(f"已在 '{description}' 输入: {text}")
+                return True
+            except Exception as e:
+                logger.debug("cdp 输入失败，回退为 webdriver: %s", e)
+                backend = "fallback"
         element.click()
         time.sleep(config.wait.input_delay)
         element.clear()
         element.send_keys(text)
+        INPUT_ACTIONS_TOTAL.inc(action="input", backend=backend)
         logger.info(f"已在 '{description}' 输入: {text}")
         return True
 
+    def _element_center(self, element: WebElement) -> Tuple[float, float]:
+        """元素中心点的视口坐标
+        
+        每次都在页面中用 elementFromPoint 确认该点落在元素上，避免布局偏移后点到别的元素。
+        缓存句柄在布局未变化时带上上次测量的坐标，仍命中时不再重新测量。
+        重新测量后仍未命中（被遮挡）时抛出异常，由调用方回退为 WebDriver 点击。
+        """
+        cached = None
+        if isinstance(element, CachedElement) and element.box is not None and element.box_epoch == self.layout_epoch:
+            cached = element.box
+        box = self.page_scripts.call("elementBox", element, cached)
+        if isinstance(element, CachedElement):
+            element.box, element.box_epoch = box, self.layout_epoch
+        if not box['width'] or not box['height']:
+            raise ValueError("元素不可见（尺寸为0）")
+        if not box['hit']:
+            raise ValueError("元素中心点被其他元素遮挡")
+        return box['x'], box['y']
+
+    def _cdp_click(self, element: WebElement):
+        """通过 Input.dispatchMouseEvent 在元素中心点击（按下、抬起）"""
+        x, y = self._element_center(element)
+        for event_type in ("mousePressed", "mouseReleased"):
+            self.execute_cdp_cmd("Input.dispatchMouseEvent", {
+                "type": event_type, "x": x, "y": y, "button": "left", "clickCount": 1
+            })
+
+    def _cdp_insert_text(self, element: WebElement, text: str):
+        """聚焦元素并选中已有内容，再通过 Input.insertText 一次写入整段文本
+        
+        insertText 不会产生回车键事件，多行文本在行之间发送 Enter 按键，让编辑器按换行（分段）处理。
+        """
+        if not self.page_scripts.call("focusForInput", element):
+            raise ValueError("元素未获得焦点")
+        for i, line in enumerate(text.split("\n")):
+            if i:
+                for event_type in ("keyDown", "keyUp"):
+                    self.execute_cdp_cmd("Input.dispatchKeyEvent", {
+                        "type": event_type, "key": "Enter", "code": "Enter",
+                        "windowsVirtualKeyCode": 13, "text": "\r" if event_type == "keyDown" else ""
+                    })
+            if line:
+                self.execute_cdp_cmd("Input.insertText", {"text": line})
+
+    def set_network_profile(self, name: str):
+        """切换网络配置：按 config.browser.network_profiles[name] 屏蔽请求（Network.setBlockedURLs）
+        
+        会匹配评论接口的规则被忽略，评论接口永远不会被屏蔽。
+        
+        Args:
+            name: 网络配置名称
+        """
+        if name not in config.browser.network_profiles:
+            raise ValueError(f"未知的网络配置: {name}")
+        comment_api_url = f"https://edith.xiaohongshu.com/{config.xhs.comment_api_pattern}?note_id=0"
+        patterns = []
+        for pattern in config.browser.network_profiles[name]:
+            if fnmatch.fnmatchcase(comment_api_url, pattern):
+                logger.warning(f"网络配置 {name} 的规则 {pattern} 会屏蔽评论接口，已忽略")
+                continue
+            patterns.append(pattern)
+        # 切换前已完成的请求计入原配置
+        self._account_transfer()
+        self.execute_cdp_cmd("Network.enable", {})
+        self.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        self.network_profile = name
+        logger.debug("已切换网络配置: %s（屏蔽 %d 条规则）", name, len(patterns))
+
+    @contextmanager
+    def network_profile_scope(self, name: str):
+        """临时切换网络配置，退出时恢复原配置，并按配置记录期间的传输字节数
+        
+        Args:
+            name: 网络配置名称，为空或与当前配置相同时不切换
+        """
+        previous = self.network_profile
+        if not name or name == previous:
+            yield
+            return
+
+        try:
+            self.set_network_profile(name)
+        except Exception as e:
+            logger.warning(f"切换网络配置 {name} 失败，按当前配置继续: {e}")
+            yield
+            return
+
+        before = PAGE_TRANSFER_BYTES_TOTAL.get(profile=name)
+        try:
+            yield
+        finally:
+            try:
+                self.set_network_profile(previous)
+            except Exception as e:
+                logger.warning(f"恢复网络配置 {previous} 失败: {e}")
+                self._account_transfer()
+            transferred = PAGE_TRANSFER_BYTES_TOTAL.get(profile=name) - before
+            logger.info(f"网络配置 {name}: 传输 {transferred / 1024:.1f} KB")
+
+    def _record_page_load(self):
+        """按当前网络配置记录页面加载耗时和传输字节数"""
+        self._account_transfer()
+        try:
+            stats = self.page_scripts.call("pageStats")
+        except Exception as e:
+            logger.debug("读取页面加载统计失败: %s", e)
+            return
+        if stats['load_ms'] is not None:
+            PAGE_LOAD_SECONDS.observe(stats['load_ms'] / 1000, profile=self.network_profile)
+
+    def _account_transfer(self):
+        """读出截至目前的性能日志留给下一次 get_network_logs，其中的传输字节数计入当前网络配置"""
+        try:
+            self._network_log_backlog.extend(self._read_performance_log())
+        except Exception as e:
+            logger.debug("读取性能日志失败: %s", e)
+            return
+        if len(self._network_log_backlog) > NETWORK_LOG_BACKLOG_LIMIT:
+            del self._network_log_backlog[:-NETWORK_LOG_BACKLOG_LIMIT]
+
+    def _read_performance_log(self) -> list:
+        """读取性能日志（读取后浏览器端即清空），累计 Network.loadingFinished 的 encodedDataLength
+        
+        encodedDataLength 是实际经网络传输的字节数（含响应头，跨域资源同样有效，不受 Resource Timing 缓冲区限制）。
+        """
+        with WEBDRIVER_CALL_SECONDS.time(op="get_log"):
+            logs = self.driver.get_log('performance')
+        transferred = 0
+        for log in logs:
+            # 先按字符串过滤，只解析请求完成事件
+            if '"Network.loadingFinished"' not in log['message']:
+                continue
+            try:
+                transferred += json.loads(log['message'])['message']['params'].get('encodedDataLength', 0)
+            except (ValueError, KeyError, TypeError):
+                continue
+        if transferred:
+            PAGE_TRANSFER_BYTES_TOTAL.inc(transferred, profile=self.network_profile)
+        return logs
+
     def navigate_to(self, url: str, description: str = "页面"):
         """导航到指定URL
         
@@ -248,28 +650,123 @@ class BrowserManager:
             url: 目标URL
             description: 页面描述
         """
-        self.driver.get(url)
-        logger.info(f"已打开{description}: {url}")
-        time.sleep(config.wait.page_load_timeout)
+        with tracer.span("browser.navigate_to", category="browser", url=url):
+            self.new_page()
+            NAVIGATION_RETRY_POLICY.call(self._get, url)
+            logger.info(f"已打开{description}: {url}")
+            time.sleep(config.wait.page_load_timeout)
+            self._record_page_load()
+
+    def _get(self, url: str):
+        """加载页面（单次 WebDriver 往返）"""
+        with WEBDRIVER_CALL_SECONDS.time(op="get"):
+            self.driver.get(url)
 
     def get_current_url(self) -> str:
         """获取当前URL"""
-        return self.driver.current_url
+        with tracer.span("browser.current_url", category="browser"), \
+                WEBDRIVER_CALL_SECONDS.time(op="current_url"):
+            return self.driver.current_url
 
     def get_network_logs(self):
-        """获取浏览器网络日志"""
-        return self.driver.get_log('performance')
+        """获取浏览器网络日志（上次调用之后的新日志，包括统计传输字节数时已提前读出的部分）"""
+        with tracer.span("browser.get_network_logs", category="browser") as span:
+            logs = self._network_log_backlog + self._read_performance_log()
+            self._network_log_backlog = []
+            span.set_attribute("entries", len(logs))
+            return logs
 
     def execute_script(self, script: str, *args):
-        """执行JavaScript脚本"""
-        return self.driver.execute_script(script, *args)
+        """执行JavaScript脚本（参数中的缓存句柄过期时重新定位后重试一次）"""
+        with tracer.span("browser.execute_script", category="browser", script=script.strip()[:80]), \
+                WEBDRIVER_CALL_SECONDS.time(op="execute_script"):
+            self.layout_epoch += 1
+            try:
+                return self.driver.execute_script(script, *args)
+            except StaleElementReferenceException:
+                handles = [arg for arg in args if isinstance(arg, CachedElement)]
+                if not handles:
+                    raise
+                for handle in handles:
+                    handle.refresh()
+                return self.driver.execute_script(script, *args)
 
     def execute_cdp_cmd(self, cmd: str, params: dict):
         """执行Chrome DevTools协议命令"""
-        return self.driver.execute_cdp_cmd(cmd, params)
+        with tracer.span(cmd, category="cdp"), CDP_CALL_SECONDS.time(method=cmd):
+            return self.driver.execute_cdp_cmd(cmd, params)
+
+    def checkpoint(self) -> Optional[str]:
+        """业务操作之间调用：按间隔采样页面内存指标，执行内存治理记下的待处理动作
+        
+        Returns:
+            执行的动作名称，没有待处理动作时返回 None
+        """
+        return self.memory_governor.checkpoint()
+
+    def close_stray_tabs(self) -> int:
+        """关闭当前标签页以外的所有标签页
+        
+        Returns:
+            关闭的标签页数量
+        """
+        current = self.driver.current_window_handle
+        closed = 0
+        for handle in self.driver.window_handles:
+            if handle != current:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+                closed += 1
+        if closed:
+            self.driver.switch_to.window(current)
+        return closed
+
+    def recycle_tab(self):
+        """在新标签页重新打开当前页面并关闭旧标签页，释放旧渲染进程占用的内存"""
+        url = self.get_current_url()
+        old_handle = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        new_handle = self.driver.current_window_handle
+        self.driver.switch_to.window(old_handle)
+        self.driver.close()
+        self.driver.switch_to.window(new_handle)
+        self._restore_page(url)
+        logger.info(f"已回收标签页: {url}")
+
+    def restart(self):
+        """重启浏览器并回到当前页面（登录状态保存在用户数据目录中）"""
+        try:
+            url = self.get_current_url()
+        except Exception:
+            url = ""
+        if self.attached:
+            self.driver.service.stop()
+            BrowserDaemon().stop()
+        else:
+            self.driver.quit()
+        self.driver = None
+        self.attached = False
+        self._network_log_backlog = []
+        self._init_driver()
+        self._restore_page(url)
+        logger.info(f"浏览器已重启: {url}")
+
+    def _restore_page(self, url: str):
+        """在新标签页/新浏览器中恢复网络配置并打开原页面"""
+        self.new_page()
+        if self.network_profile != "default":
+            self.set_network_profile(self.network_profile)
+        if url.startswith("http"):
+            self.navigate_to(url, "原页面")
 
     def quit(self):
-        """退出浏览器"""
+        """退出浏览器（接管的常驻浏览器只断开连接，保留给下次运行）"""
+        self.memory_governor.stop()
+        self.dom_manager.stop_maintenance()
         if self.driver:
-            self.driver.quit()
-            logger.info("浏览器已关闭")
\ No newline at end of file
+            if self.attached:
+                self.driver.service.stop()
+                logger.info("已断开常驻浏览器")
+            else:
+                self.driver.quit()
+                logger.info("浏览器已关闭")
\ No newline at end of file
@@ -1,7 +1,7 @@
 """ 配置管理模块"""
 import os
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from core.logger import logger
 
 
@@ -20,6 +20,40 @@ class AIConfig:
     max_tokens: int = 300
     # 超时时间（秒）
     timeout: int = 30
+    # 是否启用响应缓存（相同请求直接返回上次结果）
+    cache_enabled: bool = False
+    # 响应缓存数据库路径
+    cache_path: str = "cache/ai_responses.db"
+    # 缓存有效期（秒）
+    cache_ttl: int = 7 * 24 * 3600
+    # 缓存最大条目数
+    cache_max_entries: int = 10000
+    # 高于此温度的请求不缓存（None 表示不限制）
+    cache_max_temperature: Optional[float] = None
+    # 批量生成时的最大并发请求数
+    max_concurrency: int = 4
+    # 共享 HTTP 连接池大小
+    http_pool_size: int = 10
+    # 空闲连接保持时间（秒）
+    http_keepalive_expiry: float = 30.0
+    # Ollama 服务地址
+    ollama_host: str = "http://localhost:11434"
+    # Ollama 默认模型
+    ollama_model: str = "qwen2.5:7b"
+    # Ollama 模型常驻时间（如 "30m"，-1 表示一直常驻）
+    ollama_keep_alive: str = "30m"
+    # 路由客户端的后端列表（逗号分隔的客户端类型，如 "zhipu,ollama"）
+    router_backends: str = ""
+    # 路由客户端是否开启对冲请求
+    router_hedge: bool = False
+    # 触发熔断的连续失败次数
+    router_failure_threshold: int = 3
+    # 熔断时长（秒）
+    router_cooldown: float = 30.0
+    # AI 用量账本路径（空字符串表示只在内存中统计，如 "data/ai_usage.db"）
+    usage_db_path: str = ""
+    # token 硬预算（0 表示不限制），用尽后 AI 请求直接抛出 TokenBudgetExceeded
+    token_budget: int = 0
 
 
 @dataclass
@@ -33,11 +67,87 @@ class BrowserConfig:
     disable_automation: bool = True
     # 无头模式
     headless: bool = False
-    
+    # 常驻浏览器模式：优先通过调试端口接管已启动的 Chrome，而不是每次冷启动
+    daemon_mode: bool = False
+    # 常驻浏览器未运行时是否自动启动（否则回退为普通启动）
+    daemon_autostart: bool = True
+    # 常驻浏览器的远程调试端口（每个 user_data_dir 一个端口）
+    debug_port: int = 9222
+    # Chrome 可执行文件路径（空字符串表示自动查找）
+    chrome_binary: str = ""
+    # chromedriver 路径缓存文件
+    driver_cache_path: str = "cache/chromedriver.json"
+    # chromedriver 路径缓存有效期（秒），过期后重新解析版本
+    driver_cache_ttl: int = 7 * 24 * 3600
+    # 输入方式："webdriver"（逐字符 send_keys、ActionChains 点击）或 "cdp"（Input.insertText 一次输入整段文本、
+    # Input.dispatchMouseEvent 按元素坐标点击）；cdp 方式失败时自动回退为 webdriver
+    input_backend: str = "webdriver"
+    # 网络配置：名称 -> 屏蔽的 URL 模式（Network.setBlockedURLs，* 为通配符）；评论接口永远不会被屏蔽
+    network_profiles: Dict[str, List[str]] = None
+    # 打开笔记详情页和获取评论期间临时切换的网络配置（空字符串表示不切换）
+    comment_network_profile: str = "read_only"
+    # 启动预设：在 window_size / headless 等配置之上追加的 Chrome 启动参数（见 launch_presets）
+    launch_preset: str = "default"
+    # 启动预设：名称 -> 追加的启动参数；预设中带 --window-size / --headless 时覆盖 window_size / headless
+    launch_presets: Dict[str, List[str]] = None
+
+    def __post_init__(self):
+        if self.launch_presets is None:
+            # 精简：关闭后台联网、组件更新、扩展和同步，磁盘缓存限制为 32MB
+            lean = [
+                "--disable-extensions", "--disable-background-networking", "--disable-component-update",
+                "--disable-default-apps", "--disable-sync", "--no-first-run", "--no-default-browser-check",
+                "--mute-audio", "--disk-cache-size=33554432",
+                "--disable-features=Translate,MediaRouter,OptimizationHints",
+                "--window-size=1280,800",
+            ]
+            self.launch_presets = {
+                "default": [],
+                "lean": lean,
+                # 新版无头模式；容器中 /dev/shm 通常只有 64MB，改用 /tmp 避免渲染进程崩溃
+                "headless": lean + ["--headless=new", "--disable-gpu", "--disable-dev-shm-usage"],
+                # 以 root 身份在容器中运行时 Chrome 要求关闭沙箱
+                "container": lean + ["--headless=new", "--disable-gpu", "--disable-dev-shm-usage", "--no-sandbox"],
+            }
+        if self.network_profiles is None:
+            self.network_profiles = {
+                "default": [],
+                # 只读取评论：屏蔽图片、视频和字体（笔记图片/视频/头像 CDN 的地址没有扩展名，按域名屏蔽）
+                "read_only": [
+                    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*",
+                    "*.mp4*", "*.m3u8*", "*.woff*", "*.ttf*", "*.otf*",
+                    "*sns-webpic*.xhscdn.com/*", "*sns-img*.xhscdn.com/*", "*sns-avatar*.xhscdn.com/*",
+                    "*sns-video*.xhscdn.com/*", "*picasso-static.xiaohongshu.com/*",
+                ],
+            }
+
     def get_user_data_dir(self) -> str:
         """获取展开后的用户数据目录"""
         return os.path.expanduser(self.user_data_dir)
 
+    def launch_arguments(self, preset: Optional[str] = None) -> List[str]:
+        """窗口、无头模式与启动预设合并后的 Chrome 启动参数（不含用户数据目录和调试端口）
+
+        Args:
+            preset: 预设名称，None 时使用 launch_preset
+
+        Returns:
+            启动参数列表
+
+        Raises:
+            ValueError: 预设不存在
+        """
+        name = preset or self.launch_preset
+        if name not in self.launch_presets:
+            raise ValueError(f"未知的启动预设: {name}（可选: {', '.join(self.launch_presets)}）")
+        extra = list(self.launch_presets[name])
+        args = []
+        if not any(arg.startswith("--window-size") for arg in extra):
+            args.append(self.window_size)
+        if self.headless and not any(arg.startswith("--headless") for arg in extra):
+            args.append("--headless=new")
+        return args + extra
+
 
 @dataclass
 class WaitConfig:
@@ -48,6 +158,58 @@ class WaitConfig:
     action_delay: float = 0.5
     input_delay: float = 0.3
     image_generation_wait: int = 5
+    # 单个业务流程（发布、搜索笔记、回复评论）的整体时间预算（秒）
+    workflow_timeout: int = 180
+
+
+@dataclass
+class DOMConfig:
+    """DOM 元素库维护配置"""
+    # 是否在浏览器运行期间后台维护 dom_elements.db
+    maintenance_enabled: bool = True
+    # 维护间隔（秒），上次维护记录在数据库中，跨进程生效
+    maintenance_interval: int = 24 * 3600
+    # 启动后延迟多久开始维护（秒），避开启动阶段
+    maintenance_delay: float = 10.0
+    # 超过多少天未更新的元素会被清理（配置中的选择器除外），0 表示不清理
+    retention_days: int = 30
+
+
+@dataclass
+class MemoryConfig:
+    """浏览器内存治理配置（内存取 Chrome 进程树各进程 PSS 之和，共享页按进程数均摊；无法读取时取 JS 堆大小）"""
+    # 是否在浏览器运行期间后台采样内存
+    enabled: bool = True
+    # 采样间隔（秒）
+    check_interval: float = 60.0
+    # 以下阈值与进程树 PSS 之和比较（不是 RSS 之和，RSS 会把共享库重复计入每个进程）
+    # 超过该值（MB）时清理浏览器缓存并关闭多余的标签页
+    clear_cache_mb: int = 1024
+    # 超过该值（MB）时在新标签页重新打开当前页面并关闭旧标签页
+    recycle_tab_mb: int = 1536
+    # 超过该值（MB）时重启浏览器（登录状态保存在用户数据目录中，重启后回到原页面）
+    restart_mb: int = 2048
+
+
+@dataclass
+class DataLogConfig:
+    """数据记录配置（发帖、回复等记录追加写入 <directory>/<名称>.jsonl）"""
+    # 是否记录
+    enabled: bool = True
+    # 数据目录
+    directory: str = "data"
+    # 缓冲区达到该条数时立即写入
+    batch_size: int = 100
+    # 最长写入间隔（秒），也是进程崩溃时最多丢失的记录时间窗口
+    flush_interval: float = 1.0
+    # fsync 策略："never"（交给操作系统）、"batch"（每批写入后）、"close"（只在轮转和关闭时）
+    fsync: str = "batch"
+    # 当前文件超过该大小（字节）时轮转，0 表示不按大小轮转
+    max_bytes: int = 16 * 1024 * 1024
+    # 日期变化时轮转
+    rotate_daily: bool = True
+    # 轮转后的文件压缩为 .gz
+    compress: bool = True
 
 
 @dataclass
@@ -59,6 +221,12 @@ class XHSConfig:
     user_profile_url: str = "https://www.xiaohongshu.com/user/profile/YOUR_USER_ID"
     # 评论接口
     comment_api_pattern: str = "api/sns/web/v2/comment/page"
+    # 个人主页笔记列表接口
+    note_list_api_pattern: str = "api/sns/web/v1/user_posted"
+    # 笔记目录数据库路径（按标题查找笔记，命中时直接打开笔记，不经过个人主页）
+    note_catalog_path: str = "cache/note_catalog.db"
+    # 目录未命中时在个人主页最多向下滚动几次加载更早的笔记
+    note_catalog_scroll_pages: int = 10
     
     # CSS选择器
     selectors: Dict[str, str] = None
@@ -84,6 +252,9 @@ class AppConfig:
     wait: WaitConfig = None
     xhs: XHSConfig = None
     ai: AIConfig = None
+    dom: DOMConfig = None
+    memory: MemoryConfig = None
+    data_log: DataLogConfig = None
     
     def __post_init__(self):
         if self.browser is None:
@@ -94,48 +265,59 @@ class AppConfig:
             self.xhs = XHSConfig()
         if self.ai is None:
             self.ai = AIConfig()
+        if self.dom is None:
+            self.dom = DOMConfig()
+        if self.memory is None:
+            self.memory = MemoryConfig()
+        if self.data_log is None:
+            self.data_log = DataLogConfig()
 
 
 # 全局配置实例
 config = AppConfig()
 
+
+def _load_personal_config() -> Optional[Dict[str, Any]]:
+    """按文件路径加载项目根目录下的 config_personal.py（不修改 sys.path），不存在时返回 None"""
+    import importlib.util
+    from pathlib import Path
+
+    path = Path(__file__).parent.parent / "config_personal.py"
+    if not path.exists():
+        return None
+    spec = importlib.util.spec_from_file_location("config_personal", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.PERSONAL_CONFIG
+
+
 # 尝试加载个人配置文件（如果存在）
 try:
-    import sys
-    from pathlib import Path
-    
-    # 获取项目根目录
-    root_dir = Path(__file__).parent.parent
-    sys.path.insert(0, str(root_dir))
-    
-    from config_personal import PERSONAL_CONFIG
-    
-    # 应用个人配置
-    if "user_profile_url" in PERSONAL_CONFIG:
-        config.xhs.user_profile_url = PERSONAL_CONFIG["user_profile_url"]
-    if "chrome_user_data_dir" in PERSONAL_CONFIG:
-        config.browser.user_data_dir = PERSONAL_CONFIG["chrome_user_data_dir"]
-    if "headless" in PERSONAL_CONFIG:
-        config.browser.headless = PERSONAL_CONFIG["headless"]
-    if "wait_timeout" in PERSONAL_CONFIG:
-        config.wait.default_timeout = PERSONAL_CONFIG["wait_timeout"]
-    if "page_load_timeout" in PERSONAL_CONFIG:
-        config.wait.page_load_timeout = PERSONAL_CONFIG["page_load_timeout"]
-    
-    # AI 配置
-    if "ai_api_key" in PERSONAL_CONFIG:
-        config.ai.api_key = PERSONAL_CONFIG["ai_api_key"]
-    if "ai_base_url" in PERSONAL_CONFIG:
-        config.ai.base_url = PERSONAL_CONFIG["ai_base_url"]
-    if "ai_model" in PERSONAL_CONFIG:
-        config.ai.model = PERSONAL_CONFIG["ai_model"]
-    if "ai_temperature" in PERSONAL_CONFIG:
-        config.ai.temperature = PERSONAL_CONFIG["ai_temperature"]
-    
-    logger.info("已加载个人配置文件")
-except ImportError:
-    # 个人配置文件不存在，使用默认配置
-    pass
+    PERSONAL_CONFIG = _load_personal_config()
+    if PERSONAL_CONFIG is not None:
+        # 应用个人配置
+        if "user_profile_url" in PERSONAL_CONFIG:
+            config.xhs.user_profile_url = PERSONAL_CONFIG["user_profile_url"]
+        if "chrome_user_data_dir" in PERSONAL_CONFIG:
+            config.browser.user_data_dir = PERSONAL_CONFIG["chrome_user_data_dir"]
+        if "headless" in PERSONAL_CONFIG:
+            config.browser.headless = PERSONAL_CONFIG["headless"]
+        if "wait_timeout" in PERSONAL_CONFIG:
+            config.wait.default_timeout = PERSONAL_CONFIG["wait_timeout"]
+        if "page_load_timeout" in PERSONAL_CONFIG:
+            config.wait.page_load_timeout = PERSONAL_CONFIG["page_load_timeout"]
+
+        # AI 配置
+        if "ai_api_key" in PERSONAL_CONFIG:
+            config.ai.api_key = PERSONAL_CONFIG["ai_api_key"]
+        if "ai_base_url" in PERSONAL_CONFIG:
+            config.ai.base_url = PERSONAL_CONFIG["ai_base_url"]
+        if "ai_model" in PERSONAL_CONFIG:
+            config.ai.model = PERSONAL_CONFIG["ai_model"]
+        if "ai_temperature" in PERSONAL_CONFIG:
+            config.ai.temperature = PERSONAL_CONFIG["ai_temperature"]
+
+        logger.info("已加载个人配置文件")
 except Exception as e:
     logger.warning(f"  加载个人配置文件失败: {e}")
     logger.info("将使用默认配置")
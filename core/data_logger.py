@@ -0,0 +1,297 @@
+"""数据记录模块 - 追加写入的 JSONL 数据日志（内存批量写入、fsync 策略、按大小/日期轮转并 gzip 压缩、断行恢复）"""
+import atexit
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.config import config
+from core.logger import logger
+from core.metrics import metrics
+
+DATA_LOG_RECORDS_TOTAL = metrics.counter(
+    "xhs_data_log_records_total", "写入数据日志的记录数（dropped 为写入器已关闭时丢弃的记录）", ["stream", "result"]
+)
+DATA_LOG_FLUSH_SECONDS = metrics.histogram(
+    "xhs_data_log_flush_seconds", "数据日志一次批量写入的耗时（秒，含 fsync 和轮转）", ["stream"]
+)
+
+# fsync 策略：never 交给操作系统；batch 每批写入后；close 只在轮转和关闭时
+FSYNC_POLICIES = ("never", "batch", "close")
+
+# 断行恢复时每次向前读取的字节数
+_RECOVERY_CHUNK = 64 * 1024
+
+
+class JSONLWriter:
+    """追加写入的 JSONL 写入器
+
+    write() 只把序列化后的记录放入内存缓冲区，由后台线程按 batch_size 或 flush_interval 批量追加到文件，
+    调用方不等待磁盘 I/O。当前文件超过 max_bytes 或跨日期时轮转为 ``<名称>.<日期>.<序号>.jsonl``，
+    并按配置压缩为 .gz。后台线程启动后先打开文件：截掉上次崩溃留下的不完整末行，并补做中断的压缩，
+    构造写入器的线程不做任何文件操作。
+
+    Example:
+        >>> writer = JSONLWriter("data/post.jsonl", fsync="batch")
+        >>> writer.write({"title": "标题", "content": "内容"})
+        >>> writer.close()   # 写入剩余记录
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 1.0, fsync: str = "batch",
+                 max_bytes: int = 16 * 1024 * 1024, rotate_daily: bool = True, compress: bool = True):
+        """初始化写入器并启动后台写入线程（打开文件、断行恢复和压缩都在后台线程中进行）
+
+        Args:
+            path: 当前文件路径（.jsonl）
+            batch_size: 缓冲区达到该条数时立即写入
+            flush_interval: 最长写入间隔（秒），也是进程崩溃时最多丢失的记录时间窗口
+            fsync: fsync 策略（never / batch / close）
+            max_bytes: 当前文件超过该大小时轮转，0 表示不按大小轮转
+            rotate_daily: 日期变化时轮转
+            compress: 轮转后的文件压缩为 .gz
+
+        Raises:
+            ValueError: fsync 策略不存在
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"未知的 fsync 策略: {fsync}（可选: {', '.join(FSYNC_POLICIES)}）")
+        self.path = Path(path)
+        self.stream = self.path.stem
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+
+        self._pending: List[str] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        # 文件操作互斥（后台线程与调用方的 flush()/close()）
+        self._io_lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._segment_date: Optional[date] = None
+
+        self._thread = threading.Thread(target=self._loop, name=f"xhs-data-log-{self.stream}", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict[str, Any]):
+        """追加一条记录（立即序列化，写入磁盘由后台线程完成）
+
+        Args:
+            record: 可 JSON 序列化的字典（无法序列化的值按 str() 写入）
+        """
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._cond:
+            if self._closed:
+                logger.warning(f"数据日志 {self.stream} 已关闭，丢弃记录")
+                DATA_LOG_RECORDS_TOTAL.inc(stream=self.stream, result="dropped")
+                return
+            self._pending.append(line)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        DATA_LOG_RECORDS_TOTAL.inc(stream=self.stream, result="written")
+
+    def flush(self):
+        """把缓冲区中的记录写入文件"""
+        with self._cond:
+            lines, self._pending = self._pending, []
+        if lines:
+            self._write_batch(lines)
+
+    def close(self):
+        """停止后台线程，写入剩余记录并关闭文件"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        with self._io_lock:
+            self._close_file()
+
+    def _loop(self):
+        try:
+            with self._io_lock:
+                self._ensure_open()
+        except Exception as e:
+            logger.error(f"打开数据日志 {self.stream} 失败: {e}")
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or len(self._pending) >= self.batch_size,
+                                    timeout=self.flush_interval)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"写入数据日志 {self.stream} 失败: {e}")
+            if closed:
+                return
+
+    def _write_batch(self, lines: List[str]):
+        """一次系统调用追加整批记录"""
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        with DATA_LOG_FLUSH_SECONDS.time(stream=self.stream), self._io_lock:
+            self._ensure_open()
+            if self._should_rotate(len(data)):
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync == "batch":
+                os.fsync(self._file.fileno())
+            self._size += len(data)
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.rotate_daily and self._segment_date != date.today():
+            return True
+        return bool(self.max_bytes) and self._size + incoming > self.max_bytes
+
+    def _ensure_open(self):
+        """文件尚未打开（或上次打开失败）时打开，调用方持有 _io_lock"""
+        if self._file is None:
+            self._open()
+
+    def _open(self):
+        """打开当前文件：补做中断的压缩，截掉不完整的末行"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        for leftover in self.path.parent.glob(f"{self.stream}.*.jsonl.gz.tmp"):
+            leftover.unlink()
+        if self.compress:
+            for segment in sorted(self.path.parent.glob(f"{self.stream}.*.jsonl")):
+                self._compress(segment)
+
+        if self.path.exists():
+            self._recover()
+            stat = self.path.stat()
+            self._size = stat.st_size
+            self._segment_date = datetime.fromtimestamp(stat.st_mtime).date() if stat.st_size else date.today()
+        else:
+            self._size = 0
+            self._segment_date = date.today()
+        self._file = open(self.path, "ab")
+
+    def _recover(self):
+        """截掉上次进程崩溃时写了一半的末行"""
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - _RECOVERY_CHUNK)
+                f.seek(start)
+                chunk = f.read(position - start)
+                index = chunk.rfind(b"\n")
+                if index >= 0:
+                    position = start + index + 1
+                    break
+                position = start
+            if position < end:
+                f.truncate(position)
+                os.fsync(f.fileno())
+                logger.warning(f"数据日志 {self.path} 末尾有 {end - position} 字节的不完整记录，已截掉")
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def _rotate(self):
+        """当前文件改名为带日期和序号的分段文件，再打开新的当前文件"""
+        self._close_file()
+        day = self._segment_date.isoformat()
+        index = 1
+        while (self.path.parent / f"{self.stream}.{day}.{index}.jsonl").exists() or \
+                (self.path.parent / f"{self.stream}.{day}.{index}.jsonl.gz").exists():
+            index += 1
+        segment = self.path.parent / f"{self.stream}.{day}.{index}.jsonl"
+        os.replace(self.path, segment)
+        if self.compress:
+            self._compress(segment)
+        logger.info(f"数据日志已轮转: {segment.name}")
+
+        self._file = open(self.path, "ab")
+        self._size = 0
+        self._segment_date = date.today()
+
+    @staticmethod
+    def _compress(segment: Path):
+        """压缩分段文件：先写临时文件再改名，中途崩溃时保留原文件，下次打开时重新压缩"""
+        target = segment.with_name(segment.name + ".gz")
+        temp = segment.with_name(segment.name + ".gz.tmp")
+        with open(segment, "rb") as src, gzip.open(temp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(temp, target)
+        segment.unlink()
+
+
+_writers: Dict[str, JSONLWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def data_logger(stream: str) -> Optional[JSONLWriter]:
+    """获取数据流的共享写入器（按 config.data_log 创建，写入 ``<directory>/<stream>.jsonl``）
+
+    Args:
+        stream: 数据流名称（如 post、reply）
+
+    Returns:
+        写入器，数据记录未启用时返回 None
+    """
+    if not config.data_log.enabled:
+        return None
+    with _writers_lock:
+        writer = _writers.get(stream)
+        if writer is None:
+            settings = config.data_log
+            writer = _writers[stream] = JSONLWriter(
+                os.path.join(settings.directory, f"{stream}.jsonl"),
+                batch_size=settings.batch_size,
+                flush_interval=settings.flush_interval,
+                fsync=settings.fsync,
+                max_bytes=settings.max_bytes,
+                rotate_daily=settings.rotate_daily,
+                compress=settings.compress,
+            )
+        return writer
+
+
+def log_record(stream: str, record: Dict[str, Any]):
+    """追加一条数据记录（自动加上时间字段），写入失败只记录日志，不影响业务流程
+
+    Args:
+        stream: 数据流名称
+        record: 记录内容
+    """
+    try:
+        writer = data_logger(stream)
+        if writer is not None:
+            writer.write({"time": datetime.now().isoformat(timespec="seconds"), **record})
+    except Exception as e:
+        logger.warning(f"记录数据 {stream} 失败: {e}")
+
+
+def shutdown():
+    """关闭所有共享写入器（写入剩余记录）"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        try:
+            writer.close()
+        except Exception as e:
+            logger.error(f"关闭数据日志 {writer.stream} 失败: {e}")
+
+
+atexit.register(shutdown)
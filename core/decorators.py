@@ -1,52 +1,283 @@
 """装饰器模块"""
+import asyncio
 import time
+import random
 import functools
-from typing import Callable, Any, Type, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Any, Type, Tuple, Optional
+from core.exceptions import DeadlineExceeded
 from core.logger import logger
+from core.metrics import metrics
+from core.tracing import tracer
 
 
-def retry(max_attempts: int = 3, delay: float = 1.0, 
-         exceptions: Tuple[Type[Exception], ...] = (Exception,)):
-    """重试装饰器
+RETRY_ATTEMPTS_TOTAL = metrics.counter(
+    "xhs_retry_attempts_total", "重试策略的每次尝试结果", ["operation", "outcome"]
+)
+
+# 当前上下文的截止时间（time.monotonic() 绝对值），嵌套调用自动继承
+_deadline: ContextVar[Optional[float]] = ContextVar('xhs_deadline', default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """设置整体时间预算，嵌套时取更早的截止时间
     
     Args:
-        max_attempts: 最大重试次数
-        delay: 重试间隔（秒）
-        exceptions: 需要重试的异常类型
+        seconds: 预算秒数，None 表示不额外限制
+    """
+    if seconds is None:
+        yield
+        return
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        new_deadline = min(current, new_deadline)
+    token = _deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """获取当前截止时间前的剩余秒数，没有截止时间时返回 None"""
+    current = _deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def bounded_timeout(timeout: float) -> float:
+    """把单次等待的超时时间限制在剩余预算以内
+    
+    Args:
+        timeout: 期望的超时时间（秒）
+        
+    Returns:
+        实际可用的超时时间
+        
+    Raises:
+        DeadlineExceeded: 预算已经耗尽
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise DeadlineExceeded("时间预算已耗尽")
+    return min(timeout, remaining)
+
+
+class RetryPolicy:
+    """重试策略 - 指数退避 + 抖动 + 异常分类 + 截止时间
+    
+    可以直接作为装饰器使用，也可以通过 call() 包装单次调用：
+    
+        >>> policy = RetryPolicy(max_attempts=3, retryable=(TimeoutError,))
+        >>> @policy
+        ... def fetch(): ...
+        >>> policy.call(client.request, url)
+    """
+    
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+        retryable: Tuple[Type[BaseException], ...] = (Exception,),
+        fatal: Tuple[Type[BaseException], ...] = (),
+        classifier: Optional[Callable[[BaseException], Optional[bool]]] = None,
+        timeout: Optional[float] = None,
+        name: Optional[str] = None
+    ):
+        """初始化重试策略
+        
+        Args:
+            max_attempts: 最大尝试次数
+            base_delay: 首次重试前的等待（秒）
+            max_delay: 单次等待上限（秒）
+            multiplier: 退避倍数，1.0 表示固定间隔
+            jitter: 抖动比例（0-1），实际等待在 [delay*(1-jitter), delay] 之间随机
+            retryable: 可重试的异常类型
+            fatal: 不可重试的异常类型（优先于 retryable）
+            classifier: 自定义分类函数，返回 True/False 表示可重试/不可重试，None 表示交给类型判断
+            timeout: 本次调用（含所有重试）的整体时间预算（秒）
+            name: 操作名称，用于日志、指标和追踪
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.retryable = retryable
+        self.fatal = fatal
+        self.classifier = classifier
+        self.timeout = timeout
+        self.name = name
+    
+    def is_retryable(self, exc: BaseException) -> bool:
+        """判断异常是否可重试"""
+        if isinstance(exc, DeadlineExceeded) or isinstance(exc, self.fatal):
+            return False
+        if self.classifier is not None:
+            verdict = self.classifier(exc)
+            if verdict is not None:
+                return verdict
+        return isinstance(exc, self.retryable)
+    
+    def compute_delay(self, attempt: int) -> float:
+        """计算第 attempt 次失败后的等待时间"""
+        delay = min(self.max_delay, self.base_delay * (self.multiplier ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(delay * (1 - self.jitter), delay)
+        return delay
+    
+    def _on_failure(self, operation: str, attempt: int, exc: Exception) -> float:
+        """处理一次失败的尝试
+        
+        Returns:
+            下一次重试前的等待时间（秒）
+            
+        Raises:
+            原异常: 不可重试、次数耗尽或剩余时间不足
+        """
+        if not self.is_retryable(exc):
+            RETRY_ATTEMPTS_TOTAL.inc(operation=operation, outcome="fatal")
+            raise exc
+        if attempt >= self.max_attempts:
+            RETRY_ATTEMPTS_TOTAL.inc(operation=operation, outcome="exhausted")
+            logger.error(f"{operation} 执行失败，已达最大重试次数 {self.max_attempts}")
+            raise exc
+        
+        delay = self.compute_delay(attempt)
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            RETRY_ATTEMPTS_TOTAL.inc(operation=operation, outcome="deadline")
+            logger.error(f"{operation} 执行失败，剩余时间 {max(remaining, 0):.2f}s 不足以重试")
+            raise exc
+        
+        RETRY_ATTEMPTS_TOTAL.inc(operation=operation, outcome="retry")
+        logger.warning(
+            f"{operation} 执行失败 (尝试 {attempt}/{self.max_attempts})，"
+            f"{delay:.2f}s 后重试: {exc}"
+        )
+        return delay
+    
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """按策略执行函数
+        
+        Args:
+            func: 要执行的函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+            
+        Returns:
+            函数返回值
+        """
+        operation = self.name or getattr(func, '__qualname__', repr(func))
+        with deadline(self.timeout):
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    with tracer.span(f"{operation}#attempt", category="retry", attempt=attempt):
+                        result = func(*args, **kwargs)
+                    RETRY_ATTEMPTS_TOTAL.inc(operation=operation, outcome="success")
+                    return result
+                except Exception as e:
+                    delay = self._on_failure(operation, attempt, e)
+                time.sleep(delay)
+    
+    async def acall(self, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """按策略执行协程函数（等待期间不阻塞事件循环）
+        
+        Args:
+            func: 返回 awaitable 的函数，每次尝试都会重新调用
+            *args: 位置参数
+            **kwargs: 关键字参数
+            
+        Returns:
+            协程返回值
+        """
+        operation = self.name or getattr(func, '__qualname__', repr(func))
+        with deadline(self.timeout):
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    with tracer.span(f"{operation}#attempt", category="retry", attempt=attempt):
+                        result = await func(*args, **kwargs)
+                    RETRY_ATTEMPTS_TOTAL.inc(operation=operation, outcome="success")
+                    return result
+                except Exception as e:
+                    delay = self._on_failure(operation, attempt, e)
+                await asyncio.sleep(delay)
+    
+    def __call__(self, func: Callable) -> Callable:
+        """作为装饰器使用"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            return self.call(func, *args, **kwargs)
+        return wrapper
+
+
+def with_deadline(seconds: Optional[float] = None):
+    """给函数设置整体时间预算的装饰器
+    
+    Args:
+        seconds: 预算秒数，None 表示调用时读取 config.wait.workflow_timeout
     """
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            last_exception = None
-            for attempt in range(1, max_attempts + 1):
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    if attempt < max_attempts:
-                        logger.warning(
-                            f"{func.__name__} 执行失败 (尝试 {attempt}/{max_attempts}): {e}"
-                        )
-                        time.sleep(delay)
-                    else:
-                        logger.error(
-                            f"{func.__name__} 执行失败，已达最大重试次数 {max_attempts}"
-                        )
-            raise last_exception
+            budget = seconds
+            if budget is None:
+                from core.config import config
+                budget = config.wait.workflow_timeout
+            with deadline(budget):
+                return func(*args, **kwargs)
         return wrapper
     return decorator
 
 
+def retry(max_attempts: int = 3, delay: float = 1.0, 
+         exceptions: Tuple[Type[Exception], ...] = (Exception,),
+         policy: Optional[RetryPolicy] = None):
+    """重试装饰器
+    
+    Args:
+        max_attempts: 最大重试次数
+        delay: 重试间隔（秒）
+        exceptions: 需要重试的异常类型
+        policy: 重试策略，提供时忽略其余参数
+    """
+    if policy is None:
+        policy = RetryPolicy(
+            max_attempts=max_attempts,
+            base_delay=delay,
+            multiplier=1.0,
+            jitter=0.0,
+            retryable=exceptions
+        )
+    return policy
+
+
 def log_execution(func: Callable) -> Callable:
-    """日志装饰器，记录函数执行"""
+    """日志装饰器，记录函数执行（追踪开启时同时记录一个 workflow span）"""
+    span_name = func.__qualname__
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs) -> Any:
-        logger.debug(f"开始执行: {func.__name__}")
+        logger.debug("开始执行: %s", func.__name__)
         start_time = time.time()
         try:
-            result = func(*args, **kwargs)
+            with tracer.span(span_name, category="workflow"):
+                result = func(*args, **kwargs)
             elapsed = time.time() - start_time
-            logger.debug(f"完成执行: {func.__name__} (耗时: {elapsed:.2f}s)")
+            logger.debug("完成执行: %s (耗时: %.2fs)", func.__name__, elapsed)
             return result
         except Exception as e:
             elapsed = time.time() - start_time
@@ -0,0 +1,160 @@
+"""DOM 元素库维护模块 - 后台清理过期元素、ANALYZE、WAL 检查点与增量 VACUUM"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from core.config import config
+from core.dom_mapper import DOMElementMapper
+from core.logger import logger
+from core.metrics import metrics
+
+DOM_DB_SIZE_BYTES = metrics.gauge(
+    "xhs_dom_db_size_bytes", "dom_elements.db 文件大小（字节）", ["file"]
+)
+DOM_DB_ROWS = metrics.gauge(
+    "xhs_dom_db_rows", "dom_elements.db 各表行数", ["table"]
+)
+DOM_PRUNED_TOTAL = metrics.counter(
+    "xhs_dom_pruned_total", "按保留期清理的 DOM 元素数量"
+)
+DOM_MAINTENANCE_SECONDS = metrics.histogram(
+    "xhs_dom_maintenance_seconds", "DOM 元素库各项维护任务耗时（秒）", ["task"]
+)
+
+# 上次维护时间（写在 dom_meta 中，跨进程共享）
+LAST_RUN_KEY = "maintenance:last_run"
+
+
+class DOMMaintenance:
+    """dom_elements.db 维护任务
+
+    在后台线程中按间隔执行，不占用浏览器操作的热路径：
+    - 清理超过保留期未更新的元素（配置中播种的选择器除外）
+    - ANALYZE 更新查询计划统计
+    - wal_checkpoint(TRUNCATE) 把 WAL 合并回主库并截断
+    - incremental_vacuum 回收空闲页
+    并把数据库文件大小和行数暴露为指标。
+
+    Example:
+        >>> maintenance = DOMMaintenance(dom_manager.mapper)
+        >>> maintenance.start()      # BrowserManager 启动后自动调用
+        >>> maintenance.run_once()   # 也可以手动执行
+    """
+
+    def __init__(self, mapper: DOMElementMapper, retention_days: Optional[int] = None,
+                 interval: Optional[float] = None):
+        """初始化维护任务
+
+        Args:
+            mapper: DOM 元素映射器
+            retention_days: 保留天数，None 则使用 config.dom.retention_days
+            interval: 维护间隔（秒），None 则使用 config.dom.maintenance_interval
+        """
+        self.mapper = mapper
+        self.retention_days = config.dom.retention_days if retention_days is None else retention_days
+        self.interval = config.dom.maintenance_interval if interval is None else interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _seeded_ids(self) -> List[str]:
+        """所有播种集合中的元素ID（不参与过期清理，否则配置未变化时不会再被播种回来）"""
+        with sqlite3.connect(self.mapper.db_path) as conn:
+            rows = conn.execute("SELECT value FROM dom_meta WHERE key LIKE 'seed:%:selectors'").fetchall()
+        return [element_id for (value,) in rows for element_id in json.loads(value)]
+
+    def prune(self) -> int:
+        """清理超过保留期未更新的元素
+
+        Returns:
+            删除的行数
+        """
+        if not self.retention_days:
+            return 0
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        deleted = self.mapper.prune(cutoff, keep_ids=self._seeded_ids())
+        if deleted:
+            DOM_PRUNED_TOTAL.inc(deleted)
+            logger.info(f"已清理 {deleted} 个超过 {self.retention_days} 天未更新的DOM元素")
+        return deleted
+
+    def update_metrics(self):
+        """更新数据库大小与行数指标"""
+        for file, path in (("db", self.mapper.db_path), ("wal", f"{self.mapper.db_path}-wal")):
+            DOM_DB_SIZE_BYTES.set(os.path.getsize(path) if os.path.exists(path) else 0, file=file)
+        with sqlite3.connect(self.mapper.db_path) as conn:
+            for table in ("dom_elements", "dom_meta"):
+                DOM_DB_ROWS.set(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], table=table)
+
+    def run_once(self) -> Dict[str, Any]:
+        """执行一轮维护
+
+        Returns:
+            各任务结果与耗时
+        """
+        result: Dict[str, Any] = {}
+
+        start_time = time.perf_counter()
+        result['pruned'] = self.prune()
+        DOM_MAINTENANCE_SECONDS.observe(time.perf_counter() - start_time, task="prune")
+
+        self.mapper.set_meta(LAST_RUN_KEY, str(time.time()))
+
+        # 检查点放在最后，把本轮所有写入合并回主库后截断 WAL
+        with sqlite3.connect(self.mapper.db_path) as conn:
+            for task, sql in (
+                ("analyze", "ANALYZE"),
+                ("vacuum", "PRAGMA incremental_vacuum"),
+                ("checkpoint", "PRAGMA wal_checkpoint(TRUNCATE)"),
+            ):
+                start_time = time.perf_counter()
+                conn.execute(sql).fetchall()
+                elapsed = time.perf_counter() - start_time
+                DOM_MAINTENANCE_SECONDS.observe(elapsed, task=task)
+                result[f'{task}_seconds'] = elapsed
+            result['freelist_pages'] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        self.update_metrics()
+        logger.debug("DOM元素库维护完成: %s", result)
+        return result
+
+    def is_due(self) -> bool:
+        """距上次维护（任意进程）是否已超过间隔"""
+        last_run = float(self.mapper.get_meta(LAST_RUN_KEY) or 0)
+        return time.time() - last_run >= self.interval
+
+    def _loop(self, delay: float):
+        # 先等待一段时间，避开浏览器启动阶段；之后每个间隔检查一次
+        wait = delay
+        while not self._stop.wait(wait):
+            try:
+                if self.is_due():
+                    self.run_once()
+                else:
+                    self.update_metrics()
+            except Exception as e:
+                logger.warning(f"DOM元素库维护失败: {e}")
+            wait = min(self.interval, 3600)
+
+    def start(self, delay: Optional[float] = None):
+        """启动后台维护线程
+
+        Args:
+            delay: 首次检查前的延迟（秒），None 则使用 config.dom.maintenance_delay
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        delay = config.dom.maintenance_delay if delay is None else delay
+        self._thread = threading.Thread(target=self._loop, args=(delay,), name="xhs-dom-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台维护线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
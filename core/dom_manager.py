@@ -1,11 +1,21 @@
 """DOM元素管理模块"""
+import hashlib
 import json
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
 from core.dom_mapper import DOMElementMapper
 from core.logger import logger
+from core.metrics import metrics
 from core.models import DOMElement
+from core.tracing import tracer
+
+DOM_LOOKUPS_TOTAL = metrics.counter(
+    "xhs_dom_lookups_total", "DOM 元素查询次数（按命中层级）", ["tier"]
+)
+DOM_SEED_TOTAL = metrics.counter(
+    "xhs_dom_seed_total", "启动时选择器播种结果（unchanged 为配置未变化直接跳过）", ["result"]
+)
 
 
 class DOMCacheManager:
@@ -44,7 +54,7 @@ class DOMCacheManager:
         try:
             with open(self.cache_file, 'w', encoding='utf-8') as f:
                 json.dump(self.cache_data, f, ensure_ascii=False, indent=2)
-            logger.debug(f"DOM缓存已保存: {len(self.cache_data)}个元素")
+            logger.debug("DOM缓存已保存: %d个元素", len(self.cache_data))
         except Exception as e:
             logger.error(f"保存DOM缓存失败: {e}")
     
@@ -126,6 +136,23 @@ class DOMCacheManager:
         """
         cache_key = f"selector:{selector}"
         return self.delete_from_cache(cache_key)
+    
+    def delete_elements_by_selectors(self, selectors: List[str]) -> int:
+        """批量从缓存删除DOM元素（只写一次缓存文件）
+        
+        Args:
+            selectors: 选择器列表
+            
+        Returns:
+            实际删除的条目数
+        """
+        removed = 0
+        for selector in set(selectors):
+            if self.cache_data.pop(f"selector:{selector}", None) is not None:
+                removed += 1
+        if removed:
+            self.save_cache()
+        return removed
 
 
 class DOMManager:
@@ -140,6 +167,19 @@ class DOMManager:
         """
         self.mapper = DOMElementMapper(db_path)
         self.cache_manager = DOMCacheManager(cache_dir)
+        self._maintenance = None
+    
+    def start_maintenance(self):
+        """启动数据库后台维护（过期清理、ANALYZE、WAL 检查点、增量 VACUUM）"""
+        if self._maintenance is None:
+            from core.dom_maintenance import DOMMaintenance
+            self._maintenance = DOMMaintenance(self.mapper)
+        self._maintenance.start()
+    
+    def stop_maintenance(self):
+        """停止数据库后台维护"""
+        if self._maintenance is not None:
+            self._maintenance.stop()
     
     def get_element(self, selector: str) -> Optional[DOMElement]:
         """获取DOM元素，优先从缓存获取，缓存没有则从数据库获取
@@ -150,22 +190,29 @@ class DOMManager:
         Returns:
             DOM元素对象，如果不存在则返回None
         """
-        # 先从缓存获取
-        element = self.cache_manager.get_element_by_selector(selector)
-        if element:
-            logger.debug(f"从缓存获取DOM元素: {selector}")
-            return element
-        
-        # 缓存没有，从数据库获取
-        element = self.mapper.find_by_selector(selector)
-        if element:
-            logger.debug(f"从数据库获取DOM元素: {selector}")
-            # 存入缓存
-            self.cache_manager.set_element_by_selector(selector, element)
-            return element
-        
-        logger.debug(f"未找到DOM元素: {selector}")
-        return None
+        with tracer.span("dom.get_element", category="dom", selector=selector) as span:
+            # 先从缓存获取
+            element = self.cache_manager.get_element_by_selector(selector)
+            if element:
+                span.set_attribute("tier", "cache")
+                DOM_LOOKUPS_TOTAL.inc(tier="cache")
+                logger.debug("从缓存获取DOM元素: %s", selector)
+                return element
+
+            # 缓存没有，从数据库获取
+            element = self.mapper.find_by_selector(selector)
+            if element:
+                span.set_attribute("tier", "database")
+                DOM_LOOKUPS_TOTAL.inc(tier="database")
+                logger.debug("从数据库获取DOM元素: %s", selector)
+                # 存入缓存
+                self.cache_manager.set_element_by_selector(selector, element)
+                return element
+
+            span.set_attribute("tier", "miss")
+            DOM_LOOKUPS_TOTAL.inc(tier="miss")
+            logger.debug("未找到DOM元素: %s", selector)
+            return None
     
     def insert_element(self, element: DOMElement) -> bool:
         """插入DOM元素到数据库并更新缓存
@@ -181,7 +228,7 @@ class DOMManager:
         if success:
             # 更新缓存
             self.cache_manager.set_element_by_selector(element.selector, element)
-            logger.debug(f"DOM元素已插入: {element.element_id}")
+            logger.debug("DOM元素已插入: %s", element.element_id)
         return success
     
     def update_element(self, element: DOMElement) -> bool:
@@ -198,30 +245,82 @@ class DOMManager:
         if success:
             # 清除缓存（下次获取时会重新从数据库加载）
             self.cache_manager.delete_element_by_selector(element.selector)
-            logger.debug(f"DOM元素已更新: {element.element_id}")
+            logger.debug("DOM元素已更新: %s", element.element_id)
         return success
     
-    def batch_insert_initial_elements(self, selectors: Dict[str, str], page_url: str = ""):
+    def batch_insert_initial_elements(self, selectors: Dict[str, str], page_url: str = "") -> Dict[str, List[str]]:
         """批量插入初始DOM元素到数据库
         
+        只写入数据库中不存在或选择器发生变化的元素，已有元素学习到的信息保持不变，
+        也只清除这些元素对应的缓存。
+        
         Args:
             selectors: 选择器字典
             page_url: 页面URL
+            
+        Returns:
+            {'added': [...], 'changed': [...], 'removed': []}
+        """
+        diff = self._apply_selectors(selectors, page_url)
+        if diff['added'] or diff['changed']:
+            logger.info(f"已批量插入初始DOM元素: 新增 {len(diff['added'])}个, 更新 {len(diff['changed'])}个")
+        return diff
+    
+    def seed_selectors(self, selectors: Dict[str, str], page_url: str = "",
+                       seed_name: str = "config") -> Dict[str, List[str]]:
+        """按配置哈希幂等地播种选择器（浏览器启动时调用）
+        
+        上次播种的选择器集合和哈希保存在 dom_meta 表中：配置没有变化时直接返回；
+        有变化时只应用新增、修改和删除的选择器，并只清除这些选择器的缓存。
+        
+        Args:
+            selectors: 选择器字典 {element_id: selector}
+            page_url: 新写入元素的页面URL
+            seed_name: 播种集合名称，不同来源的选择器互不影响
+            
+        Returns:
+            {'added': [...], 'changed': [...], 'removed': [...]}
         """
-        elements = []
+        snapshot = json.dumps(selectors, ensure_ascii=False, sort_keys=True)
+        config_hash = hashlib.sha256(snapshot.encode('utf-8')).hexdigest()
+        hash_key, snapshot_key = f"seed:{seed_name}:hash", f"seed:{seed_name}:selectors"
+
+        if self.mapper.get_meta(hash_key) == config_hash:
+            DOM_SEED_TOTAL.inc(result="unchanged")
+            logger.debug("DOM选择器配置未变化，跳过播种")
+            return {'added': [], 'changed': [], 'removed': []}
+
+        previous = json.loads(self.mapper.get_meta(snapshot_key) or "{}")
+        removed = [element_id for element_id in previous if element_id not in selectors]
+        diff = self._apply_selectors(selectors, page_url, removed, {hash_key: config_hash, snapshot_key: snapshot})
+        DOM_SEED_TOTAL.inc(result="applied")
+        logger.info(
+            f"DOM选择器已同步: 新增 {len(diff['added'])}个, 修改 {len(diff['changed'])}个, 删除 {len(diff['removed'])}个"
+        )
+        return diff
+    
+    def _apply_selectors(self, selectors: Dict[str, str], page_url: str, removed: Optional[List[str]] = None,
+                         meta: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+        """对比数据库现有元素，写入差异并清除受影响的缓存"""
+        removed = removed or []
+        existing = {e.element_id: e for e in self.mapper.find_by_ids(list(selectors) + removed)}
+
+        added, changed, upserts = [], [], []
         for element_id, selector in selectors.items():
-            element = DOMElement(
+            current = existing.get(element_id)
+            if current is not None and current.selector == selector:
+                continue
+            (changed if current is not None else added).append(element_id)
+            upserts.append(DOMElement(
                 element_id=element_id,
                 selector=selector,
                 element_type="selector",
                 page_url=page_url,
                 description=f"初始选择器: {element_id}"
-            )
-            elements.append(element)
-        
-        if elements:
-            success = self.mapper.batch_insert(elements)
-            if success:
-                # 清空缓存，让后续获取从数据库加载
-                self.cache_manager.clear_cache()
-                logger.info(f"已批量插入初始DOM元素: {len(elements)}个")
+            ))
+        removed = [element_id for element_id in removed if element_id in existing]
+
+        if (upserts or removed or meta) and self.mapper.apply_seed(upserts, removed, meta or {}):
+            stale = [existing[i].selector for i in changed + removed] + [e.selector for e in upserts]
+            self.cache_manager.delete_elements_by_selectors(stale)
+        return {'added': added, 'changed': changed, 'removed': removed}
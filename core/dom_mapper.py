@@ -7,6 +7,25 @@ from core.logger import logger
 from core.models import DOMElement
 
 
+# 当前数据库结构版本（PRAGMA user_version）
+SCHEMA_VERSION = 2
+
+# 写入路径：按 element_id 原地更新，避免 INSERT OR REPLACE 的“删除 + 插入”改写所有索引
+_UPSERT_SQL = '''
+    INSERT INTO dom_elements
+    (element_id, selector, element_type, position, text_content, updated_at, page_url, description)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(element_id) DO UPDATE SET
+        selector = excluded.selector,
+        element_type = excluded.element_type,
+        position = excluded.position,
+        text_content = excluded.text_content,
+        updated_at = excluded.updated_at,
+        page_url = excluded.page_url,
+        description = excluded.description
+'''
+
+
 class DOMElementMapper:
     """DOM元素映射器 - 负责DOM元素与数据库之间的映射操作"""
     
@@ -20,34 +39,93 @@ class DOMElementMapper:
         self.init_database()
     
     def init_database(self):
-        """初始化数据库表结构"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # 创建DOM元素表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS dom_elements (
-                    element_id TEXT PRIMARY KEY,
-                    selector TEXT NOT NULL,
-                    element_type TEXT NOT NULL,
-                    position TEXT,
-                    text_content TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    page_url TEXT,
-                    description TEXT
-                )
-            ''')
-            
-            # 创建索引以提高查询性能
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_selector ON dom_elements(selector)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_url ON dom_elements(page_url)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_element_type ON dom_elements(element_type)')
-            
-            conn.commit()
-            logger.info(f"DOM元素数据库初始化完成: {self.db_path}")
+        """初始化数据库表结构，并按 PRAGMA user_version 依次执行迁移"""
+        # 显式关闭连接：WAL 模式下最后一个连接关闭时才会合并并删除 -wal/-shm 文件
+        conn = sqlite3.connect(self.db_path)
+        try:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            migrations = ((1, self._migrate_v1), (2, self._migrate_v2))
+            for target, migrate in migrations:
+                if version < target:
+                    migrate(conn)
+                    conn.execute(f'PRAGMA user_version = {target}')
+                    conn.commit()
+                    if version:
+                        logger.info(f"DOM元素数据库已迁移到版本 {target}: {self.db_path}")
+        finally:
+            conn.close()
+        logger.info(f"DOM元素数据库初始化完成: {self.db_path}")
+    
+    @staticmethod
+    def _migrate_v1(conn: sqlite3.Connection):
+        """版本 1：元素表与元数据表"""
+        cursor = conn.cursor()
+        
+        # 创建DOM元素表
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS dom_elements (
+                element_id TEXT PRIMARY KEY,
+                selector TEXT NOT NULL,
+                element_type TEXT NOT NULL,
+                position TEXT,
+                text_content TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                page_url TEXT,
+                description TEXT
+            )
+        ''')
+        
+        # 创建索引以提高查询性能
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_selector ON dom_elements(selector)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_url ON dom_elements(page_url)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_element_type ON dom_elements(element_type)')
+
+        # 元数据表（如选择器配置哈希，用于判断启动时是否需要重新播种）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS dom_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+    
+    @staticmethod
+    def _migrate_v2(conn: sqlite3.Connection):
+        """版本 2：选择器唯一（按选择器查找只应命中一行），开启 WAL 与增量 VACUUM"""
+        # 同一选择器只保留最后写入的一行（INSERT OR REPLACE 每次写入都会分配新的 rowid）
+        conn.execute('''
+            DELETE FROM dom_elements
+            WHERE rowid NOT IN (SELECT MAX(rowid) FROM dom_elements GROUP BY selector)
+        ''')
+        conn.execute('DROP INDEX IF EXISTS idx_selector')
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_selector_unique ON dom_elements(selector)')
+        conn.commit()
+
+        # auto_vacuum 需要 VACUUM 一次才能对已有数据库生效；两者都不能在事务中执行
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+        conn.execute('PRAGMA journal_mode = WAL')
+    
+    @staticmethod
+    def _write_elements(cursor: sqlite3.Cursor, elements: List[DOMElement]):
+        """写入元素：选择器被其他元素占用时先移除旧元素，再按 element_id 原地更新或插入"""
+        for element in elements:
+            cursor.execute(
+                'DELETE FROM dom_elements WHERE selector = ? AND element_id != ?',
+                (element.selector, element.element_id)
+            )
+            cursor.execute(_UPSERT_SQL, (
+                element.element_id,
+                element.selector,
+                element.element_type,
+                element.position,
+                element.text_content,
+                element.updated_at.isoformat() if element.updated_at else datetime.now().isoformat(),
+                element.page_url,
+                element.description
+            ))
     
     def insert(self, element: DOMElement) -> bool:
-        """插入DOM元素
+        """插入DOM元素（已存在则原地更新）
         
         Args:
             element: DOM元素对象
@@ -57,25 +135,9 @@ class DOMElementMapper:
         """
         try:
             with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO dom_elements 
-                    (element_id, selector, element_type, position, text_content, updated_at, page_url, description)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    element.element_id,
-                    element.selector,
-                    element.element_type,
-                    element.position,
-                    element.text_content,
-                    element.updated_at.isoformat() if element.updated_at else datetime.now().isoformat(),
-                    element.page_url,
-                    element.description
-                ))
-                
+                self._write_elements(conn.cursor(), [element])
                 conn.commit()
-                logger.debug(f"DOM元素已插入/更新: {element.element_id}")
+                logger.debug("DOM元素已插入/更新: %s", element.element_id)
                 return True
         except Exception as e:
             logger.error(f"插入DOM元素失败: {e}")
@@ -131,6 +193,30 @@ class DOMElementMapper:
             logger.error(f"根据选择器查找DOM元素失败: {e}")
             return None
     
+    def find_by_ids(self, element_ids: List[str]) -> List[DOMElement]:
+        """根据ID列表批量查找DOM元素
+        
+        Args:
+            element_ids: 元素ID列表
+            
+        Returns:
+            存在的DOM元素列表
+        """
+        if not element_ids:
+            return []
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                placeholders = ", ".join("?" * len(element_ids))
+                cursor.execute(f'''
+                    SELECT element_id, selector, element_type, position, text_content, updated_at, page_url, description
+                    FROM dom_elements WHERE element_id IN ({placeholders})
+                ''', list(element_ids))
+                return [e for e in (self._row_to_element(row) for row in cursor.fetchall()) if e]
+        except Exception as e:
+            logger.error(f"批量查找DOM元素失败: {e}")
+            return []
+    
     def find_by_page_url(self, page_url: str) -> List[DOMElement]:
         """根据页面URL查找DOM元素列表
         
@@ -218,7 +304,7 @@ class DOMElementMapper:
         Returns:
             是否更新成功
         """
-        return self.insert(element)  # 复用插入方法，使用INSERT OR REPLACE
+        return self.insert(element)  # 复用插入方法，ON CONFLICT 原地更新
     
     def delete(self, element_id: str) -> bool:
         """删除DOM元素
@@ -292,24 +378,7 @@ class DOMElementMapper:
         """
         try:
             with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                for element in elements:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO dom_elements 
-                        (element_id, selector, element_type, position, text_content, updated_at, page_url, description)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        element.element_id,
-                        element.selector,
-                        element.element_type,
-                        element.position,
-                        element.text_content,
-                        element.updated_at.isoformat() if element.updated_at else datetime.now().isoformat(),
-                        element.page_url,
-                        element.description
-                    ))
-                
+                self._write_elements(conn.cursor(), elements)
                 conn.commit()
                 logger.info(f"批量插入DOM元素完成: {len(elements)}个")
                 return True
@@ -317,6 +386,91 @@ class DOMElementMapper:
             logger.error(f"批量插入DOM元素失败: {e}")
             return False
     
+    def get_meta(self, key: str) -> Optional[str]:
+        """读取元数据
+        
+        Args:
+            key: 元数据键
+            
+        Returns:
+            元数据值，不存在则返回None
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute('SELECT value FROM dom_meta WHERE key = ?', (key,)).fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            logger.error(f"读取DOM元数据失败: {e}")
+            return None
+    
+    def set_meta(self, key: str, value: str) -> bool:
+        """写入元数据
+        
+        Args:
+            key: 元数据键
+            value: 元数据值
+            
+        Returns:
+            是否成功
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('INSERT OR REPLACE INTO dom_meta (key, value) VALUES (?, ?)', (key, value))
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"写入DOM元数据失败: {e}")
+            return False
+    
+    def prune(self, older_than: datetime, keep_ids: Optional[List[str]] = None) -> int:
+        """删除 updated_at 早于指定时间的元素
+        
+        Args:
+            older_than: 截止时间
+            keep_ids: 不删除的元素ID（如配置中的选择器）
+            
+        Returns:
+            删除的行数
+        """
+        keep_ids = list(keep_ids or [])
+        placeholders = ", ".join("?" * len(keep_ids))
+        query = 'DELETE FROM dom_elements WHERE datetime(updated_at) < datetime(?)'
+        if keep_ids:
+            query += f' AND element_id NOT IN ({placeholders})'
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute(query, [older_than.isoformat(sep=' ')] + keep_ids)
+                conn.commit()
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"清理过期DOM元素失败: {e}")
+            return 0
+    
+    def apply_seed(self, upserts: List[DOMElement], deleted_ids: List[str], meta: Dict[str, str]) -> bool:
+        """在一个事务中写入/删除播种的元素并更新元数据
+        
+        Args:
+            upserts: 需要写入的元素（新增或选择器变化）
+            deleted_ids: 需要删除的元素ID
+            meta: 需要更新的元数据
+            
+        Returns:
+            是否成功
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany('DELETE FROM dom_elements WHERE element_id = ?', [(i,) for i in deleted_ids])
+                self._write_elements(cursor, upserts)
+                cursor.executemany(
+                    'INSERT OR REPLACE INTO dom_meta (key, value) VALUES (?, ?)', list(meta.items())
+                )
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"同步初始DOM元素失败: {e}")
+            return False
+    
     def _row_to_element(self, row: tuple) -> Optional[DOMElement]:
         """将数据库行转换为DOMElement对象
         
@@ -42,3 +42,13 @@ class NetworkError(XHSPublisherException):
 class ValidationError(XHSPublisherException):
     """数据验证失败"""
     pass
+
+
+class DeadlineExceeded(XHSPublisherException):
+    """超出整体时间预算"""
+    pass
+
+
+class TokenBudgetExceeded(XHSPublisherException):
+    """AI token 预算已用尽"""
+    pass
@@ -1,13 +1,23 @@
 """日志管理模块"""
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
 import sys
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, List, Optional
 from pathlib import Path
 
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
 class ColoredFormatter(logging.Formatter):
     """带颜色的日志格式化器"""
-    
+
     # ANSI 颜色代码
     COLORS = {
         'DEBUG': '\033[36m',     # 青色
@@ -17,71 +27,218 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': '\033[35m',  # 紫色
     }
     RESET = '\033[0m'
-    
+
     def format(self, record):
         """格式化日志记录"""
         # 获取颜色
         color = self.COLORS.get(record.levelname, self.RESET)
-        
-        # 给日志级别添加颜色
-        record.levelname = f"{color}{record.levelname}{self.RESET}"
-        
+
+        # 在副本上给日志级别添加颜色，避免颜色代码泄漏到其他处理器（如文件）
+        colored_record = copy.copy(record)
+        colored_record.levelname = f"{color}{record.levelname}{self.RESET}"
+
         # 调用父类格式化
-        return super().format(record)
+        return super().format(colored_record)
+
+
+class LazyFormat:
+    """延迟格式化参数
+
+    配合 %-风格日志参数使用，只有当日志级别启用且记录真正被输出时才会调用函数求值：
+
+        logger.debug("响应结构: %s", LazyFormat(lambda: json.dumps(data, indent=2)))
+    """
+
+    __slots__ = ('_func',)
+
+    def __init__(self, func: Callable[[], Any]):
+        """初始化延迟格式化参数
+
+        Args:
+            func: 无参函数，返回要输出的内容
+        """
+        self._func = func
+
+    def __str__(self) -> str:
+        """求值并转换为字符串"""
+        try:
+            return str(self._func())
+        except Exception as e:
+            return f"<格式化失败: {e}>"
+
+    __repr__ = __str__
+
+
+def lazy_json(obj: Any, **kwargs) -> LazyFormat:
+    """延迟序列化为 JSON 的日志参数
+
+    Args:
+        obj: 要序列化的对象
+        **kwargs: 传递给 json.dumps 的参数（默认 ensure_ascii=False）
+
+    Returns:
+        LazyFormat 实例
+    """
+    kwargs.setdefault('ensure_ascii', False)
+    return LazyFormat(lambda: json.dumps(obj, **kwargs))
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """入队时不格式化的 QueueHandler
+
+    标准库的 QueueHandler.prepare() 会在调用线程中执行 self.format(record)（求值 LazyFormat、拼接消息）。
+    这里只入队记录的浅拷贝，保留 msg/args/exc_info，由后台监听线程中的各处理器格式化。
+    参数在监听线程中才求值，因此不要传入之后会被修改的可变对象。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """复制记录（处理器之间不共享修改），不做格式化"""
+        return copy.copy(record)
+
+
+def _env_flag(name: str) -> bool:
+    """读取布尔型环境变量"""
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
 
 
 class Logger:
-    """统一日志管理器"""
-    
+    """统一日志管理器
+
+    支持的环境变量（在首次导入前设置）：
+        XHS_LOG_FILE: 日志文件路径，不设置则只输出到控制台
+        XHS_LOG_LEVEL: 控制台日志级别，默认 INFO
+        XHS_LOG_ASYNC: 是否使用队列异步写日志（1/true 开启）
+        XHS_LOG_MAX_BYTES: 单个日志文件最大字节数，0 表示不轮转
+        XHS_LOG_BACKUP_COUNT: 轮转保留的历史文件数
+    """
+
     _instance: Optional[logging.Logger] = None
-    
+    _listener: Optional[QueueListener] = None
+
     @classmethod
     def get_logger(cls, name: str = "XHSPublisher", log_file: Optional[str] = None) -> logging.Logger:
         """获取日志实例（单例模式）"""
         if cls._instance is None:
-            cls._instance = cls._create_logger(name, log_file)
+            cls._instance = cls._create_logger(name, log_file or os.environ.get('XHS_LOG_FILE'))
         return cls._instance
-    
+
     @classmethod
     def _create_logger(cls, name: str, log_file: Optional[str]) -> logging.Logger:
         """创建日志记录器"""
         logger = logging.getLogger(name)
-        logger.setLevel(logging.DEBUG)
-        
+
         # 避免重复添加handler
         if logger.handlers:
             return logger
-        
-        # 格式化器（控制台使用带颜色的）
-        console_formatter = ColoredFormatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
+
+        cls._setup_handlers(
+            logger,
+            log_file=log_file,
+            console_level=os.environ.get('XHS_LOG_LEVEL', 'INFO').upper(),
+            use_queue=_env_flag('XHS_LOG_ASYNC'),
+            max_bytes=int(os.environ.get('XHS_LOG_MAX_BYTES', '0') or 0),
+            backup_count=int(os.environ.get('XHS_LOG_BACKUP_COUNT', '3') or 3)
         )
-        
+        return logger
+
+    @classmethod
+    def configure(
+        cls,
+        log_file: Optional[str] = None,
+        console_level: str = "INFO",
+        use_queue: bool = False,
+        max_bytes: int = 0,
+        backup_count: int = 3
+    ) -> logging.Logger:
+        """重新配置全局日志实例的处理器
+
+        Args:
+            log_file: 日志文件路径（可选）
+            console_level: 控制台日志级别
+            use_queue: 是否通过 QueueHandler/QueueListener 在后台线程格式化并写日志（调用线程只入队）
+            max_bytes: 单个日志文件最大字节数，超过后轮转，0 表示不轮转
+            backup_count: 轮转保留的历史文件数
+
+        Returns:
+            配置后的日志实例
+        """
+        logger = cls.get_logger()
+        cls.shutdown()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+
+        cls._setup_handlers(logger, log_file, console_level, use_queue, max_bytes, backup_count)
+        return logger
+
+    @classmethod
+    def _setup_handlers(
+        cls,
+        logger: logging.Logger,
+        log_file: Optional[str],
+        console_level: str,
+        use_queue: bool,
+        max_bytes: int,
+        backup_count: int
+    ):
+        """创建并挂载处理器"""
+        # 格式化器（控制台使用带颜色的）
+        console_formatter = ColoredFormatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+
         # 文件使用普通格式化器（不带颜色代码）
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
+        file_formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+
+        handlers: List[logging.Handler] = []
+
         # 控制台处理器
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
+        console_handler.setLevel(console_level)
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-        
+        handlers.append(console_handler)
+
         # 文件处理器
         if log_file:
             log_path = Path(log_file)
             log_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+
+            if max_bytes > 0:
+                file_handler = RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+                )
+            else:
+                file_handler = logging.FileHandler(log_file, encoding='utf-8')
             file_handler.setLevel(logging.DEBUG)
             file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
-        
-        return logger
+            handlers.append(file_handler)
+
+        # 记录器级别取所有处理器中最低的级别，
+        # 这样没有处理器需要的级别会在 isEnabledFor 处直接被过滤，不会构造日志记录
+        logger.setLevel(min(handler.level for handler in handlers))
+
+        if use_queue:
+            # 热路径只负责入队，消息格式化（含 LazyFormat 求值）和 I/O 交给后台监听线程
+            log_queue: queue.Queue = queue.Queue(-1)
+            logger.addHandler(_DeferredQueueHandler(log_queue))
+            cls._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            cls._listener.start()
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
+
+    @classmethod
+    def is_enabled_for(cls, level: int) -> bool:
+        """判断指定级别的日志是否会被输出，用于保护代价较高的日志参数构造"""
+        return cls.get_logger().isEnabledFor(level)
+
+    @classmethod
+    def shutdown(cls):
+        """停止后台日志线程并刷新队列中剩余的日志"""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
 
+atexit.register(Logger.shutdown)
 
 # 全局日志实例
 logger = Logger.get_logger()
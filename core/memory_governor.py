@@ -0,0 +1,259 @@
+"""浏览器内存治理模块 - 后台采样浏览器内存，超过阈值时在操作间隙逐级清理缓存、回收标签页或重启浏览器"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from core.browser_daemon import BrowserDaemon
+from core.config import config
+from core.logger import logger
+from core.metrics import metrics
+
+BROWSER_MEMORY_BYTES = metrics.gauge(
+    "xhs_browser_memory_bytes",
+    "浏览器内存（pss 为 Chrome 进程树各进程 PSS 之和，无法读取 PSS 的进程取 RSS；js_heap 为页面 JS 堆已用大小）", ["kind"]
+)
+BROWSER_DOM_NODES = metrics.gauge(
+    "xhs_browser_dom_nodes", "当前页面的 DOM 节点数"
+)
+MEMORY_ACTIONS_TOTAL = metrics.counter(
+    "xhs_memory_actions_total", "内存治理动作次数（clear_cache / recycle_tab / restart，失败时带 _failed 后缀）", ["action"]
+)
+
+# 动作按严重程度排列
+ACTIONS = ("clear_cache", "recycle_tab", "restart")
+
+
+def _read_kb_field(path: str, field: str) -> Optional[int]:
+    """读取 /proc 文件中以 kB 为单位的字段（如 Pss:、VmRSS:），返回字节数"""
+    with open(path) as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def _process_memory(pid: int) -> Optional[int]:
+    """单个进程的内存（字节）：优先取 /proc/<pid>/smaps_rollup 中的 PSS，无法读取时取 VmRSS
+
+    PSS 把共享页（Chrome 可执行文件、共享库、共享内存）按共享进程数均摊，多进程相加不会重复计算；
+    RSS 在每个进程中都完整计入共享页，相加后会明显高于实际占用。
+    """
+    try:
+        pss = _read_kb_field(f"/proc/{pid}/smaps_rollup", "Pss:")
+        if pss is not None:
+            return pss
+    except (OSError, ValueError):
+        pass
+    return _read_kb_field(f"/proc/{pid}/status", "VmRSS:")
+
+
+def process_tree_memory(pid: int) -> Optional[int]:
+    """进程及其所有子进程的内存之和（字节，按进程取 PSS，无法读取时取 RSS），只支持 Linux（读取 /proc），其他平台返回 None
+
+    Args:
+        pid: 根进程ID
+
+    Returns:
+        内存字节数，无法读取时返回 None
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    total, pending, seen = 0, [pid], set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            total += _process_memory(current) or 0
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total if seen and total else None
+
+
+class MemoryGovernor:
+    """浏览器内存治理
+
+    后台线程每隔 config.memory.check_interval 秒读取一次进程树内存（PSS 之和，只读 /proc，不发送 WebDriver 命令），
+    超过阈值时只记下待执行的动作。Performance.getMetrics 与业务操作共用同一个 WebDriver 会话，
+    只在 BrowserManager.checkpoint()（业务操作之间，自动化线程）中按同样的间隔采样。
+    动作也在 checkpoint() 中执行，不会打断正在进行的操作。
+    阈值从低到高依次对应：清理缓存并关闭多余标签页、回收标签页、重启浏览器。
+
+    Example:
+        >>> governor = MemoryGovernor(browser_manager)
+        >>> governor.start()
+        >>> governor.checkpoint()   # 每个业务操作开始前调用（BrowserManager.checkpoint()）
+    """
+
+    def __init__(self, browser_manager):
+        """初始化内存治理
+
+        Args:
+            browser_manager: 浏览器管理器实例
+        """
+        self.browser = browser_manager
+        self.pending_action: Optional[str] = None
+        self.last_sample: Dict[str, Any] = {}
+        # 采样与执行动作互斥（重启期间不采样）
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._performance_enabled = False
+        # 上次采样页面指标（Performance.getMetrics）的时间
+        self._last_page_sample = time.monotonic()
+
+    def _browser_pid(self) -> Optional[int]:
+        """Chrome 进程树的根进程：冷启动为 chromedriver（Chrome 是其子进程），接管模式为常驻浏览器进程"""
+        if self.browser.attached:
+            return BrowserDaemon().status().get("pid")
+        process = getattr(self.browser.driver.service, "process", None)
+        return process.pid if process else None
+
+    def sample(self, include_page: bool = True) -> Dict[str, Any]:
+        """采样一次内存并更新指标
+
+        Args:
+            include_page: 是否采样页面指标（Performance.getMetrics）。会在业务操作共用的 WebDriver 会话上发送命令，
+                只能在自动化线程中使用；后台线程传 False，只读取进程树内存
+
+        Returns:
+            {'pss': 字节数或 None, 'js_heap': 字节数或 None, 'nodes': DOM 节点数或 None,
+            'memory': 用于比较阈值的字节数（进程树 PSS，无法读取时为 JS 堆大小）或 None}
+        """
+        values = None
+        with self._lock:
+            if include_page:
+                if not self._performance_enabled:
+                    self.browser.execute_cdp_cmd("Performance.enable", {})
+                    self._performance_enabled = True
+                values = {
+                    item["name"]: item["value"]
+                    for item in self.browser.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+                }
+                self._last_page_sample = time.monotonic()
+            pid = self._browser_pid()
+
+        pss = process_tree_memory(pid) if pid else None
+        sample = {"pss": pss, "js_heap": None, "nodes": None}
+        if values is not None:
+            sample["js_heap"] = int(values.get("JSHeapUsedSize", 0))
+            sample["nodes"] = int(values.get("Nodes", 0))
+            BROWSER_MEMORY_BYTES.set(sample["js_heap"], kind="js_heap")
+            BROWSER_DOM_NODES.set(sample["nodes"])
+        sample["memory"] = pss if pss is not None else sample["js_heap"]
+
+        if pss is not None:
+            BROWSER_MEMORY_BYTES.set(pss, kind="pss")
+        self.last_sample = sample
+        return sample
+
+    @staticmethod
+    def choose_action(memory_bytes: int) -> Optional[str]:
+        """按阈值选择动作（取已超过的最高一级）
+
+        Args:
+            memory_bytes: 内存字节数
+
+        Returns:
+            动作名称，未超过任何阈值时返回 None
+        """
+        memory_mb = memory_bytes / (1024 * 1024)
+        limits = (config.memory.clear_cache_mb, config.memory.recycle_tab_mb, config.memory.restart_mb)
+        action = None
+        for name, limit in zip(ACTIONS, limits):
+            if limit and memory_mb >= limit:
+                action = name
+        return action
+
+    def check(self, include_page: bool = True) -> Optional[str]:
+        """采样并记下需要执行的动作（只会升级，不会降级尚未执行的动作）
+
+        Args:
+            include_page: 是否采样页面指标，见 sample()
+        """
+        memory = self.sample(include_page)["memory"]
+        if memory is None:
+            return self.pending_action
+        action = self.choose_action(memory)
+        if action and (self.pending_action is None or ACTIONS.index(action) > ACTIONS.index(self.pending_action)):
+            self.pending_action = action
+            logger.warning(f"浏览器内存 {self.last_sample['memory'] / 1024 / 1024:.0f}MB 超过阈值，将在下次操作前执行: {action}")
+        return self.pending_action
+
+    def checkpoint(self) -> Optional[str]:
+        """业务操作之间调用（自动化线程）：距上次页面采样超过采样间隔时先采样，再执行待处理的动作
+
+        Returns:
+            执行的动作名称，没有待处理动作时返回 None
+        """
+        if config.memory.enabled and time.monotonic() - self._last_page_sample >= config.memory.check_interval:
+            try:
+                self.check()
+            except Exception as e:
+                logger.debug("浏览器内存采样失败: %s", e)
+        return self.apply_pending()
+
+    def apply_pending(self) -> Optional[str]:
+        """执行待处理的动作（在业务操作之间调用）
+
+        Returns:
+            执行的动作名称，没有待处理动作时返回 None
+        """
+        action = self.pending_action
+        if action is None:
+            return None
+        with self._lock:
+            self.pending_action = None
+            try:
+                if action == "clear_cache":
+                    self._clear_cache()
+                elif action == "recycle_tab":
+                    self.browser.recycle_tab()
+                else:
+                    self.browser.restart()
+                if action != "clear_cache":
+                    # 新标签页/新浏览器需要重新开启 Performance 域
+                    self._performance_enabled = False
+            except Exception as e:
+                logger.error(f"内存治理动作 {action} 失败: {e}")
+                MEMORY_ACTIONS_TOTAL.inc(action=f"{action}_failed")
+                return None
+        MEMORY_ACTIONS_TOTAL.inc(action=action)
+        logger.info(f"内存治理动作已执行: {action}")
+        return action
+
+    def _clear_cache(self):
+        """清理浏览器缓存、触发垃圾回收并关闭多余的标签页"""
+        self.browser.execute_cdp_cmd("Network.clearBrowserCache", {})
+        self.browser.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+        closed = self.browser.close_stray_tabs()
+        if closed:
+            logger.info(f"已关闭 {closed} 个多余的标签页")
+
+    def _loop(self):
+        # 后台线程不使用 WebDriver 会话：只读取进程树内存
+        while not self._stop.wait(config.memory.check_interval):
+            try:
+                self.check(include_page=False)
+            except Exception as e:
+                logger.debug("浏览器内存采样失败: %s", e)
+
+    def start(self):
+        """启动后台采样线程（只采样进程树内存）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="xhs-memory-governor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台采样线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
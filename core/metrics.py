@@ -0,0 +1,359 @@
+"""运行指标模块 - 计数器、仪表盘、延迟直方图与 Prometheus 文本暴露"""
+import bisect
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from core.logger import logger
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+# 默认延迟分桶（秒），覆盖从本地缓存查询到 AI 长请求的范围
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Metric:
+    """指标基类 - 按标签值保存样本"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """初始化指标
+
+        Args:
+            name: 指标名称
+            documentation: 指标说明
+            labelnames: 标签名列表
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        """把标签字典转换为有序的标签值元组"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际传入 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        """格式化 Prometheus 标签"""
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = (
+            '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in pairs
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    def _label_string(self, key: Tuple[str, ...]) -> str:
+        """快照中使用的标签字符串，如 'tier=cache'"""
+        return ",".join(f"{name}={value}" for name, value in zip(self.labelnames, key))
+
+    def samples(self) -> Dict[str, Any]:
+        """获取样本快照"""
+        with self._lock:
+            return {self._label_string(key): self._snapshot_value(value) for key, value in self._values.items()}
+
+    def _snapshot_value(self, value: Any) -> Any:
+        """样本值快照"""
+        return value
+
+    def render(self) -> List[str]:
+        """渲染为 Prometheus 文本行"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{self._format_labels(key)} {_format_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        """增加计数
+
+        Args:
+            amount: 增加量（不能为负）
+            **labels: 标签值
+        """
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        """获取当前计数"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """可增可减的仪表盘"""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        """设置当前值"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        """增加"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        """减少"""
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        """获取当前值"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class _HistogramState:
+    """直方图单个标签组合的状态"""
+
+    __slots__ = ('bucket_counts', 'count', 'total')
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * bucket_count
+        self.count = 0
+        self.total = 0.0
+
+
+class _Timer:
+    """直方图计时上下文"""
+
+    __slots__ = ('_histogram', '_labels', '_start')
+
+    def __init__(self, histogram: 'Histogram', labels: Dict[str, Any]):
+        self._histogram = histogram
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class Histogram(_Metric):
+    """延迟直方图"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """初始化直方图
+
+        Args:
+            name: 指标名称
+            documentation: 指标说明
+            labelnames: 标签名列表
+            buckets: 分桶上界（升序）
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """记录一次观测值"""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = _HistogramState(len(self.buckets) + 1)
+            state.bucket_counts[index] += 1
+            state.count += 1
+            state.total += value
+
+    def time(self, **labels) -> _Timer:
+        """返回计时上下文管理器，退出时记录耗时"""
+        return _Timer(self, labels)
+
+    def _snapshot_value(self, state: _HistogramState) -> Dict[str, Any]:
+        """直方图快照：次数、总和与累计分桶"""
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, state.bucket_counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        return {'count': state.count, 'sum': state.total, 'buckets': buckets}
+
+    def render(self) -> List[str]:
+        """渲染为 Prometheus 文本行"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            for key, state in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, state.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f"{self.name}_bucket{self._format_labels(key, ('le', _format_number(bound)))} {cumulative}"
+                    )
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', '+Inf'))} {state.count}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_number(state.total)}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {state.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表
+
+    同名指标重复注册时返回已有实例，因此各模块可以在模块级直接声明自己的指标。
+
+    Example:
+        >>> LOOKUPS = metrics.counter("xhs_dom_lookups_total", "DOM 查询次数", ["tier"])
+        >>> LOOKUPS.inc(tier="cache")
+        >>> metrics.snapshot()["xhs_dom_lookups_total"]
+        {'tier=cache': 1.0}
+    """
+
+    def __init__(self):
+        """初始化注册表"""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._server: Optional['ThreadingHTTPServer'] = None
+        self._server_thread: Optional[threading.Thread] = None
+
+    def _get_or_create(self, metric_class: type, name: str, documentation: str,
+                       labelnames: Sequence[str], **kwargs) -> Any:
+        """获取或创建指标"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_class) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"指标 {name} 已以不同类型或标签注册")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册（或获取）计数器"""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """注册（或获取）仪表盘"""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """注册（或获取）直方图"""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """按名称获取指标"""
+        return self._metrics.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有指标的快照
+
+        Returns:
+            {指标名: {标签字符串: 值}}，直方图的值为 {'count', 'sum', 'buckets'}
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.samples() for metric in metrics}
+
+    def render_prometheus(self) -> str:
+        """渲染为 Prometheus 文本格式"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port: int = 9464, host: str = "127.0.0.1") -> int:
+        """在后台线程启动 /metrics HTTP 端点
+
+        Args:
+            port: 监听端口，0 表示随机端口
+            host: 监听地址，默认只监听本机
+
+        Returns:
+            实际监听的端口
+        """
+        if self._server is not None:
+            return self._server.server_address[1]
+
+        # 只有开启端点时才需要 http.server，放在这里避免拖慢 core 的导入
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            """Prometheus 文本格式请求处理器"""
+
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server_thread = threading.Thread(
+            target=self._server.serve_forever, name="xhs-metrics-http", daemon=True
+        )
+        self._server_thread.start()
+        actual_port = self._server.server_address[1]
+        logger.info(f"指标端点已启动: http://{host}:{actual_port}/metrics")
+        return actual_port
+
+    def start_from_env(self) -> Optional[int]:
+        """根据环境变量 XHS_METRICS_PORT 启动指标端点（未设置则不启动）"""
+        port = os.environ.get('XHS_METRICS_PORT')
+        if not port:
+            return None
+        try:
+            return self.start_http_server(int(port))
+        except OSError as e:
+            logger.warning(f"指标端点启动失败: {e}")
+            return None
+
+    def stop_http_server(self):
+        """停止指标端点"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._server_thread = None
+
+
+def _format_number(value: float) -> str:
+    """格式化数值"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
@@ -5,6 +5,7 @@ from .audio_info import AudioInfo
 from .comment import Comment
 from .note_info import NoteInfo
 from .ai_config import AIConfig
+from .ai_usage import AIUsage
 from .publish_content import PublishContent
 from .dom_element import DOMElement
 
@@ -14,6 +15,7 @@ __all__ = [
     'Comment',
     'NoteInfo',
     'AIConfig',
+    'AIUsage',
     'PublishContent',
     'DOMElement',
 ]
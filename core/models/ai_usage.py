@@ -0,0 +1,54 @@
+"""AI 用量数据模型"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class AIUsage:
+    """单次 AI 调用的用量记录"""
+    provider: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    cached: bool = False
+    operation: Optional[str] = None  # 业务操作（如 generate_xiaohongshu_post）
+    style: Optional[str] = None  # 内容风格（如 fairy）
+    created_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def total_tokens(self) -> int:
+        """总 token 数"""
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            'provider': self.provider,
+            'model': self.model,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'total_tokens': self.total_tokens,
+            'latency': self.latency,
+            'cached': self.cached,
+            'operation': self.operation,
+            'style': self.style,
+            'created_at': self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AIUsage':
+        """从字典创建实例"""
+        created_at = data.get('created_at')
+        return cls(
+            provider=data.get('provider', ''),
+            model=data.get('model', ''),
+            prompt_tokens=data.get('prompt_tokens', 0) or 0,
+            completion_tokens=data.get('completion_tokens', 0) or 0,
+            latency=data.get('latency', 0.0) or 0.0,
+            cached=bool(data.get('cached', False)),
+            operation=data.get('operation'),
+            style=data.get('style'),
+            created_at=datetime.fromisoformat(created_at) if created_at else datetime.now()
+        )
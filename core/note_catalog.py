@@ -0,0 +1,231 @@
+"""笔记目录模块 - 从个人主页笔记列表接口的响应中收集笔记，SQLite + FTS5 标题索引，按关键词本地查找笔记链接"""
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from core.logger import logger
+from core.metrics import metrics
+
+NOTE_CATALOG_LOOKUPS_TOTAL = metrics.counter(
+    "xhs_note_catalog_lookups_total", "笔记目录按关键词查找的结果（hit / miss / stale）", ["result"]
+)
+NOTE_CATALOG_NOTES = metrics.gauge(
+    "xhs_note_catalog_notes", "笔记目录中的笔记数"
+)
+
+# 笔记详情页地址（带 xsec_token 才能直接打开）
+NOTE_URL = "https://www.xiaohongshu.com/explore/{note_id}"
+
+# trigram 分词器最短只能匹配 3 个字符，更短的关键词直接扫描标题
+_MIN_MATCH_CHARS = 3
+
+
+def parse_note_list(body: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """解析个人主页笔记列表接口（user_posted）的响应
+
+    Args:
+        body: 响应体 JSON 文本
+
+    Returns:
+        (笔记列表, 是否还有下一页)，笔记为 {'note_id', 'title', 'xsec_token', 'note_type', 'user_id'}
+    """
+    data = json.loads(body).get("data") or {}
+    notes = []
+    for item in data.get("notes") or []:
+        note_id = item.get("note_id") or item.get("id")
+        if not note_id:
+            continue
+        notes.append({
+            "note_id": note_id,
+            "title": (item.get("display_title") or item.get("title") or "").strip(),
+            "xsec_token": item.get("xsec_token") or "",
+            "note_type": item.get("type") or "",
+            "user_id": (item.get("user") or {}).get("user_id") or "",
+        })
+    return notes, bool(data.get("has_more"))
+
+
+def note_list_user_id(url: str) -> str:
+    """笔记列表接口地址中的 user_id 参数"""
+    return parse_qs(urlparse(url).query).get("user_id", [""])[0]
+
+
+class NoteCatalog:
+    """笔记目录
+
+    笔记按 note_id 增量写入（已有笔记只更新标题和 xsec_token），标题建有 FTS5（trigram 分词）全文索引，
+    支持中文标题的子串查找。SQLite 不支持 trigram 分词器时退化为 LIKE 扫描。
+
+    Example:
+        >>> catalog = NoteCatalog("cache/note_catalog.db")
+        >>> catalog.upsert(parse_note_list(body)[0])
+        >>> catalog.search("关键词", user_id="5f...")
+        [{'note_id': '65a...', 'title': '...', 'url': 'https://www.xiaohongshu.com/explore/65a...?xsec_token=...'}]
+    """
+
+    def __init__(self, db_path: str = "cache/note_catalog.db"):
+        """初始化笔记目录
+
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = db_path
+        self.fts_enabled = True
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """提交并关闭的连接"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def init_database(self):
+        """初始化笔记表、全文索引及同步触发器"""
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS notes (
+                    id INTEGER PRIMARY KEY,
+                    note_id TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL,
+                    xsec_token TEXT,
+                    note_type TEXT,
+                    user_id TEXT,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_notes_user ON notes(user_id)')
+            conn.execute('CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT)')
+            try:
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts
+                    USING fts5(title, content='notes', content_rowid='id', tokenize='trigram')
+                ''')
+            except sqlite3.OperationalError as e:
+                logger.warning(f"SQLite 不支持 FTS5 trigram 分词（{sqlite3.sqlite_version}），笔记目录改用 LIKE 查找: {e}")
+                self.fts_enabled = False
+                return
+            conn.executescript('''
+                CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+                    INSERT INTO notes_fts(rowid, title) VALUES (new.id, new.title);
+                END;
+                CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+                    INSERT INTO notes_fts(notes_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                END;
+                CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE OF title ON notes BEGIN
+                    INSERT INTO notes_fts(notes_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                    INSERT INTO notes_fts(rowid, title) VALUES (new.id, new.title);
+                END;
+            ''')
+
+    def upsert(self, notes: List[Dict[str, Any]], user_id: str = "") -> int:
+        """写入笔记（已存在的笔记更新标题、xsec_token 和更新时间）
+
+        Args:
+            notes: parse_note_list 返回的笔记列表
+            user_id: 笔记作者ID（笔记自身没有 user_id 时使用）
+
+        Returns:
+            新增的笔记数
+        """
+        if not notes:
+            return 0
+        now = time.time()
+        with self._connect() as conn:
+            placeholders = ",".join("?" * len(notes))
+            known = {row[0] for row in conn.execute(
+                f'SELECT note_id FROM notes WHERE note_id IN ({placeholders})', [n["note_id"] for n in notes]
+            )}
+            conn.executemany('''
+                INSERT INTO notes (note_id, title, xsec_token, note_type, user_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(note_id) DO UPDATE SET
+                    title = excluded.title,
+                    xsec_token = excluded.xsec_token,
+                    note_type = excluded.note_type,
+                    user_id = excluded.user_id,
+                    updated_at = excluded.updated_at
+            ''', [
+                (n["note_id"], n["title"], n["xsec_token"], n["note_type"], n["user_id"] or user_id, now)
+                for n in notes
+            ])
+            total = conn.execute('SELECT COUNT(*) FROM notes').fetchone()[0]
+        NOTE_CATALOG_NOTES.set(total)
+        return len({n["note_id"] for n in notes} - known)
+
+    def search(self, keyword: str, user_id: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """查找标题包含关键词的笔记（不区分大小写）
+
+        Args:
+            keyword: 标题关键词
+            user_id: 只查找该作者的笔记，None 表示不限
+            limit: 最多返回条数
+
+        Returns:
+            笔记列表（新笔记在前），每条带可直接打开的 url
+        """
+        keyword = keyword.strip()
+        if not keyword:
+            return []
+        user_filter, params = "", []
+        if user_id:
+            user_filter, params = " AND n.user_id = ?", [user_id]
+
+        # note_id 前 8 位是十六进制的创建时间戳，按 note_id 倒序即新笔记在前（与个人主页顺序一致）
+        if self.fts_enabled and len(keyword) >= _MIN_MATCH_CHARS:
+            sql = f'''
+                SELECT n.note_id, n.title, n.xsec_token FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid
+                WHERE notes_fts MATCH ?{user_filter} ORDER BY n.note_id DESC LIMIT ?
+            '''
+            params = ['"' + keyword.replace('"', '""') + '"'] + params
+        else:
+            sql = f'''
+                SELECT n.note_id, n.title, n.xsec_token FROM notes n
+                WHERE n.title LIKE ? ESCAPE '\\'{user_filter} ORDER BY n.note_id DESC LIMIT ?
+            '''
+            escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params = [f"%{escaped}%"] + params
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params + [limit]).fetchall()
+        return [{"note_id": note_id, "title": title, "url": self.note_url(note_id, token)}
+                for note_id, title, token in rows]
+
+    @staticmethod
+    def note_url(note_id: str, xsec_token: Optional[str] = None) -> str:
+        """笔记详情页地址"""
+        url = NOTE_URL.format(note_id=note_id)
+        if xsec_token:
+            url += f"?xsec_token={xsec_token}&xsec_source=pc_user"
+        return url
+
+    def remove(self, note_id: str):
+        """删除笔记（已删除或无法打开的笔记）"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM notes WHERE note_id = ?', (note_id,))
+
+    def count(self, user_id: Optional[str] = None) -> int:
+        """笔记数"""
+        with self._connect() as conn:
+            if user_id:
+                return conn.execute('SELECT COUNT(*) FROM notes WHERE user_id = ?', (user_id,)).fetchone()[0]
+            return conn.execute('SELECT COUNT(*) FROM notes').fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """读取元数据"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM catalog_meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        """写入元数据"""
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)', (key, value))
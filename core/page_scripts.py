@@ -0,0 +1,199 @@
+"""页面脚本模块 - 注入页面的辅助函数库，按名称调用，注入后一次往返完成查找/滚动等组合操作"""
+from typing import Any
+
+from core.metrics import metrics
+from core.tracing import tracer
+
+PAGE_SCRIPT_INSTALLS_TOTAL = metrics.counter(
+    "xhs_page_script_installs_total", "页面辅助脚本注入次数（每个文档一次）"
+)
+
+# 脚本内容变化时递增，已注入旧版本的页面会重新注入
+HELPERS_VERSION = 6
+
+# 页面中尚未注入（或版本不一致）时调用脚本返回的标记
+_MISSING = "__xhs_helpers_missing__"
+
+_HELPERS_SCRIPT = """
+(function () {
+    function isScrollable(elem) {
+        if (!elem) return false;
+        const overflowY = window.getComputedStyle(elem).overflowY;
+        return elem.scrollHeight > elem.clientHeight && (overflowY === 'auto' || overflowY === 'scroll');
+    }
+
+    // 由标签名、id 和类名组成的选择器，只有在页面中能唯一定位到该元素时才返回
+    function uniqueSelector(elem) {
+        let selector = elem.tagName.toLowerCase();
+        if (elem.id) selector += '#' + CSS.escape(elem.id);
+        for (const name of elem.classList) selector += '.' + CSS.escape(name);
+        return document.querySelector(selector) === elem ? selector : null;
+    }
+
+    // 元素不在视口内时滚动到中间
+    function revealIfNeeded(elem) {
+        const rect = elem.getBoundingClientRect();
+        if (rect.top < 0 || rect.left < 0 || rect.bottom > window.innerHeight || rect.right > window.innerWidth) {
+            elem.scrollIntoView({block: 'center', inline: 'center'});
+        }
+    }
+
+    function describe(elem, selector, cached) {
+        return {
+            element: elem,
+            selector: selector,
+            cached: cached,
+            class_name: String(elem.className),
+            client_height: elem.clientHeight,
+            scroll_height: elem.scrollHeight
+        };
+    }
+
+    window.__xhsHelpers = {
+        version: %(version)d,
+
+        // 查找可滚动容器：先验证缓存的选择器，失效时再逐个检查候选元素
+        findScrollContainer: function (cachedSelector, candidates) {
+            if (cachedSelector) {
+                const elem = document.querySelector(cachedSelector);
+                if (isScrollable(elem)) return describe(elem, cachedSelector, true);
+            }
+            for (const elem of document.querySelectorAll(candidates)) {
+                if (isScrollable(elem)) return describe(elem, uniqueSelector(elem), false);
+            }
+            return null;
+        },
+
+        // 元素中心点的视口坐标（CSS 像素），用于 Input.dispatchMouseEvent
+        // hit 表示 elementFromPoint 在该点命中元素本身或其子元素。传入上次测量的坐标且仍命中时直接复用；
+        // 否则重新测量，布局偏移或被遮挡而未命中时再滚动到中间测量一次
+        elementBox: function (elem, cached) {
+            function hits(x, y) {
+                const target = document.elementFromPoint(x, y);
+                return !!target && (target === elem || elem.contains(target));
+            }
+            function measure() {
+                const rect = elem.getBoundingClientRect();
+                const x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+                return {x: x, y: y, width: rect.width, height: rect.height, hit: hits(x, y)};
+            }
+            if (cached && hits(cached.x, cached.y)) return Object.assign({}, cached, {hit: true});
+            revealIfNeeded(elem);
+            let box = measure();
+            if (!box.hit && box.width && box.height) {
+                elem.scrollIntoView({block: 'center', inline: 'center'});
+                box = measure();
+            }
+            return box;
+        },
+
+        // 聚焦输入元素并选中已有内容，随后的 Input.insertText 会替换选中内容；返回是否已获得焦点
+        focusForInput: function (elem) {
+            revealIfNeeded(elem);
+            elem.focus();
+            if (typeof elem.select === 'function') {
+                elem.select();
+            } else {
+                const range = document.createRange();
+                range.selectNodeContents(elem);
+                const selection = window.getSelection();
+                selection.removeAllRanges();
+                selection.addRange(range);
+            }
+            return elem === document.activeElement || elem.contains(document.activeElement);
+        },
+
+        // 页面加载耗时（Navigation Timing；传输字节数由 BrowserManager 从性能日志中统计）
+        pageStats: function () {
+            const nav = performance.getEntriesByType('navigation')[0];
+            return {load_ms: nav && nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null};
+        },
+
+        // 已渲染笔记卡片的标题和封面链接（链接中带 note_id 和 xsec_token）
+        renderedNotes: function (titleSelector, coverSelector) {
+            const notes = [];
+            for (const title of document.querySelectorAll(titleSelector)) {
+                const section = title.closest('section.note-item');
+                const cover = section && section.querySelector(coverSelector);
+                if (cover) notes.push({title: title.textContent.trim(), href: cover.href});
+            }
+            return notes;
+        },
+
+        // 滚动一步（elem 为空时滚动整页），等滚动停止（scrollend 或 settleMs 超时）后返回前后位置
+        scrollStep: function (elem, distance, settleMs) {
+            const target = elem || document.scrollingElement || document.documentElement;
+            const before = target.scrollTop;
+            return new Promise(function (resolve) {
+                let done = false;
+                function finish() {
+                    if (done) return;
+                    done = true;
+                    const after = target.scrollTop;
+                    resolve({
+                        before: before,
+                        after: after,
+                        distance: after - before,
+                        at_end: after + target.clientHeight >= target.scrollHeight - 2,
+                        scroll_height: target.scrollHeight
+                    });
+                }
+                (elem || window).addEventListener('scrollend', finish, {once: true});
+                setTimeout(finish, settleMs);
+                if (elem) {
+                    elem.scrollTop += distance;
+                } else {
+                    window.scrollTo({top: before + distance, behavior: 'smooth'});
+                }
+            });
+        }
+    };
+})();
+""" % {"version": HELPERS_VERSION}
+
+_CALL_SCRIPT = """
+const helpers = window.__xhsHelpers;
+if (!helpers || helpers.version !== %(version)d) return '%(missing)s';
+return helpers[arguments[0]].apply(null, Array.prototype.slice.call(arguments, 1));
+""" % {"version": HELPERS_VERSION, "missing": _MISSING}
+
+
+class PageScripts:
+    """页面辅助脚本
+
+    辅助函数库在每个文档中只注入一次（挂在 window.__xhsHelpers 上），之后每次调用只发送一小段分发脚本。
+    导航到新页面后的首次调用需要两次往返：第一次发现库不存在，第二次把库和分发脚本一起发送，
+    注入后完成调用。同一文档之后的调用都只需一次往返。
+    返回 Promise 的辅助函数由 WebDriver 等待其完成后返回结果。
+
+    Example:
+        >>> scripts = PageScripts(browser_manager)
+        >>> step = scripts.call("scrollStep", container, 1200, 500)
+        >>> step["distance"], step["at_end"]
+    """
+
+    def __init__(self, browser_manager):
+        """初始化页面脚本
+
+        Args:
+            browser_manager: 浏览器管理器实例
+        """
+        self.browser = browser_manager
+
+    def call(self, name: str, *args) -> Any:
+        """调用页面辅助函数
+
+        Args:
+            name: 辅助函数名（如 findScrollContainer、scrollStep）
+            *args: 传给辅助函数的参数（可以是 WebElement）
+
+        Returns:
+            辅助函数的返回值
+        """
+        with tracer.span(f"page.{name}", category="browser"):
+            result = self.browser.execute_script(_CALL_SCRIPT, name, *args)
+            if result == _MISSING:
+                # 新文档中尚未注入：第二次往返注入辅助函数库并完成这次调用
+                PAGE_SCRIPT_INSTALLS_TOTAL.inc()
+                result = self.browser.execute_script(_HELPERS_SCRIPT + _CALL_SCRIPT, name, *args)
+            return result
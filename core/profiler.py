@@ -0,0 +1,156 @@
+"""采样分析器模块 - 后台线程采样调用栈并输出火焰图折叠格式"""
+import atexit
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.logger import logger
+from core.tracing import tracer
+
+
+class SamplingProfiler:
+    """采样分析器
+
+    后台线程按固定频率采样所有线程的 Python 调用栈，不依赖任何外部工具。
+    每个样本以当前所在的 workflow span 作为根帧，停止时写出折叠栈（collapsed stack）文件，
+    可直接交给 flamegraph.pl、speedscope 或 inferno 生成火焰图。
+
+    支持的环境变量：
+        XHS_PROFILE: 输出文件路径，设置后在入口处自动开启
+        XHS_PROFILE_HZ: 采样频率（次/秒），默认 100
+    """
+
+    def __init__(self, output_path: str = "profile.collapsed", hz: float = 100.0):
+        """初始化采样分析器
+
+        Args:
+            output_path: 折叠栈输出文件路径
+            hz: 采样频率（次/秒）
+        """
+        self.output_path = output_path
+        self.interval = 1.0 / max(hz, 1.0)
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._code_labels: Dict[object, str] = {}
+
+    @property
+    def running(self) -> bool:
+        """是否正在采样"""
+        return self._thread is not None
+
+    def start(self):
+        """启动后台采样线程"""
+        if self._thread is not None:
+            return
+        tracer.enable_thread_tracking()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="xhs-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"采样分析器已启动: {1 / self.interval:.0f} Hz -> {self.output_path}")
+
+    def stop(self) -> Optional[str]:
+        """停止采样并写出折叠栈文件
+
+        Returns:
+            写入的文件路径，未启动时返回 None
+        """
+        if self._thread is None:
+            return None
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        tracer.disable_thread_tracking()
+        path = self.write_collapsed()
+        logger.info(f"采样分析器已停止: {self.sample_count} 次采样 -> {path}")
+        return path
+
+    def _run(self):
+        """采样循环"""
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self._sample(own_id)
+
+    def _sample(self, own_id: int):
+        """采样一次所有线程的调用栈"""
+        frames = sys._current_frames()
+        for thread_id, frame in frames.items():
+            if thread_id == own_id:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(self._root_label(thread_id))
+            stack.reverse()
+            self.samples[";".join(stack)] += 1
+        self.sample_count += 1
+
+    def _label(self, code) -> str:
+        """生成帧标签（按代码对象缓存）"""
+        label = self._code_labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = f"{name} ({os.path.basename(code.co_filename)})".replace(";", ":")
+            self._code_labels[code] = label
+        return label
+
+    @staticmethod
+    def _root_label(thread_id: int) -> str:
+        """根帧：线程当前所在的最内层 workflow span，没有则为线程名"""
+        span = tracer.active_span_for_thread(thread_id)
+        while span is not None and span.category != "workflow":
+            span = span.parent
+        if span is not None:
+            return f"[{span.name}]".replace(";", ":")
+        for thread in threading.enumerate():
+            if thread.ident == thread_id:
+                return f"[thread:{thread.name}]"
+        return "[thread]"
+
+    def write_collapsed(self, path: Optional[str] = None) -> str:
+        """写出折叠栈文件，每行格式为 `帧1;帧2;... 次数`
+
+        Args:
+            path: 输出路径，默认使用初始化时的路径
+
+        Returns:
+            写入的文件路径
+        """
+        output = Path(path or self.output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return str(output)
+
+
+# 全局采样分析器（通过 start_profiler_from_env 开启）
+profiler: Optional[SamplingProfiler] = None
+
+
+def start_profiler_from_env() -> Optional[SamplingProfiler]:
+    """根据环境变量 XHS_PROFILE 开启全局采样分析器，进程退出时自动写出结果
+
+    重复调用是安全的，只会启动一次。
+
+    Returns:
+        分析器实例，未开启时返回 None
+    """
+    global profiler
+    if profiler is not None:
+        return profiler
+
+    output_path = os.environ.get('XHS_PROFILE')
+    if not output_path:
+        return None
+
+    hz = float(os.environ.get('XHS_PROFILE_HZ', '100') or 100)
+    profiler = SamplingProfiler(output_path, hz)
+    profiler.start()
+    atexit.register(profiler.stop)
+    return profiler
@@ -0,0 +1,293 @@
+"""链路追踪模块 - 嵌套 span 记录与 Chrome trace 导出"""
+import atexit
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Span:
+    """一次被追踪的操作
+
+    记录墙钟时间、当前线程 CPU 时间以及附加属性（选择器、URL、缓存层级等）。
+    通过 `with tracer.span(...)` 使用，嵌套的 span 会自动成为子 span。
+    """
+
+    __slots__ = (
+        'tracer', 'name', 'category', 'attributes', 'parent',
+        'thread_id', '_start_ns', '_cpu_start_ns', '_token'
+    )
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, attributes: Dict[str, Any]):
+        """初始化 span
+
+        Args:
+            tracer: 所属追踪器
+            name: span 名称
+            category: 分类（browser / cdp / dom / ai / workflow 等）
+            attributes: 初始属性
+        """
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.parent: Optional['Span'] = None
+        self.thread_id = 0
+        self._start_ns = 0
+        self._cpu_start_ns = 0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        """设置属性"""
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        """开始计时并成为当前 span"""
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        self.thread_id = threading.get_ident()
+        self.tracer._on_enter(self)
+        self._cpu_start_ns = time.thread_time_ns()
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """结束计时并提交事件"""
+        end_ns = time.perf_counter_ns()
+        cpu_ns = time.thread_time_ns() - self._cpu_start_ns
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes['error'] = f"{exc_type.__name__}: {exc_val}"
+        self.tracer._on_exit(self, end_ns, cpu_ns)
+        return False
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空 span，所有操作都是空操作"""
+
+    __slots__ = ()
+
+    name = ''
+    attributes: Dict[str, Any] = {}
+
+    def set_attribute(self, key: str, value: Any):
+        """忽略属性"""
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar('xhs_current_span', default=None)
+
+
+class Tracer:
+    """追踪器 - 收集 span 并导出为 Chrome trace-event JSON
+
+    关闭时 `span()` 直接返回共享的空 span，开销只有一次属性判断。
+
+    Example:
+        >>> tracer.start("trace.json")
+        >>> with tracer.span("publish", category="workflow", title="..."):
+        ...     ...
+        >>> tracer.export_chrome_trace()  # 在 chrome://tracing 或 Perfetto 中打开
+    """
+
+    def __init__(self):
+        """初始化追踪器"""
+        # enabled 决定是否创建真实 span；recording 决定是否收集事件用于导出
+        self.enabled = False
+        self.recording = False
+        self.output_path: Optional[str] = None
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._thread_names: Dict[int, str] = {}
+        # 线程 -> 当前 span，供采样分析器等其他线程读取
+        self._track_threads = False
+        self._active_spans: Dict[int, Span] = {}
+
+    def start(self, output_path: Optional[str] = None):
+        """开启追踪
+
+        Args:
+            output_path: 退出时自动导出的文件路径（可选）
+        """
+        with self._lock:
+            self._events = []
+            self._thread_names = {}
+            self._origin_ns = time.perf_counter_ns()
+        self.output_path = output_path
+        self.recording = True
+        self.enabled = True
+
+    def stop(self):
+        """关闭追踪（已收集的事件保留，可继续导出）"""
+        self.recording = False
+        self.enabled = self._track_threads
+
+    def enable_thread_tracking(self):
+        """开启按线程记录当前 span（不收集事件），供采样分析器标注调用栈"""
+        self._track_threads = True
+        self.enabled = True
+
+    def disable_thread_tracking(self):
+        """关闭按线程记录当前 span"""
+        self._track_threads = False
+        self._active_spans.clear()
+        self.enabled = self.recording
+
+    def active_span_for_thread(self, thread_id: int) -> Optional[Span]:
+        """获取指定线程当前所在的 span（需先开启线程跟踪）"""
+        return self._active_spans.get(thread_id)
+
+    def span(self, name: str, category: str = "app", **attributes) -> Any:
+        """创建 span 上下文管理器
+
+        Args:
+            name: span 名称
+            category: 分类
+            **attributes: 附加属性
+
+        Returns:
+            Span，追踪关闭时返回空 span
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, category, attributes)
+
+    def traced(self, name: Optional[str] = None, category: str = "app") -> Callable:
+        """函数追踪装饰器
+
+        Args:
+            name: span 名称，默认使用函数的 __qualname__
+            category: 分类
+        """
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with Span(self, span_name, category, {}):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, span_name, category, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        """获取当前上下文中的 span"""
+        return _current_span.get()
+
+    def annotate(self, **attributes):
+        """给当前 span 附加属性（追踪关闭或不在 span 内时为空操作）"""
+        if not self.enabled:
+            return
+        current = _current_span.get()
+        if current is not None:
+            current.attributes.update(attributes)
+
+    def _on_enter(self, span: Span):
+        """span 开始回调"""
+        if self._track_threads:
+            self._active_spans[span.thread_id] = span
+        if span.thread_id not in self._thread_names:
+            self._thread_names[span.thread_id] = threading.current_thread().name
+
+    def _on_exit(self, span: Span, end_ns: int, cpu_ns: int):
+        """span 结束回调，转换为 Chrome 的 complete 事件"""
+        if self._track_threads:
+            if span.parent is not None and span.parent.thread_id == span.thread_id:
+                self._active_spans[span.thread_id] = span.parent
+            else:
+                self._active_spans.pop(span.thread_id, None)
+        if not self.recording:
+            return
+        args = {k: _to_json_value(v) for k, v in span.attributes.items()}
+        args['cpu_ms'] = round(cpu_ns / 1e6, 3)
+        if span.parent is not None:
+            args['parent'] = span.parent.name
+        event = {
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': (span._start_ns - self._origin_ns) / 1000,
+            'dur': (end_ns - span._start_ns) / 1000,
+            'pid': os.getpid(),
+            'tid': span.thread_id,
+            'args': args,
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def get_events(self) -> List[Dict[str, Any]]:
+        """获取已收集事件的副本"""
+        with self._lock:
+            return list(self._events)
+
+    def export_chrome_trace(self, path: Optional[str] = None) -> Optional[str]:
+        """导出 Chrome trace-event JSON
+
+        Args:
+            path: 输出路径，默认使用 start() 时指定的路径
+
+        Returns:
+            写入的文件路径，没有路径时返回 None
+        """
+        path = path or self.output_path
+        if not path:
+            return None
+
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}}
+            for tid, thread_name in thread_names.items()
+        ]
+
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return str(output)
+
+    def _export_at_exit(self):
+        """进程退出时自动导出"""
+        if self.output_path and self._events:
+            self.export_chrome_trace()
+
+
+def _to_json_value(value: Any) -> Any:
+    """将属性值转换为可 JSON 序列化的值"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+# 全局追踪器实例，设置环境变量 XHS_TRACE=trace.json 即可开启
+tracer = Tracer()
+if os.environ.get('XHS_TRACE'):
+    tracer.start(os.environ['XHS_TRACE'])
+atexit.register(tracer._export_at_exit)
+
+traced = tracer.traced
@@ -4,6 +4,8 @@ from typing import Optional, List
 from core.browser_manager import BrowserManager
 from core.dom_manager import DOMManager
 from core.logger import logger
+from core.metrics import metrics
+from core.profiler import start_profiler_from_env
 from core.models import PublishContent, NoteInfo
 
 
@@ -17,6 +19,11 @@ class XHSClient:
         from business.note_manager import NoteManager
         from business.publish_manager import PublishManager
         
+        # 长时间运行时可通过 XHS_METRICS_PORT 开启本地指标端点
+        metrics.start_from_env()
+        # 通过 XHS_PROFILE 开启采样分析器
+        start_profiler_from_env()
+        
         # 初始化浏览器管理器
         self.browser = BrowserManager()
         
@@ -41,7 +48,11 @@ class XHSClient:
         Returns:
             笔记信息或None
         """
-        return self.note.search_and_open_note(keyword)
+        self.browser.checkpoint()
+        note_info = self.note.search_and_open_note(keyword)
+        if note_info:
+            self.comment.current_note = note_info
+        return note_info
 
     # ==================== 评论相关方法 ====================
     
@@ -57,6 +68,7 @@ class XHSClient:
         Returns:
             评论列表
         """
+        self.browser.checkpoint()
         return self.comment.fetch_comments(
             note_id=note_id,
             enable_scroll=enable_scroll,
@@ -81,6 +93,7 @@ class XHSClient:
         Returns:
             是否成功
         """
+        self.browser.checkpoint()
         return self.comment.reply_to_comment(comment_id, reply_text)
 
     # ==================== 发布相关方法 ====================
@@ -94,6 +107,7 @@ class XHSClient:
         Returns:
             是否成功
         """
+        self.browser.checkpoint()
         return self.publish.publish_workflow(publish_content)
 
     # ==================== DOM管理相关方法 ====================
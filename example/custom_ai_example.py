@@ -8,6 +8,7 @@ from typing import List, Dict, Optional
 from core import BaseAIClient, AIClientFactory
 from core.exceptions import XHSException
 from core.logger import logger
+from core.profiler import start_profiler_from_env
 
 
 class CustomAIClient(BaseAIClient):
@@ -272,10 +273,10 @@ def main():
     logger.info("示例 3: 使用本地大模型（Ollama）")
     logger.info("="*60)
     
-    # 使用本地 Ollama 模型
+    # 使用本地 Ollama 模型（内置的 OllamaClient，支持预热、keep_alive 和流式输出）
     # client = AIClientFactory.create_client(
-    #     "local-llm",
-    #     model_name="llama2",
+    #     "ollama",
+    #     model="qwen2.5:7b",
     #     host="http://localhost:11434"
     # )
     # manager = AIManager(client=client)
@@ -296,6 +297,7 @@ def main():
 
 
 if __name__ == "__main__":
+    start_profiler_from_env()
     try:
         main()
         logger.info("\n示例完成")
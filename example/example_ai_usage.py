@@ -9,6 +9,7 @@ sys.path.insert(0, str(root_dir))
 from business import AIManager
 from core.models import Comment, UserInfo
 from core.logger import logger
+from core.profiler import start_profiler_from_env
 
 
 def example_1_generate_fairy_post():
@@ -123,6 +124,7 @@ def example_5_different_reply_styles():
 
 
 if __name__ == "__main__":
+    start_profiler_from_env()
     logger.info("\nAI 模块使用示例")
     logger.info("提示：请确保已配置 config_personal.py 中的 AI API Key\n")
     
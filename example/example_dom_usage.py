@@ -3,6 +3,7 @@ from core.dom_manager import DOMManager
 from core.dom_mapper import DOMElementMapper
 from core.models import DOMElement
 from core.logger import logger
+from core.profiler import start_profiler_from_env
 from datetime import datetime
 
 
@@ -129,6 +130,7 @@ def example_cache_behavior():
 
 
 if __name__ == "__main__":
+    start_profiler_from_env()
     logger.info("DOM管理器使用示例")
     logger.info("=" * 50)
     
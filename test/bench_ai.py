@@ -0,0 +1,163 @@
+"""AI 客户端基准测试脚本 - 在本地桩服务上测量吞吐、延迟分位数与连接复用
+
+用法:
+    python test/bench_ai.py --requests 100 --concurrency 8 --latency lognormal:0.05:0.5 --tps 400
+    python test/bench_ai.py --error-rate 0.05 --json bench_output.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.ai_cache import CachedAIClient
+from core.ai_client import AIClientFactory, OpenAIClient, amap
+from fake_openai_server import FakeOpenAIServer, parse_latency
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """最近秩分位数"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def summarize(name: str, latencies: List[float], errors: int, wall: float,
+              server: FakeOpenAIServer, extra: Dict[str, Any] = None) -> Dict[str, Any]:
+    """汇总一个场景的结果（服务端统计在每个场景开始前清零，new_connections 为本场景新建的 TCP 连接数）"""
+    stats = dict(server.stats)
+    result = {
+        'scenario': name,
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'wall_seconds': round(wall, 3),
+        'throughput': round((len(latencies) + errors) / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'server_requests': stats['requests'],
+        'new_connections': stats['connections'],
+        'requests_per_connection': round(stats['requests'] / stats['connections'], 2) if stats['connections'] else 0.0,
+    }
+    result.update(extra or {})
+    return result
+
+
+def run_sync(name: str, server: FakeOpenAIServer, prompts: List[str], call: Callable[[str], Any]) -> Dict[str, Any]:
+    """顺序执行同步调用"""
+    server.reset_stats()
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for prompt in prompts:
+        t0 = time.perf_counter()
+        try:
+            call(prompt)
+            latencies.append(time.perf_counter() - t0)
+        except Exception:
+            errors += 1
+    return summarize(name, latencies, errors, time.perf_counter() - start, server)
+
+
+def bench_sequential(server: FakeOpenAIServer, client: OpenAIClient, n: int) -> Dict[str, Any]:
+    """逐个请求（共享 keep-alive 连接池）"""
+    return run_sync("sequential", server, [f"顺序请求 {i}" for i in range(n)], client.generate_text)
+
+
+def bench_cached(server: FakeOpenAIServer, client: OpenAIClient, n: int) -> Dict[str, Any]:
+    """缓存层：n 次请求只有 n/4 个不同的提示词"""
+    cached = CachedAIClient(client, db_path=None)
+    result = run_sync("cached", server, [f"缓存请求 {i % max(1, n // 4)}" for i in range(n)], cached.generate_text)
+    result['cache_hit_rate'] = cached.get_stats()['hit_rate']
+    return result
+
+
+def bench_stream(server: FakeOpenAIServer, client: OpenAIClient, n: int) -> Dict[str, Any]:
+    """流式请求：额外统计首 token 延迟"""
+    server.reset_stats()
+    latencies, ttfts, errors = [], [], 0
+    start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        try:
+            for j, _ in enumerate(client.generate_text_stream(f"流式请求 {i}")):
+                if j == 0:
+                    ttfts.append(time.perf_counter() - t0)
+            latencies.append(time.perf_counter() - t0)
+        except Exception:
+            errors += 1
+    return summarize("stream", latencies, errors, time.perf_counter() - start, server, {
+        'ttft_p50_ms': round(percentile(ttfts, 0.50) * 1000, 1),
+        'ttft_p95_ms': round(percentile(ttfts, 0.95) * 1000, 1),
+    })
+
+
+def bench_concurrent(server: FakeOpenAIServer, client: OpenAIClient, n: int, concurrency: int) -> Dict[str, Any]:
+    """amap 有限并发的异步请求"""
+    server.reset_stats()
+    latencies: List[float] = []
+
+    async def one(prompt: str) -> str:
+        t0 = time.perf_counter()
+        text = await client.agenerate_text(prompt)
+        latencies.append(time.perf_counter() - t0)
+        return text
+
+    start = time.perf_counter()
+    results = asyncio.run(amap(one, [f"并发请求 {i}" for i in range(n)], concurrency=concurrency))
+    errors = sum(isinstance(r, Exception) for r in results)
+    return summarize(f"concurrent(x{concurrency})", latencies, errors, time.perf_counter() - start, server)
+
+
+def print_report(results: List[Dict[str, Any]]):
+    """打印结果表格"""
+    columns = ['scenario', 'requests', 'errors', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms',
+               'server_requests', 'new_connections', 'requests_per_connection']
+    widths = [max(len(c), *(len(str(r.get(c, ''))) for r in results)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        print("  ".join(str(r.get(c, '')).ljust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        extra = {k: v for k, v in r.items() if k not in columns and k != 'wall_seconds'}
+        if extra:
+            print(f"{r['scenario']}: {extra}")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="AI 客户端基准测试（本地桩服务）")
+    parser.add_argument("--requests", type=int, default=50, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", default="lognormal:0.02:0.5",
+                        help="constant:S / uniform:A:B / lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--tps", type=float, default=500.0, help="生成速度（token/秒），0 为不限速")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=parse_latency(args.latency), tokens_per_second=args.tps,
+                          error_rate=args.error_rate, seed=args.seed) as server:
+        client = OpenAIClient(api_key="bench", base_url=server.base_url, model="fake-model")
+        results = [
+            bench_sequential(server, client, args.requests),
+            bench_cached(server, client, args.requests),
+            bench_stream(server, client, args.requests),
+            bench_concurrent(server, client, args.requests, args.concurrency),
+        ]
+        AIClientFactory.shutdown()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
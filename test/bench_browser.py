@@ -0,0 +1,104 @@
+"""浏览器启动预设基准测试脚本 - 在同一页面上对比各启动预设的冷启动耗时与稳定后的内存占用
+
+需要本机安装 Chrome。每个预设使用独立的临时用户数据目录（不读写 config.browser.user_data_dir），
+冷启动耗时包含 chromedriver 启动、Chrome 启动与会话创建，内存为 chromedriver 及其子进程（Chrome 进程树）的 PSS 之和（读不到时取 RSS）。
+
+用法:
+    python test/bench_browser.py --url https://www.xiaohongshu.com/explore
+    python test/bench_browser.py --presets default,lean,headless --runs 3 --settle 10 --json bench_browser.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.browser_manager import BrowserManager
+from core.config import config
+from core.memory_governor import process_tree_memory
+
+
+def bench_preset(preset: str, url: str, settle: float, samples: int) -> Dict[str, Any]:
+    """冷启动一次浏览器并加载页面，等待 settle 秒后按间隔采样进程树内存"""
+    user_data_dir = tempfile.mkdtemp(prefix=f"xhs-bench-{preset}-")
+    driver = None
+    try:
+        t0 = time.perf_counter()
+        driver = BrowserManager._create_driver(BrowserManager.launch_options(preset, user_data_dir))
+        cold_start = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        driver.get(url)
+        page_load = time.perf_counter() - t0
+
+        time.sleep(settle)
+        pid = driver.service.process.pid
+        pss = []
+        for _ in range(samples):
+            value = process_tree_memory(pid)
+            if value:
+                pss.append(value / 1024 / 1024)
+            time.sleep(1)
+        return {'cold_start_s': cold_start, 'page_load_s': page_load, 'pss_mb': pss}
+    finally:
+        if driver is not None:
+            driver.quit()
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+def summarize(preset: str, runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """汇总一个预设的多次运行（取中位数，内存另给出最大值）"""
+    pss = [value for run in runs for value in run['pss_mb']]
+    return {
+        'preset': preset,
+        'runs': len(runs),
+        'cold_start_s': round(statistics.median(r['cold_start_s'] for r in runs), 2),
+        'page_load_s': round(statistics.median(r['page_load_s'] for r in runs), 2),
+        'pss_mb_p50': round(statistics.median(pss), 1) if pss else None,
+        'pss_mb_max': round(max(pss), 1) if pss else None,
+        'args': config.browser.launch_arguments(preset),
+    }
+
+
+def print_report(results: List[Dict[str, Any]]):
+    """打印结果表格"""
+    columns = ['preset', 'runs', 'cold_start_s', 'page_load_s', 'pss_mb_p50', 'pss_mb_max']
+    widths = [max(len(c), *(len(str(r.get(c, ''))) for r in results)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        print("  ".join(str(r.get(c, '')).ljust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        print(f"{r['preset']}: {' '.join(r['args'])}")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="浏览器启动预设基准测试（需要 Chrome）")
+    parser.add_argument("--url", default="https://www.xiaohongshu.com/explore", help="每个预设加载的同一页面")
+    parser.add_argument("--presets", default=",".join(config.browser.launch_presets),
+                        help="逗号分隔的预设名称")
+    parser.add_argument("--runs", type=int, default=3, help="每个预设冷启动的次数")
+    parser.add_argument("--settle", type=float, default=5.0, help="页面加载后等待多久再采样内存（秒）")
+    parser.add_argument("--samples", type=int, default=5, help="每次运行的内存采样次数（间隔 1 秒）")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    results = []
+    for preset in [p.strip() for p in args.presets.split(",") if p.strip()]:
+        runs = [bench_preset(preset, args.url, args.settle, args.samples) for _ in range(args.runs)]
+        results.append(summarize(preset, runs))
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""本地 OpenAI 兼容桩服务模块 - 可控延迟、生成速度、错误注入与流式输出"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+LatencyFn = Callable[[random.Random], float]
+
+# 生成内容使用的词表（按提示词哈希确定性地挑选，相同请求得到相同回复）
+_VOCAB = ["姐妹们", "今天", "真的", "绝绝子", "分享", "一个", "宝藏", "小众", "好物", "春天",
+          "穿搭", "氛围感", "拿捏", "谁懂啊", "冲", "！", "，", "。", "爱了", "yyds"]
+
+
+def constant(seconds: float) -> LatencyFn:
+    """固定延迟"""
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> LatencyFn:
+    """均匀分布延迟"""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float = 0.5) -> LatencyFn:
+    """对数正态分布延迟（长尾，接近真实服务）"""
+    import math
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def parse_latency(spec: str) -> LatencyFn:
+    """解析命令行延迟参数：constant:0.1 / uniform:0.05:0.2 / lognormal:0.3:0.5"""
+    kind, *args = spec.split(":")
+    values = [float(a) for a in args]
+    factories = {"constant": constant, "uniform": uniform, "lognormal": lognormal}
+    if kind not in factories:
+        raise ValueError(f"未知的延迟分布: {kind}，可用: {list(factories)}")
+    return factories[kind](*values)
+
+
+class FakeOpenAIServer:
+    """OpenAI 兼容的本地桩服务
+
+    支持 /v1/chat/completions（含 stream=True 的 SSE 输出）和 /v1/models，
+    可配置首包延迟分布、生成速度和错误注入，并统计请求数与 TCP 连接数（用于观察连接复用）。
+    随机数使用固定种子，同样的配置和请求序列得到同样的结果。
+
+    Example:
+        >>> with FakeOpenAIServer(latency=lognormal(0.2), tokens_per_second=50) as server:
+        ...     client = OpenAIClient(api_key="fake", base_url=server.base_url)
+        ...     client.generate_text("你好")
+    """
+
+    def __init__(
+        self,
+        latency: LatencyFn = constant(0.0),
+        tokens_per_second: float = 0.0,
+        completion_tokens: int = 20,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """初始化桩服务
+
+        Args:
+            latency: 首包延迟分布（见 constant / uniform / lognormal）
+            tokens_per_second: 生成速度，0 表示不限速
+            completion_tokens: 默认回复长度（token 数，受请求 max_tokens 限制）
+            error_rate: 随机返回错误的概率
+            error_status: 注入错误的 HTTP 状态码
+            seed: 随机种子
+            host: 监听地址
+            port: 监听端口，0 表示随机端口
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.host = host
+        self.port = port
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._fail_next = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.stats: Dict[str, int] = {}
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI SDK 使用的 base_url"""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def reset_stats(self):
+        """清空统计"""
+        with self._lock:
+            self.stats = {"requests": 0, "connections": 0, "errors": 0, "streams": 0}
+
+    def fail_next(self, count: int = 1):
+        """让接下来的 count 个请求返回错误"""
+        with self._lock:
+            self._fail_next += count
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            if self._fail_next > 0:
+                self._fail_next -= 1
+                return True
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def _sample_latency(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency(self._rng))
+
+    @staticmethod
+    def _completion_words(messages: List[Dict[str, str]], count: int) -> List[str]:
+        """按提示词确定性地生成回复"""
+        digest = hashlib.sha256(json.dumps(messages, ensure_ascii=False, sort_keys=True).encode("utf-8")).digest()
+        rng = random.Random(digest)
+        return [rng.choice(_VOCAB) for _ in range(count)]
+
+    def start(self) -> 'FakeOpenAIServer':
+        """在后台线程启动服务"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="fake-openai-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FakeOpenAIServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+
+def _make_handler(server: FakeOpenAIServer):
+    """创建绑定到桩服务实例的请求处理类"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 响应头和响应体分两次写出，关闭 Nagle 避免与客户端延迟 ACK 叠加出 40ms 的额外延迟
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            server._count("connections")
+
+        def _send_json(self, status: int, data: dict):
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _write_chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            server._count("requests")
+
+            time.sleep(server._sample_latency())
+            if server._should_fail():
+                server._count("errors")
+                self._send_json(server.error_status, {
+                    "error": {"message": "injected error", "type": "server_error", "code": server.error_status}
+                })
+                return
+
+            messages = body.get("messages", [])
+            count = min(server.completion_tokens, body.get("max_tokens") or server.completion_tokens)
+            words = FakeOpenAIServer._completion_words(messages, count)
+            prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 2 + 1
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": count,
+                     "total_tokens": prompt_tokens + count}
+            model = body.get("model", "fake-model")
+            created = int(time.time())
+
+            if not body.get("stream"):
+                if server.tokens_per_second:
+                    time.sleep(count / server.tokens_per_second)
+                self._send_json(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "".join(words)}}],
+                    "usage": usage,
+                })
+                return
+
+            server._count("streams")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, word in enumerate(words):
+                if server.tokens_per_second and i:
+                    time.sleep(1 / server.tokens_per_second)
+                chunk = {
+                    "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+                }
+                self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            final = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            self._write_chunk(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+            # 与 OpenAI 一致：只有请求了 stream_options.include_usage 才在末尾追加 choices 为空的 usage 片段
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage_chunk = {
+                    "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [], "usage": usage,
+                }
+                self._write_chunk(f"data: {json.dumps(usage_chunk)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def main():
+    """命令行入口：启动桩服务供示例或手动调试使用"""
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容桩服务")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="constant:0.1", help="constant:S / uniform:A:B / lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--tps", type=float, default=50.0, help="生成速度（token/秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        latency=parse_latency(args.latency), tokens_per_second=args.tps,
+        error_rate=args.error_rate, seed=args.seed, port=args.port
+    ).start()
+    print(f"桩服务已启动: {server.base_url}（Ctrl+C 退出）")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
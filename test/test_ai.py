@@ -9,6 +9,7 @@ sys.path.insert(0, str(root_dir))
 from business import AIManager
 from core.models import Comment, UserInfo
 from core.logger import logger
+from core.profiler import start_profiler_from_env
 
 
 def test_fairy_style():
@@ -207,4 +208,5 @@ def main():
 
 
 if __name__ == "__main__":
+    start_profiler_from_env()
     main()
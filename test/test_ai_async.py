@@ -0,0 +1,111 @@
+"""AI 客户端异步接口测试脚本"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from business.ai_manager import AIManager
+from core.ai_client import BaseAIClient, OpenAIClient, amap
+from core.logger import logger
+from core.models import Comment, UserInfo
+from fake_openai_server import FakeOpenAIServer, constant
+
+
+class SlowAIClient(BaseAIClient):
+    """只实现同步 chat 的假客户端，每次请求耗时固定"""
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+
+    def chat(self, messages, temperature=None, max_tokens=None):
+        time.sleep(self.latency)
+        prompt = messages[-1]["content"]
+        if prompt == "坏请求":
+            raise ValueError("请求失败")
+        return f"回复: {prompt}"
+
+    def is_available(self):
+        return True
+
+    async def aclose(self):
+        self.closed = getattr(self, "closed", 0) + 1
+
+
+def test_thread_adapter_runs_concurrently():
+    """测试默认 achat 通过线程池并发，总耗时接近单次请求"""
+    client = SlowAIClient(latency=0.2)
+    prompts = [f"问题{i}" for i in range(5)]
+
+    start = time.perf_counter()
+    results = asyncio.run(amap(client.agenerate_text, prompts, concurrency=5))
+    elapsed = time.perf_counter() - start
+
+    logger.info(f"5 次请求耗时 {elapsed:.2f}s")
+    assert results == [f"回复: {p}" for p in prompts]
+    assert elapsed < 0.6
+
+
+def test_amap_keeps_order_and_errors():
+    """测试 amap 保持顺序、限制并发并保留单项错误"""
+    active = 0
+    peak = 0
+
+    async def work(i):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01 * (5 - i))
+        active -= 1
+        if i == 2:
+            raise ValueError("第 2 项失败")
+        return i * 10
+
+    results = asyncio.run(amap(work, range(5), concurrency=2))
+    assert results[:2] == [0, 10] and results[3:] == [30, 40]
+    assert isinstance(results[2], ValueError)
+    assert peak == 2
+
+    client = SlowAIClient(latency=0.01)
+    results = asyncio.run(amap(client.agenerate_text, ["好请求", "坏请求"]))
+    assert results[0] == "回复: 好请求"
+    assert isinstance(results[1], ValueError)
+
+
+def test_sync_batch_inside_running_loop():
+    """测试同步批量接口在事件循环中调用时改在工作线程执行，结束时释放异步资源"""
+    client = SlowAIClient(latency=0.01)
+    manager = AIManager(client=client)
+    comments = [Comment(comment_id=str(i), content=f"评论{i}", user_info=UserInfo()) for i in range(3)]
+
+    async def caller():
+        return manager.batch_generate_replies(comments, style="aggressive", concurrency=2)
+
+    replies = asyncio.run(caller())
+    assert all(reply and reply.startswith("回复: ") for reply in replies)
+    assert client.closed == 1
+
+    assert len(manager.batch_generate_replies(comments[:1])) == 1
+    assert client.closed == 2
+
+
+def test_async_client_closed_when_loop_changes():
+    """测试换事件循环时关闭上一个循环的 AsyncOpenAI 客户端"""
+    with FakeOpenAIServer(latency=constant(0.01)) as server:
+        client = OpenAIClient(api_key="fake", base_url=server.base_url, model="fake-model")
+        asyncio.run(client.agenerate_text("第一次"))
+        first = client._async_client
+        asyncio.run(client.agenerate_text("第二次"))
+        assert client._async_client is not first and first.is_closed()
+
+        asyncio.run(client.aclose())
+        assert client._async_client is None
+
+
+if __name__ == "__main__":
+    test_thread_adapter_runs_concurrently()
+    test_amap_keeps_order_and_errors()
+    test_sync_batch_inside_running_loop()
+    test_async_client_closed_when_loop_changes()
+    logger.info("AI 异步接口测试完成")
@@ -0,0 +1,105 @@
+"""AI 响应缓存测试脚本"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.ai_cache import CachedAIClient, no_cache
+from core.ai_client import BaseAIClient, OpenAIClient
+from core.ai_usage import usage_scope
+from core.logger import logger
+from fake_openai_server import FakeOpenAIServer, constant
+
+
+class CountingAIClient(BaseAIClient):
+    """记录调用次数的假客户端"""
+
+    def __init__(self):
+        self.model = "fake-model"
+        self.temperature = 0.7
+        self.calls = 0
+
+    def chat(self, messages, temperature=None, max_tokens=None):
+        self.calls += 1
+        return f"回复{self.calls}: {messages[-1]['content']}"
+
+    def is_available(self):
+        return True
+
+    def get_client_info(self):
+        return {"name": "Counting", "model": self.model}
+
+
+def test_memory_and_disk_hit():
+    """测试内存命中，以及新实例从 SQLite 命中"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "ai_responses.db")
+        inner = CountingAIClient()
+        client = CachedAIClient(inner, db_path=db_path)
+
+        first = client.generate_text("你好", system_prompt="小仙女")
+        assert client.generate_text("你好", system_prompt="小仙女") == first
+        assert inner.calls == 1
+
+        # 温度不同视为不同请求
+        client.generate_text("你好", system_prompt="小仙女", temperature=0.2)
+        assert inner.calls == 2
+
+        # 重新创建（模拟进程重启），从磁盘命中
+        restarted = CachedAIClient(inner, db_path=db_path)
+        assert restarted.generate_text("你好", system_prompt="小仙女") == first
+        assert inner.calls == 2
+        logger.info(f"缓存统计: {restarted.get_stats()}")
+        assert restarted.get_stats()["hits"] == 1
+
+
+def test_bypass_and_temperature_threshold():
+    """测试 no_cache 与温度阈值跳过缓存"""
+    inner = CountingAIClient()
+    client = CachedAIClient(inner, db_path=None, max_cacheable_temperature=0.5)
+
+    client.generate_text("随机主题", temperature=0.9)
+    client.generate_text("随机主题", temperature=0.9)
+    assert inner.calls == 2
+
+    client.generate_text("固定主题", temperature=0.3)
+    with no_cache():
+        client.generate_text("固定主题", temperature=0.3)
+    client.generate_text("固定主题", temperature=0.3)
+    assert inner.calls == 4
+
+
+def test_lru_and_ttl_eviction():
+    """测试内存 LRU 容量、磁盘容量与过期"""
+    with tempfile.TemporaryDirectory() as tmp:
+        inner = CountingAIClient()
+        client = CachedAIClient(inner, db_path=os.path.join(tmp, "c.db"), memory_size=2, max_entries=3)
+        for i in range(5):
+            client.generate_text(f"问题{i}")
+        stats = client.get_stats()
+        assert stats["memory_entries"] == 2
+        assert stats["disk_entries"] == 3
+
+        expired = CachedAIClient(CountingAIClient(), db_path=None, ttl=-1)
+        expired.generate_text("过期")
+        expired.generate_text("过期")
+        assert expired.client.calls == 2
+
+
+def test_hits_recorded_under_real_provider():
+    """测试缓存命中与被包装客户端的真实调用记在同一个提供方下"""
+    with FakeOpenAIServer(latency=constant(0.01), completion_tokens=8) as server:
+        client = CachedAIClient(OpenAIClient(api_key="fake", base_url=server.base_url, model="fake-model"), db_path=None)
+        with usage_scope("provider_key") as scope:
+            assert client.generate_text("同一个问题", temperature=0.1) == client.generate_text("同一个问题", temperature=0.1)
+    assert [(u.provider, u.cached) for u in scope.usages] == [("openai", False), ("openai", True)]
+    assert CachedAIClient(CountingAIClient(), db_path=None).provider == "CountingAIClient"
+
+
+if __name__ == "__main__":
+    test_memory_and_disk_hit()
+    test_bypass_and_temperature_threshold()
+    test_lru_and_ttl_eviction()
+    test_hits_recorded_under_real_provider()
+    logger.info("AI 响应缓存测试完成")
@@ -0,0 +1,107 @@
+"""AI 客户端工厂复用测试脚本"""
+import gc
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.ai_client import AIClientFactory, BaseAIClient
+from core.config import config
+from core.logger import logger
+from fake_openai_server import FakeOpenAIServer, constant
+
+
+class CountingClient(BaseAIClient):
+    """记录实例化次数的假客户端"""
+
+    instances = 0
+
+    def __init__(self, model: str = "fake"):
+        CountingClient.instances += 1
+        self.model = model
+
+    def chat(self, messages, temperature=None, max_tokens=None):
+        return "ok"
+
+    def is_available(self):
+        return True
+
+
+def test_get_client_reuses_instances():
+    """测试相同配置复用实例，配置变化时新建"""
+    AIClientFactory.register_client("counting", CountingClient)
+    AIClientFactory.shutdown()
+    CountingClient.instances = 0
+
+    first = AIClientFactory.get_client("counting", cached=False)
+    assert AIClientFactory.get_client("counting", cached=False) is first
+    assert CountingClient.instances == 1
+
+    other_model = AIClientFactory.get_client("counting", cached=False, model="other")
+    assert other_model is not first
+
+    original = config.ai.temperature
+    config.ai.temperature = original + 0.1
+    try:
+        assert AIClientFactory.get_client("counting", cached=False) is not first
+    finally:
+        config.ai.temperature = original
+    assert CountingClient.instances == 3
+
+    # create_client 始终新建实例
+    assert AIClientFactory.create_client("counting", cached=False) is not first
+
+    AIClientFactory.shutdown()
+    assert AIClientFactory.get_client("counting", cached=False) is not first
+    logger.info(f"共创建 {CountingClient.instances} 个实例")
+
+
+def test_shared_http_client():
+    """测试共享连接池在多次获取间保持同一个实例，shutdown 后重建"""
+    http_client = AIClientFactory.get_http_client()
+    if http_client is None:
+        logger.info("未安装 httpx，跳过连接池测试")
+        return
+    assert AIClientFactory.get_http_client() is http_client
+    AIClientFactory.shutdown()
+    assert http_client.is_closed
+    assert AIClientFactory.get_http_client() is not http_client
+
+
+def test_shutdown_keeps_outside_clients_working():
+    """测试 shutdown 不会关闭注册表之外的客户端仍在使用的连接池，最后一个持有者回收后才关闭"""
+    if AIClientFactory.get_http_client() is None:
+        logger.info("未安装 httpx，跳过连接池测试")
+        return
+    original = config.ai.cache_path
+    with tempfile.TemporaryDirectory() as tmp, \
+            FakeOpenAIServer(latency=constant(0.01), completion_tokens=8) as server:
+        # 被 CachedAIClient 包装的客户端；缓存数据库放在临时目录，两次不同的提示词都会请求桩服务
+        config.ai.cache_path = os.path.join(tmp, "ai_responses.db")
+        try:
+            client = AIClientFactory.create_client("openai", cached=True, api_key="fake",
+                                                   base_url=server.base_url, model="fake-model")
+            http_client = client.client.client._client
+            assert client.generate_text("shutdown 之前")
+
+            AIClientFactory.shutdown()
+            assert not http_client.is_closed
+            assert client.generate_text("shutdown 之后")
+            assert server.stats["requests"] == 2
+            assert AIClientFactory.get_http_client() is not http_client
+
+            del client
+            gc.collect()
+            assert http_client.is_closed
+            logger.info(f"桩服务统计: {server.stats}")
+        finally:
+            config.ai.cache_path = original
+    AIClientFactory.shutdown()
+
+
+if __name__ == "__main__":
+    test_get_client_reuses_instances()
+    test_shared_http_client()
+    test_shutdown_keeps_outside_clients_working()
+    logger.info("AI 客户端工厂测试完成")
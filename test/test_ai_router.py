@@ -0,0 +1,95 @@
+"""AI 路由客户端测试脚本"""
+import time
+
+from core.ai_client import BaseAIClient
+from core.ai_router import RoutingAIClient
+from core.logger import logger
+
+
+class FakeBackendClient(BaseAIClient):
+    """可控延迟和失败的假后端"""
+
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def chat(self, messages, temperature=None, max_tokens=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError(f"{self.name} 不可用")
+        return self.name
+
+    def is_available(self):
+        return True
+
+    def get_client_info(self):
+        return {"name": self.name}
+
+
+def test_routes_to_fastest_backend():
+    """测试积累样本后路由到延迟更低的后端"""
+    slow = FakeBackendClient("slow", latency=0.03)
+    fast = FakeBackendClient("fast", latency=0.005)
+    router = RoutingAIClient([slow, fast])
+
+    results = [router.generate_text("你好") for _ in range(6)]
+    logger.info(f"路由结果: {results}, 统计: {router.get_stats()}")
+    # 第一次请求按顺序试探 slow，之后 fast 没有样本优先试探，随后一直选择 fast
+    assert results[0] == "slow"
+    assert results[-4:] == ["fast"] * 4
+    router.close()
+
+
+def test_failover_and_circuit_breaker():
+    """测试失败切换与熔断"""
+    broken = FakeBackendClient("broken", fail=True)
+    healthy = FakeBackendClient("healthy", latency=0.01)
+    router = RoutingAIClient([broken, healthy], failure_threshold=2, cooldown=60)
+    # 让 broken 排在前面
+    router.backends[1].record_success(1.0)
+
+    assert router.generate_text("第一次") == "healthy"
+    assert router.generate_text("第二次") == "healthy"
+    assert broken.calls == 2
+    assert router.get_stats()["broken"]["circuit_open"]
+
+    # 熔断期间不再请求 broken
+    assert router.generate_text("第三次") == "healthy"
+    assert broken.calls == 2
+
+    # 全部后端熔断时报错
+    router.backends[1].open_until = time.monotonic() + 60
+    try:
+        router.generate_text("第四次")
+        assert False, "全部熔断时应抛出异常"
+    except Exception as e:
+        assert "熔断" in str(e)
+    router.close()
+
+
+def test_hedged_request():
+    """测试首选后端超过 p95 时对冲到下一个后端"""
+    primary = FakeBackendClient("primary", latency=0.0)
+    secondary = FakeBackendClient("secondary", latency=0.02)
+    router = RoutingAIClient([primary, secondary], hedge=True, hedge_min_samples=5)
+    for _ in range(10):
+        router.backends[0].record_success(0.02)
+        router.backends[1].record_success(0.05)
+
+    primary.latency = 1.0
+    start = time.perf_counter()
+    assert router.generate_text("对冲") == "secondary"
+    elapsed = time.perf_counter() - start
+    logger.info(f"对冲请求耗时 {elapsed:.3f}s")
+    assert elapsed < 0.5
+    router.close()
+
+
+if __name__ == "__main__":
+    test_routes_to_fastest_backend()
+    test_failover_and_circuit_breaker()
+    test_hedged_request()
+    logger.info("AI 路由客户端测试完成")
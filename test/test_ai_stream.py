@@ -0,0 +1,110 @@
+"""AI 流式输出测试脚本"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.ai_cache import CachedAIClient
+from core.ai_client import AI_TOKENS_TOTAL, BaseAIClient, OpenAIClient, _iter_openai_compatible_stream, _StreamMeter
+from core.ai_usage import usage_scope
+from core.logger import logger
+from core.metrics import metrics
+from fake_openai_server import FakeOpenAIServer, constant
+
+
+def _chunk(content=None, completion_tokens=None):
+    """构造 OpenAI 格式的流式片段"""
+    usage = SimpleNamespace(completion_tokens=completion_tokens) if completion_tokens else None
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))] if content is not None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class EchoAIClient(BaseAIClient):
+    """只实现 chat 的假客户端"""
+
+    def __init__(self):
+        self.model = "echo"
+        self.calls = 0
+
+    def chat(self, messages, temperature=None, max_tokens=None):
+        self.calls += 1
+        return messages[-1]["content"]
+
+    def is_available(self):
+        return True
+
+
+def _histogram_count(name, labels):
+    return metrics.snapshot().get(name, {}).get(labels, {}).get("count", 0)
+
+
+def test_openai_compatible_stream_metrics():
+    """测试流式片段解析与首片段时间、生成速度指标"""
+    def slow_stream():
+        time.sleep(0.05)
+        yield _chunk("你")
+        for text in ["好", "呀", ""]:
+            time.sleep(0.01)
+            yield _chunk(text)
+        yield _chunk(completion_tokens=3)
+
+    labels = "provider=test_stream,model=fake"
+    before = _histogram_count("xhs_ai_time_to_first_token_seconds", labels)
+    deltas = list(_iter_openai_compatible_stream(slow_stream(), _StreamMeter("test_stream", "fake")))
+
+    assert deltas == ["你", "好", "呀"]
+    snapshot = metrics.snapshot()
+    ttft = snapshot["xhs_ai_time_to_first_token_seconds"][labels]
+    logger.info(f"首片段时间: {ttft['sum']:.3f}s, 生成速度样本: {snapshot['xhs_ai_tokens_per_second'][labels]}")
+    assert ttft["count"] == before + 1
+    assert ttft["sum"] >= 0.05
+    assert snapshot["xhs_ai_tokens_per_second"][labels]["count"] >= 1
+
+
+def test_stream_without_usage_is_estimated():
+    """测试服务端未返回 usage 时片段数只计入估算值，不计入真实 token 和用量账本"""
+    before = AI_TOKENS_TOTAL.get(provider="test_estimate", kind="completion_estimated")
+    with usage_scope("estimate") as scope:
+        deltas = list(_iter_openai_compatible_stream(iter([_chunk("一"), _chunk("二")]),
+                                                     _StreamMeter("test_estimate", "fake")))
+    assert deltas == ["一", "二"]
+    assert AI_TOKENS_TOTAL.get(provider="test_estimate", kind="completion_estimated") == before + 2
+    assert AI_TOKENS_TOTAL.get(provider="test_estimate", kind="completion") == 0
+    assert scope.usages[0].completion_tokens == 0
+
+
+def test_openai_stream_requests_usage():
+    """测试 OpenAI 流式请求带上 include_usage，记录服务端返回的真实 token 数"""
+    with FakeOpenAIServer(latency=constant(0.01), completion_tokens=8) as server:
+        client = OpenAIClient(api_key="fake", base_url=server.base_url, model="fake-model")
+        estimated = AI_TOKENS_TOTAL.get(provider="openai", kind="completion_estimated")
+        with usage_scope("stream_usage") as scope:
+            text = "".join(client.chat_stream([{"role": "user", "content": "你好"}]))
+    assert text
+    usage, = scope.usages
+    logger.info(f"流式用量: {usage.to_dict()}")
+    assert usage.completion_tokens == 8 and usage.prompt_tokens > 0
+    assert AI_TOKENS_TOTAL.get(provider="openai", kind="completion_estimated") == estimated
+
+
+def test_default_stream_and_cache():
+    """测试默认实现一次性产出，以及缓存包装器的流式命中"""
+    inner = EchoAIClient()
+    assert list(inner.generate_text_stream("完整回复")) == ["完整回复"]
+    assert _histogram_count("xhs_ai_time_to_first_token_seconds", "provider=EchoAIClient,model=echo") >= 1
+
+    client = CachedAIClient(inner, db_path=None)
+    assert "".join(client.generate_text_stream("缓存我")) == "缓存我"
+    assert "".join(client.generate_text_stream("缓存我")) == "缓存我"
+    assert client.generate_text("缓存我") == "缓存我"
+    assert inner.calls == 2
+
+
+if __name__ == "__main__":
+    test_openai_compatible_stream_metrics()
+    test_stream_without_usage_is_estimated()
+    test_openai_stream_requests_usage()
+    test_default_stream_and_cache()
+    logger.info("AI 流式输出测试完成")
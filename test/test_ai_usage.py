@@ -0,0 +1,85 @@
+"""AI 用量统计测试脚本"""
+import os
+import tempfile
+
+from business import AIManager
+from core.ai_client import BaseAIClient
+from core.ai_usage import UsageLedger, usage_ledger, usage_scope
+from core.exceptions import TokenBudgetExceeded
+from core.logger import logger
+from core.models import AIUsage, Comment, UserInfo
+
+
+class MeteredClient(BaseAIClient):
+    """每次调用记录固定用量的假客户端"""
+
+    def __init__(self):
+        self.model = "metered"
+        self.calls = 0
+
+    def chat(self, messages, temperature=None, max_tokens=None):
+        usage_ledger.check_budget()
+        self.calls += 1
+        usage_ledger.record(AIUsage(provider="fake", model=self.model, prompt_tokens=30, completion_tokens=20))
+        return "生成的内容"
+
+    def is_available(self):
+        return True
+
+
+def test_ledger_scope_and_persistence():
+    """测试范围归属、分组汇总与 SQLite 持久化"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = UsageLedger(os.path.join(tmp, "usage.db"))
+        with usage_scope("generate_xiaohongshu_post", style="fairy") as outer:
+            ledger.record(AIUsage(provider="openai", model="gpt", prompt_tokens=10, completion_tokens=5, latency=0.2))
+            with usage_scope(style="provocative") as inner:
+                ledger.record(AIUsage(provider="openai", model="gpt", prompt_tokens=7, completion_tokens=3, latency=0.4))
+        ledger.record(AIUsage(provider="zhipu", model="glm-4", cached=True))
+
+        assert inner.usages[0].operation == "generate_xiaohongshu_post"
+        assert outer.total_tokens == 25 and inner.total_tokens == 10
+
+        by_style = ledger.summary(by="style")
+        logger.info(f"按风格汇总: {by_style}")
+        assert by_style["fairy"]["total_tokens"] == 15
+        assert by_style["provocative"]["avg_latency"] == 0.4
+        assert by_style[None]["cached_calls"] == 1
+
+        persisted = ledger.query(by="operation")
+        assert persisted["generate_xiaohongshu_post"]["calls"] == 2
+        assert persisted["generate_xiaohongshu_post"]["total_tokens"] == 25
+
+
+def test_manager_attribution_and_budget():
+    """测试 AIManager 按方法和风格归集，以及预算用尽后直接拒绝"""
+    usage_ledger.reset()
+    client = MeteredClient()
+    manager = AIManager(client=client)
+    comment = Comment(comment_id="c1", content="写得真好", user_info=UserInfo(user_id="u1", nickname="路人"))
+
+    manager.generate_xiaohongshu_post(topic="春季穿搭", style="fairy")
+    manager.generate_comment_reply(comment, style="sarcastic")
+
+    by_operation = usage_ledger.summary(by="operation")
+    assert by_operation["generate_xiaohongshu_post"]["total_tokens"] == 50
+    assert by_operation["generate_comment_reply"]["calls"] == 1
+    assert set(usage_ledger.summary(by="style")) == {"fairy", "sarcastic"}
+
+    usage_ledger.set_budget(100)
+    try:
+        try:
+            manager.generate_comment_reply(comment)
+            assert False, "预算用尽时应抛出 TokenBudgetExceeded"
+        except TokenBudgetExceeded as e:
+            logger.info(f"预算拦截: {e}")
+        assert client.calls == 2
+    finally:
+        usage_ledger.set_budget(0)
+        usage_ledger.reset()
+
+
+if __name__ == "__main__":
+    test_ledger_scope_and_persistence()
+    test_manager_attribution_and_budget()
+    logger.info("AI 用量统计测试完成")
@@ -0,0 +1,96 @@
+"""常驻浏览器测试脚本（使用桩调试端口，不需要 Chrome）"""
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.browser_daemon import BrowserDaemon, cached_driver_path
+from core.config import config
+from core.logger import logger
+
+
+class FakeDevToolsHandler(BaseHTTPRequestHandler):
+    """只实现 /json/version 的桩调试端口"""
+
+    def do_GET(self):
+        body = json.dumps({"Browser": "Chrome/120.0.0.0", "webSocketDebuggerUrl": "ws://fake"}).encode()
+        self.send_response(200 if self.path == "/json/version" else 404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_daemon_liveness():
+    """测试调试端口存活检查，以及已运行时 start() 直接复用"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeDevToolsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    with tempfile.TemporaryDirectory() as profile:
+        daemon = BrowserDaemon(user_data_dir=profile, port=port)
+        assert daemon.is_alive()
+        assert daemon.start() == f"127.0.0.1:{port}"
+        status = daemon.status()
+        logger.info(f"常驻浏览器状态: {status}")
+        assert status["alive"] and status["browser"] == "Chrome/120.0.0.0"
+
+        server.shutdown()
+        server.server_close()
+        assert not daemon.is_alive(timeout=0.2)
+        # 没有存活的浏览器时 stop() 只清理状态文件
+        daemon.stop()
+        assert not daemon.state_path.exists()
+
+
+def test_driver_path_cache():
+    """测试缓存有效期内直接复用 chromedriver 路径"""
+    original = config.browser.driver_cache_path
+    with tempfile.TemporaryDirectory() as tmp:
+        driver = os.path.join(tmp, "chromedriver")
+        open(driver, "w").close()
+        config.browser.driver_cache_path = os.path.join(tmp, "chromedriver.json")
+        with open(config.browser.driver_cache_path, "w") as f:
+            json.dump({"path": driver, "resolved_at": time.time()}, f)
+        try:
+            assert cached_driver_path() == driver
+        finally:
+            config.browser.driver_cache_path = original
+
+
+def test_launch_presets():
+    """测试启动预设：预设中的窗口大小/无头参数覆盖配置，冷启动与常驻浏览器使用相同参数"""
+    assert config.browser.launch_arguments("default") == [config.browser.window_size] + (
+        ["--headless=new"] if config.browser.headless else []
+    )
+
+    args = config.browser.launch_arguments("headless")
+    logger.info(f"headless 预设参数: {args}")
+    assert config.browser.window_size not in args and "--window-size=1280,800" in args
+    assert args.count("--headless=new") == 1 and "--disable-dev-shm-usage" in args
+
+    original = config.browser.launch_preset
+    config.browser.launch_preset = "headless"
+    try:
+        command = BrowserDaemon(user_data_dir="/tmp/profile", port=9333)._command("chrome")
+        assert command[3:3 + len(args)] == args
+        assert command.count("--no-first-run") == 1
+    finally:
+        config.browser.launch_preset = original
+
+    try:
+        config.browser.launch_arguments("missing")
+        assert False, "未知预设应抛出 ValueError"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_daemon_liveness()
+    test_driver_path_cache()
+    test_launch_presets()
+    logger.info("常驻浏览器测试完成")
@@ -0,0 +1,104 @@
+"""数据记录测试脚本（使用临时目录）"""
+import gzip
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from core.config import config
+from core.data_logger import JSONLWriter, data_logger, log_record, shutdown
+from core.logger import logger
+
+
+def _read_lines(path):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_batching_and_rotation():
+    """测试批量写入、按大小轮转并压缩，close() 写入缓冲区中剩余的记录"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "post.jsonl"
+        writer = JSONLWriter(str(path), batch_size=1000, flush_interval=60, max_bytes=200)
+        for i in range(3):
+            writer.write({"i": i, "title": "标题"})
+        # 未达到批量条数且未到写入间隔：记录还在内存中（文件由后台线程打开，此时可能尚未创建）
+        assert not path.exists() or path.stat().st_size == 0
+
+        writer.flush()
+        assert [r["i"] for r in _read_lines(path)] == [0, 1, 2]
+
+        for i in range(3, 10):
+            writer.write({"i": i, "title": "标题"})
+        writer.close()
+
+        segments = sorted(Path(tmp).glob("post.*.jsonl.gz"))
+        logger.info(f"轮转后的文件: {[s.name for s in segments]}")
+        assert len(segments) == 1 and not list(Path(tmp).glob("post.*.jsonl"))
+        records = _read_lines(segments[0]) + _read_lines(path)
+        assert [r["i"] for r in records] == list(range(10))
+
+
+def test_partial_line_recovery():
+    """测试截掉崩溃时写了一半的末行，补做中断的压缩"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "reply.jsonl"
+        path.write_bytes(b'{"i": 0}\n{"i": 1}\n{"i": 2, "reply_con')
+        segment = Path(tmp) / "reply.2026-01-01.1.jsonl"
+        segment.write_bytes(b'{"i": -1}\n')
+        (Path(tmp) / "reply.2026-01-01.1.jsonl.gz.tmp").write_bytes(b"partial")
+
+        writer = JSONLWriter(str(path), fsync="close")
+        writer.write({"i": 3})
+        writer.close()
+
+        assert [r["i"] for r in _read_lines(path)] == [0, 1, 3]
+        assert _read_lines(str(segment) + ".gz") == [{"i": -1}]
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["reply.2026-01-01.1.jsonl.gz", "reply.jsonl"]
+
+
+class RecordingWriter(JSONLWriter):
+    """记录打开文件（断行恢复、补做压缩）所在的线程"""
+
+    open_threads = []
+
+    def _open(self):
+        RecordingWriter.open_threads.append(threading.current_thread().name)
+        super()._open()
+
+
+def test_open_on_writer_thread():
+    """测试构造写入器和 write() 不做文件操作，打开文件、断行恢复与压缩都在后台写入线程中进行"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "nested" / "post.jsonl"
+        RecordingWriter.open_threads = []
+        writer = RecordingWriter(str(path), fsync="never")
+        writer.write({"i": 0})
+        writer.close()
+        assert RecordingWriter.open_threads == ["xhs-data-log-post"]
+        assert _read_lines(path) == [{"i": 0}]
+
+
+def test_shared_writers():
+    """测试按配置创建共享写入器，log_record 自动加上时间字段"""
+    original = config.data_log.directory
+    with tempfile.TemporaryDirectory() as tmp:
+        config.data_log.directory = tmp
+        try:
+            assert data_logger("reply") is data_logger("reply")
+            log_record("reply", {"comment_id": "c1", "reply_content": "谢谢"})
+            shutdown()
+            record, = _read_lines(os.path.join(tmp, "reply.jsonl"))
+            assert record["comment_id"] == "c1" and record["reply_content"] == "谢谢" and "time" in record
+        finally:
+            config.data_log.directory = original
+
+
+if __name__ == "__main__":
+    test_batching_and_rotation()
+    test_partial_line_recovery()
+    test_open_on_writer_thread()
+    test_shared_writers()
+    logger.info("数据记录测试完成")
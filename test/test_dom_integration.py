@@ -2,6 +2,7 @@
 import os
 import sys
 from core.logger import logger
+from core.profiler import start_profiler_from_env
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -134,5 +135,6 @@ def test_browser_manager_dom_integration():
 
 
 if __name__ == "__main__":
+    start_profiler_from_env()
     test_integration()
     test_browser_manager_dom_integration()
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""DOM 元素库迁移与维护测试脚本"""
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from core.dom_maintenance import DOMMaintenance
+from core.dom_manager import DOMManager
+from core.dom_mapper import SCHEMA_VERSION, DOMElementMapper
+from core.logger import logger
+from core.metrics import metrics
+from core.models import DOMElement
+
+
+def test_migrate_legacy_database():
+    """测试旧版数据库（无版本号、选择器重复）迁移到当前版本"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "dom.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                CREATE TABLE dom_elements (
+                    element_id TEXT PRIMARY KEY, selector TEXT NOT NULL, element_type TEXT NOT NULL,
+                    position TEXT, text_content TEXT, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    page_url TEXT, description TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX idx_selector ON dom_elements(selector)')
+            conn.executemany(
+                'INSERT INTO dom_elements (element_id, selector, element_type) VALUES (?, ?, ?)',
+                [("old", ".btn", "button"), ("new", ".btn", "button"), ("other", ".x", "div")]
+            )
+
+        mapper = DOMElementMapper(db_path)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == "wal"
+        assert mapper.find_by_selector(".btn").element_id == "new"
+        assert mapper.find_by_id("old") is None
+
+        # 原地更新：同一 element_id 不会产生新行，选择器被其他元素占用时移除旧元素
+        mapper.insert(DOMElement(element_id="other", selector=".x", element_type="div", text_content="更新"))
+        mapper.insert(DOMElement(element_id="moved", selector=".btn", element_type="button"))
+        assert mapper.find_by_selector(".x").text_content == "更新"
+        assert mapper.find_by_selector(".btn").element_id == "moved"
+        assert sorted(e.element_id for e in mapper.find_all()) == ["moved", "other"]
+
+
+def test_run_once_prunes_stale_elements():
+    """测试维护任务清理过期元素（保留播种的选择器）并更新指标"""
+    with tempfile.TemporaryDirectory() as tmp:
+        dom_manager = DOMManager(os.path.join(tmp, "dom.db"), os.path.join(tmp, "cache"))
+        dom_manager.seed_selectors({"seeded": ".seeded"})
+        stale = datetime.now() - timedelta(days=60)
+        dom_manager.insert_element(DOMElement(element_id="learned", selector=".learned", element_type="div",
+                                              updated_at=stale))
+        dom_manager.insert_element(DOMElement(element_id="fresh", selector=".fresh", element_type="div"))
+        # 播种的元素即使很久没更新也不清理
+        with sqlite3.connect(dom_manager.mapper.db_path) as conn:
+            conn.execute('UPDATE dom_elements SET updated_at = ? WHERE element_id = ?', (stale.isoformat(), "seeded"))
+
+        maintenance = DOMMaintenance(dom_manager.mapper, retention_days=30, interval=3600)
+        assert maintenance.is_due()
+        result = maintenance.run_once()
+        logger.info(f"维护结果: {result}")
+
+        assert result["pruned"] == 1
+        assert sorted(e.element_id for e in dom_manager.mapper.find_all()) == ["fresh", "seeded"]
+        assert not maintenance.is_due()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["xhs_dom_db_rows"]["table=dom_elements"] == 2
+        assert snapshot["xhs_dom_db_size_bytes"]["file=db"] > 0
+        assert snapshot["xhs_dom_db_size_bytes"]["file=wal"] == 0
+
+
+if __name__ == "__main__":
+    test_migrate_legacy_database()
+    test_run_once_prunes_stale_elements()
+    logger.info("DOM 元素库维护测试完成")
@@ -2,6 +2,7 @@
 from core.dom_manager import DOMManager
 from core.models import DOMElement
 from core.logger import logger
+from core.profiler import start_profiler_from_env
 from datetime import datetime
 
 
@@ -113,5 +114,6 @@ def test_with_browser():
 
 
 if __name__ == "__main__":
+    start_profiler_from_env()
     test_dom_manager()
     test_with_browser()
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""DOM 选择器播种测试脚本"""
+import os
+import tempfile
+
+from core.dom_manager import DOMManager
+from core.logger import logger
+from core.metrics import metrics
+
+
+def test_seed_is_idempotent_and_diff_based():
+    """测试配置不变时跳过播种，变化时只应用差异并保留已学习的信息"""
+    with tempfile.TemporaryDirectory() as tmp:
+        dom_manager = DOMManager(os.path.join(tmp, "dom.db"), os.path.join(tmp, "cache"))
+
+        diff = dom_manager.seed_selectors({"a": ".a", "b": ".b"})
+        assert sorted(diff["added"]) == ["a", "b"]
+
+        # 运行过程中学习到的信息
+        element = dom_manager.get_element(".a")
+        element.text_content = "发布"
+        dom_manager.update_element(element)
+        assert dom_manager.get_element(".a").text_content == "发布"
+        assert dom_manager.cache_manager.get_element_by_selector(".a") is not None
+
+        # 配置未变化：不写数据库、不清缓存
+        unchanged_before = metrics.snapshot()["xhs_dom_seed_total"].get("result=unchanged", 0)
+        assert dom_manager.seed_selectors({"b": ".b", "a": ".a"}) == {"added": [], "changed": [], "removed": []}
+        assert metrics.snapshot()["xhs_dom_seed_total"]["result=unchanged"] == unchanged_before + 1
+        assert dom_manager.cache_manager.get_element_by_selector(".a") is not None
+
+        # 修改 b、新增 c：a 的缓存和学习到的信息保持不变
+        dom_manager.get_element(".b")
+        diff = dom_manager.seed_selectors({"a": ".a", "b": ".b2", "c": ".c"})
+        logger.info(f"选择器差异: {diff}")
+        assert diff == {"added": ["c"], "changed": ["b"], "removed": []}
+        assert dom_manager.cache_manager.get_element_by_selector(".b") is None
+        assert dom_manager.get_element(".a").text_content == "发布"
+        assert dom_manager.mapper.find_by_id("b").selector == ".b2"
+
+        # 删除 b
+        diff = dom_manager.seed_selectors({"a": ".a", "c": ".c"})
+        assert diff["removed"] == ["b"]
+        assert dom_manager.mapper.find_by_id("b") is None
+
+
+if __name__ == "__main__":
+    test_seed_is_idempotent_and_diff_based()
+    logger.info("DOM 选择器播种测试完成")
@@ -2,6 +2,7 @@
 import os
 import sys
 from core.logger import logger
+from core.profiler import start_profiler_from_env
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -125,6 +126,10 @@ def test_dom_simple():
     logger.info("\n10. 清理测试文件...")
     try:
         os.remove("test_dom_elements.db")
+        # WAL 模式下连接未回收前会留下 -wal/-shm 文件
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(f"test_dom_elements.db{suffix}"):
+                os.remove(f"test_dom_elements.db{suffix}")
         import shutil
         if os.path.exists("test_cache"):
             shutil.rmtree("test_cache")
@@ -136,4 +141,5 @@ def test_dom_simple():
 
 
 if __name__ == "__main__":
+    start_profiler_from_env()
     test_dom_simple()
\ No newline at end of file
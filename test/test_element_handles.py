@@ -0,0 +1,130 @@
+"""元素句柄缓存测试脚本（使用桩 WebDriver，不需要 Chrome）"""
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+from core.browser_manager import BrowserManager, CachedElement
+from core.logger import logger
+from core.page_scripts import PageScripts
+
+
+class FakeDriver:
+    """记录每次元素命令；stale 集合中的元素ID在使用时抛出 StaleElementReferenceException"""
+
+    def __init__(self):
+        self.commands = []
+        self.stale = set()
+        self.session_id = "fake"
+        self.scripts = []
+        self.cdp = []
+        # elementBox 收到的上次测量坐标；hit 为 elementFromPoint 命中检测的结果
+        self.box_hints = []
+        self.hit = True
+
+    def execute_script(self, script, *args):
+        # 页面辅助函数调用：args[0] 为函数名（视为已注入）
+        self.scripts.append(args[0])
+        if args[0] == "elementBox":
+            self.box_hints.append(args[2])
+            return {"x": 100.5, "y": 40, "width": 80, "height": 20, "hit": self.hit}
+        return True
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params.get("type") or params.get("text")))
+        return {}
+
+    def execute(self, command, params):
+        self.commands.append((command, params["id"]))
+        if params["id"] in self.stale:
+            raise StaleElementReferenceException("stale element reference")
+        return {"value": None}
+
+
+def test_handles_scoped_to_page():
+    """测试同一页面内复用句柄、导航后重新定位、过期时自动重新定位"""
+    driver = FakeDriver()
+    resolved = []
+
+    def resolve():
+        resolved.append(f"e{len(resolved)}")
+        return WebElement(driver, resolved[-1])
+
+    # 只测试句柄缓存，不启动浏览器
+    browser = BrowserManager.__new__(BrowserManager)
+    browser.page_epoch = browser.layout_epoch = 0
+    browser._handles = {}
+
+    first, cached = browser._cached_handle(("find", By.CSS_SELECTOR, ".a", False), resolve)
+    second, cached_again = browser._cached_handle(("find", By.CSS_SELECTOR, ".a", False), resolve)
+    assert isinstance(first, CachedElement) and not cached
+    assert second is first and cached_again
+    assert resolved == ["e0"]
+
+    # 元素被重新渲染：使用时重新定位一次，然后重试命令
+    driver.stale.add("e0")
+    first.click()
+    assert resolved == ["e0", "e1"] and first.id == "e1"
+    assert driver.commands == [("clickElement", "e0"), ("clickElement", "e1")]
+
+    # 导航后不再复用上一页的句柄
+    browser.new_page()
+    third, cached = browser._cached_handle(("find", By.CSS_SELECTOR, ".a", False), resolve)
+    assert third is not first and not cached and third.epoch == 1
+    logger.info(f"定位记录: {resolved}")
+
+
+def test_cdp_input():
+    """测试 cdp 输入方式：点击带上已测量的坐标做命中检测，多行文本按行写入"""
+    driver = FakeDriver()
+    browser = BrowserManager.__new__(BrowserManager)
+    browser.driver = driver
+    browser.page_epoch = browser.layout_epoch = 0
+    browser._handles = {}
+    browser.page_scripts = PageScripts(browser)
+
+    button, _ = browser._cached_handle(("find", By.CSS_SELECTOR, ".btn", True), lambda: WebElement(driver, "btn"))
+    browser._cdp_click(button)
+    browser._cdp_click(button)
+    assert driver.scripts == ["elementBox", "elementBox"]
+    assert driver.box_hints[0] is None and driver.box_hints[1]["x"] == 100.5
+    assert driver.cdp == [("Input.dispatchMouseEvent", t) for t in ("mousePressed", "mouseReleased")] * 2
+
+    driver.cdp.clear()
+    browser._cdp_insert_text(button, "第一行\n第二行")
+    assert driver.scripts == ["elementBox", "elementBox", "focusForInput"]
+    assert driver.cdp == [
+        ("Input.insertText", "第一行"),
+        ("Input.dispatchKeyEvent", "keyDown"),
+        ("Input.dispatchKeyEvent", "keyUp"),
+        ("Input.insertText", "第二行"),
+    ]
+
+    # 执行过页面脚本（可能滚动了页面）后不再带上旧坐标，直接重新测量
+    browser._cdp_click(button)
+    assert driver.scripts == ["elementBox", "elementBox", "focusForInput", "elementBox"]
+    assert driver.box_hints[2] is None
+
+    # 重新测量后中心点仍被遮挡：不发送鼠标事件，由 click_element 回退为 WebDriver 点击
+    driver.hit = False
+    driver.cdp.clear()
+    try:
+        browser._cdp_click(button)
+        assert False, "被遮挡时应抛出异常"
+    except ValueError as e:
+        logger.info(f"命中检测失败: {e}")
+    assert driver.cdp == []
+
+
+def test_locator_type():
+    """测试选择器类型判断"""
+    assert BrowserManager.locator_type("//button[@id='x']") == By.XPATH
+    assert BrowserManager.locator_type("(//div)[1]") == By.XPATH
+    assert BrowserManager.locator_type("#comment-1 .reply") == By.CSS_SELECTOR
+    assert BrowserManager.locator_type("p#content-textarea.content-input") == By.CSS_SELECTOR
+
+
+if __name__ == "__main__":
+    test_handles_scoped_to_page()
+    test_cdp_input()
+    test_locator_type()
+    logger.info("元素句柄缓存测试完成")
@@ -0,0 +1,42 @@
+"""本地 OpenAI 桩服务测试脚本"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.ai_client import OpenAIClient
+from core.logger import logger
+from fake_openai_server import FakeOpenAIServer, constant
+
+
+def test_openai_client_against_fake_server():
+    """测试 OpenAIClient 的普通请求、流式请求和 keep-alive 连接复用"""
+    with FakeOpenAIServer(latency=constant(0.01), completion_tokens=8) as server:
+        client = OpenAIClient(api_key="fake", base_url=server.base_url, model="fake-model")
+
+        first = client.generate_text("春季穿搭")
+        assert first and first == client.generate_text("春季穿搭"), "相同请求应得到相同回复"
+        client.generate_text("夏季穿搭")
+        logger.info(f"桩服务统计: {server.stats}")
+        assert server.stats["requests"] == 3
+        assert server.stats["connections"] == 1, "顺序请求应复用同一条连接"
+
+        pieces = list(client.generate_text_stream("春季穿搭"))
+        assert len(pieces) == 8
+        assert "".join(pieces) == first
+
+
+def test_injected_error_is_retried():
+    """测试注入的 5xx 错误会被重试"""
+    with FakeOpenAIServer() as server:
+        client = OpenAIClient(api_key="fake", base_url=server.base_url, model="fake-model")
+        server.fail_next(1)
+        assert client.generate_text("重试")
+        assert server.stats["errors"] == 1
+        assert server.stats["requests"] == 2
+
+
+if __name__ == "__main__":
+    test_openai_client_against_fake_server()
+    test_injected_error_is_retried()
+    logger.info("本地 OpenAI 桩服务测试完成")
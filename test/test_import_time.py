@@ -0,0 +1,70 @@
+"""导入耗时回归测试脚本（python -X importtime）"""
+import os
+import subprocess
+import sys
+from typing import Dict
+
+from core.logger import logger
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 累计导入耗时上限（毫秒）。懒加载前两者都在 250ms 以上（连带导入 selenium）
+IMPORT_TIME_LIMITS_MS = {
+    "core.models": 120,
+    "business.ai_manager": 200,
+}
+
+# 这些轻量入口不应连带导入的重量级依赖
+HEAVY_MODULES = ("selenium", "webdriver_manager", "openai", "zhipuai", "httpx", "requests")
+
+
+def measure_import(module: str) -> Dict[str, int]:
+    """在新进程中导入模块，返回 {模块名: 累计导入耗时(微秒)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, cumulative, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        timings[name] = int(cumulative)
+    return timings
+
+
+def test_light_imports():
+    """测试 core.models 和 business.ai_manager 的导入耗时，且不导入 selenium/AI SDK"""
+    for module, limit_ms in IMPORT_TIME_LIMITS_MS.items():
+        # 取三次中的最小值，降低机器抖动的影响
+        runs = [measure_import(module) for _ in range(3)]
+        elapsed_ms = min(run[module] for run in runs) / 1000
+        logger.info(f"import {module}: {elapsed_ms:.1f}ms（上限 {limit_ms}ms）")
+
+        heavy = sorted(name for name in runs[0] if name.split(".")[0] in HEAVY_MODULES)
+        assert not heavy, f"import {module} 连带导入了重量级依赖: {heavy[:5]}"
+        assert elapsed_ms < limit_ms, f"import {module} 耗时 {elapsed_ms:.1f}ms，超过上限 {limit_ms}ms"
+
+
+def test_lazy_package_attributes():
+    """测试包级别名称仍可按原方式导入"""
+    import core
+    import business
+    from core import AIClientFactory, config, logger as core_logger
+    from business import AIManager
+
+    assert core.config is config and core_logger is logger
+    assert AIClientFactory.__module__ == "core.ai_client"
+    assert AIManager.__module__ == "business.ai_manager"
+    assert "BrowserManager" in dir(core) and "PublishManager" in dir(business)
+    try:
+        core.NotExists
+        assert False, "未知属性应抛出 AttributeError"
+    except AttributeError:
+        pass
+
+
+if __name__ == "__main__":
+    test_light_imports()
+    test_lazy_package_attributes()
+    logger.info("导入耗时回归测试完成")
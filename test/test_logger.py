@@ -0,0 +1,108 @@
+"""日志模块测试脚本（使用临时日志文件，测试结束后恢复默认处理器）"""
+import io
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+from core.logger import ColoredFormatter, LazyFormat, Logger, lazy_json, logger
+
+
+def _configure(stream, **kwargs):
+    """把控制台处理器指向 stream 后重新配置"""
+    original = sys.stdout
+    sys.stdout = stream
+    try:
+        return Logger.configure(**kwargs)
+    finally:
+        sys.stdout = original
+
+
+def test_file_plain_console_colored_and_queue_flush():
+    """测试文件中的级别名不带颜色代码、控制台带颜色，异步队列在 shutdown() 时写完"""
+    console = io.StringIO()
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "app.log")
+        try:
+            _configure(console, log_file=log_file, console_level="INFO", use_queue=True)
+            for i in range(50):
+                logger.warning("队列日志 %d", i)
+            Logger.shutdown()
+
+            with open(log_file, encoding="utf-8") as f:
+                content = f.read()
+            assert content.count("队列日志") == 50
+            assert " - WARNING - 队列日志 49" in content and "\033[" not in content
+            assert f"{ColoredFormatter.COLORS['WARNING']}WARNING{ColoredFormatter.RESET}" in console.getvalue()
+        finally:
+            Logger.configure()
+
+
+def test_rotation():
+    """测试超过 max_bytes 后轮转并保留 backup_count 个历史文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "app.log")
+        try:
+            _configure(io.StringIO(), log_file=log_file, max_bytes=500, backup_count=2)
+            for i in range(100):
+                logger.debug("轮转日志 %d", i)
+            Logger.configure()
+            assert sorted(os.listdir(tmp)) == ["app.log", "app.log.1", "app.log.2"]
+        finally:
+            Logger.configure()
+
+
+def test_lazy_args_not_evaluated_when_disabled():
+    """测试级别未启用时不求值延迟参数，启用时正常格式化"""
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "结果"
+
+    console = io.StringIO()
+    try:
+        _configure(console, console_level="INFO")
+        assert not Logger.is_enabled_for(logging.DEBUG)
+        logger.debug("调试: %s", LazyFormat(expensive))
+        assert calls == []
+
+        logger.info("信息: %s %s", LazyFormat(expensive), lazy_json({"键": 1}))
+        # 每个输出该记录的处理器各求值一次（pytest 也会挂载捕获日志的处理器）
+        assert calls
+        assert '信息: 结果 {"键": 1}' in console.getvalue()
+    finally:
+        Logger.configure()
+
+
+def test_queue_formats_on_listener_thread():
+    """测试异步队列模式下调用线程只入队，延迟参数在后台监听线程中求值"""
+    threads = []
+
+    def expensive():
+        threads.append(threading.current_thread())
+        return "结果"
+
+    console = io.StringIO()
+    # pytest 在根记录器上挂载的捕获处理器会在调用线程中格式化，测试期间不向上传递
+    propagate, logger.propagate = logger.propagate, False
+    try:
+        _configure(console, console_level="INFO", use_queue=True)
+        logger.info("队列格式化: %s", LazyFormat(expensive))
+        # 入队后立即检查：调用线程没有求值
+        assert threading.current_thread() not in threads
+        Logger.shutdown()
+        assert threads and threading.current_thread() not in threads
+        assert "队列格式化: 结果" in console.getvalue()
+    finally:
+        logger.propagate = propagate
+        Logger.configure()
+
+
+if __name__ == "__main__":
+    test_file_plain_console_colored_and_queue_flush()
+    test_rotation()
+    test_lazy_args_not_evaluated_when_disabled()
+    test_queue_formats_on_listener_thread()
+    logger.info("日志模块测试完成")
@@ -0,0 +1,107 @@
+"""浏览器内存治理测试脚本（使用桩浏览器，不需要 Chrome）"""
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from core.config import config
+from core.logger import logger
+from core.memory_governor import MemoryGovernor, process_tree_memory
+from core.metrics import metrics
+
+
+class FakeBrowser:
+    """以当前测试进程代替 Chrome 进程树，记录执行的治理动作"""
+
+    def __init__(self, js_heap):
+        self.attached = False
+        self.driver = SimpleNamespace(service=SimpleNamespace(process=SimpleNamespace(pid=os.getpid())))
+        self.js_heap = js_heap
+        self.actions = []
+        # 发送 CDP 命令的线程
+        self.cdp_threads = set()
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_threads.add(threading.current_thread().name)
+        if cmd == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": self.js_heap}, {"name": "Nodes", "value": 1200}]}
+        self.actions.append(cmd)
+        return {}
+
+    def close_stray_tabs(self):
+        return 0
+
+    def recycle_tab(self):
+        self.actions.append("recycle_tab")
+
+    def restart(self):
+        self.actions.append("restart")
+
+
+def test_escalation_applied_at_checkpoint():
+    """测试按进程树内存选择动作，只在 apply_pending（操作之间）执行并记录指标"""
+    pss = process_tree_memory(os.getpid())
+    logger.info(f"测试进程 PSS: {pss}")
+    assert pss is None or pss > 0
+    if pss is not None:
+        # PSS 均摊共享页，不会超过 RSS
+        with open(f"/proc/{os.getpid()}/status") as f:
+            rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+        assert pss <= rss
+
+    browser = FakeBrowser(js_heap=50 * 1024 * 1024)
+    governor = MemoryGovernor(browser)
+    limits = (config.memory.clear_cache_mb, config.memory.recycle_tab_mb, config.memory.restart_mb)
+    try:
+        # 把阈值设在测试进程内存附近：超过 clear_cache 和 recycle_tab，未超过 restart
+        memory_mb = (pss or browser.js_heap) / 1024 / 1024
+        config.memory.clear_cache_mb, config.memory.recycle_tab_mb, config.memory.restart_mb = (
+            memory_mb / 4, memory_mb / 2, memory_mb * 100
+        )
+        assert governor.check() == "recycle_tab"
+        assert browser.actions == ["Performance.enable"]
+
+        before = metrics.snapshot()["xhs_memory_actions_total"].get("action=recycle_tab", 0)
+        assert governor.apply_pending() == "recycle_tab"
+        assert browser.actions[-1] == "recycle_tab"
+        assert governor.apply_pending() is None
+        assert metrics.snapshot()["xhs_memory_actions_total"]["action=recycle_tab"] == before + 1
+        assert metrics.snapshot()["xhs_browser_dom_nodes"][""] == 1200
+
+        # 阈值之下不做任何动作
+        config.memory.clear_cache_mb = config.memory.recycle_tab_mb = memory_mb * 100
+        assert governor.check() is None
+    finally:
+        config.memory.clear_cache_mb, config.memory.recycle_tab_mb, config.memory.restart_mb = limits
+
+
+def test_background_thread_skips_webdriver():
+    """测试后台线程只读取进程树内存，页面指标由 checkpoint() 在调用线程中按间隔采样"""
+    browser = FakeBrowser(js_heap=50 * 1024 * 1024)
+    governor = MemoryGovernor(browser)
+    interval = config.memory.check_interval
+    config.memory.check_interval = 0.01
+    try:
+        governor.start()
+        time.sleep(0.1)
+        governor.stop()
+        assert browser.cdp_threads == set()
+
+        assert governor.checkpoint() is None
+        assert browser.cdp_threads == {threading.current_thread().name}
+        assert governor.last_sample["js_heap"] == browser.js_heap
+
+        # 未到采样间隔时不发送命令
+        config.memory.check_interval = 3600
+        browser.cdp_threads.clear()
+        governor.checkpoint()
+        assert browser.cdp_threads == set()
+    finally:
+        governor.stop()
+        config.memory.check_interval = interval
+
+
+if __name__ == "__main__":
+    test_escalation_applied_at_checkpoint()
+    test_background_thread_skips_webdriver()
+    logger.info("浏览器内存治理测试完成")
@@ -0,0 +1,66 @@
+"""运行指标模块测试脚本"""
+import urllib.request
+
+from core.logger import logger
+from core.metrics import MetricsRegistry
+
+
+def test_counter_and_snapshot():
+    """测试计数器、仪表盘与快照"""
+    registry = MetricsRegistry()
+    lookups = registry.counter("xhs_dom_lookups_total", "DOM 元素查询次数", ["tier"])
+    lookups.inc(tier="cache")
+    lookups.inc(tier="cache")
+    lookups.inc(tier="miss")
+
+    # 同名重复注册返回同一个实例
+    assert registry.counter("xhs_dom_lookups_total", "DOM 元素查询次数", ["tier"]) is lookups
+
+    memory = registry.gauge("xhs_test_memory_bytes", "内存")
+    memory.set(1024)
+    memory.dec(24)
+
+    snapshot = registry.snapshot()
+    logger.info(f"指标快照: {snapshot}")
+    assert snapshot["xhs_dom_lookups_total"] == {"tier=cache": 2.0, "tier=miss": 1.0}
+    assert snapshot["xhs_test_memory_bytes"] == {"": 1000.0}
+
+
+def test_histogram_buckets():
+    """测试直方图累计分桶"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("xhs_test_seconds", "耗时", ["op"], buckets=(0.1, 1.0))
+    latency.observe(0.05, op="get")
+    latency.observe(0.5, op="get")
+    latency.observe(5.0, op="get")
+
+    sample = registry.snapshot()["xhs_test_seconds"]["op=get"]
+    assert sample["count"] == 3
+    assert sample["buckets"] == {0.1: 1, 1.0: 2}
+
+    text = registry.render_prometheus()
+    assert 'xhs_test_seconds_bucket{op="get",le="+Inf"} 3' in text
+    assert 'xhs_test_seconds_count{op="get"} 3' in text
+
+
+def test_http_endpoint():
+    """测试 Prometheus 文本端点"""
+    registry = MetricsRegistry()
+    registry.counter("xhs_test_requests_total", "请求次数").inc(3)
+
+    port = registry.start_http_server(port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+        logger.info(f"端点输出:\n{body}")
+        assert "# TYPE xhs_test_requests_total counter" in body
+        assert "xhs_test_requests_total 3" in body
+    finally:
+        registry.stop_http_server()
+
+
+if __name__ == "__main__":
+    test_counter_and_snapshot()
+    test_histogram_buckets()
+    test_http_endpoint()
+    logger.info("指标模块测试完成")
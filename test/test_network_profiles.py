@@ -0,0 +1,79 @@
+"""网络配置测试脚本（使用桩 WebDriver，不需要 Chrome）"""
+import json
+
+from core.browser_manager import BrowserManager
+from core.config import config
+from core.logger import logger
+from core.metrics import metrics
+from core.page_scripts import PageScripts
+
+
+def _log(method, **params):
+    """构造一条性能日志"""
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class FakeDriver:
+    """记录 CDP 命令；性能日志按 pending 中预先排好的批次返回，pageStats 返回固定统计"""
+
+    def __init__(self):
+        self.cdp = []
+        self.pending = []
+
+    def execute_script(self, script, *args):
+        return {"load_ms": 850.0}
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+        return {}
+
+    def get_log(self, log_type):
+        return self.pending.pop(0) if self.pending else []
+
+
+def test_profile_scope_restores_and_protects_comment_api():
+    """测试临时切换网络配置：忽略会屏蔽评论接口的规则，退出时恢复并按配置记录传输字节数"""
+    driver = FakeDriver()
+    browser = BrowserManager.__new__(BrowserManager)
+    browser.driver = driver
+    browser.page_epoch = browser.layout_epoch = 0
+    browser.network_profile = "default"
+    browser.page_scripts = PageScripts(browser)
+    browser._network_log_backlog = []
+
+    # 切换前读出的日志计入 default；期间完成的请求计入 test_only（跨域资源同样有 encodedDataLength）
+    comment = _log("Network.responseReceived", requestId="c1", response={"url": "https://edith.xiaohongshu.com/x"})
+    driver.pending = [
+        [_log("Network.loadingFinished", requestId="a", encodedDataLength=1000)],
+        [comment, _log("Network.loadingFinished", requestId="b", encodedDataLength=3000),
+         _log("Network.loadingFinished", requestId="c", encodedDataLength=1096)],
+    ]
+    config.browser.network_profiles["test_only"] = ["*.png*", "*api/sns/web/v2/comment*"]
+    default_before = metrics.snapshot()["xhs_page_transfer_bytes_total"].get("profile=default", 0)
+    bytes_before = metrics.snapshot()["xhs_page_transfer_bytes_total"].get("profile=test_only", 0)
+    try:
+        with browser.network_profile_scope("test_only"):
+            assert browser.network_profile == "test_only"
+    finally:
+        del config.browser.network_profiles["test_only"]
+
+    blocked = [params["urls"] for cmd, params in driver.cdp if cmd == "Network.setBlockedURLs"]
+    logger.info(f"屏蔽规则: {blocked}")
+    assert blocked == [["*.png*"], []]
+    assert browser.network_profile == "default"
+    assert metrics.snapshot()["xhs_page_transfer_bytes_total"]["profile=test_only"] == bytes_before + 4096
+    assert metrics.snapshot()["xhs_page_transfer_bytes_total"]["profile=default"] == default_before + 1000
+    # 为统计提前读出的日志仍交给 get_network_logs 的调用方
+    driver.pending = [[_log("Network.loadingFinished", requestId="d", encodedDataLength=10)]]
+    logs = browser.get_network_logs()
+    assert len(logs) == 5 and comment in logs and browser._network_log_backlog == []
+
+    # 默认的 read_only 配置不会屏蔽评论接口
+    driver.cdp.clear()
+    browser.set_network_profile("read_only")
+    assert driver.cdp[-1][1]["urls"] == config.browser.network_profiles["read_only"]
+
+
+if __name__ == "__main__":
+    test_profile_scope_restores_and_protects_comment_api()
+    logger.info("网络配置测试完成")
@@ -0,0 +1,139 @@
+"""笔记目录测试脚本（使用临时数据库和桩浏览器，不需要 Chrome）"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+from business.note_manager import NoteManager
+from core.config import config
+from core.logger import logger
+from core.metrics import metrics
+from core.note_catalog import NoteCatalog, note_list_user_id, parse_note_list
+
+USER_ID = "5f0000000000000000000001"
+
+
+def _note_list_body(*notes, has_more=True):
+    """构造笔记列表接口（user_posted）的响应体"""
+    return json.dumps({"code": 0, "data": {"cursor": "c1", "has_more": has_more, "notes": [
+        {"note_id": note_id, "display_title": title, "xsec_token": f"tok-{note_id[-2:]}", "type": "normal",
+         "user": {"user_id": USER_ID}}
+        for note_id, title in notes
+    ]}}, ensure_ascii=False)
+
+
+def test_catalog_search():
+    """测试中文子串查找、短关键词、增量更新标题与删除"""
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = NoteCatalog(os.path.join(tmp, "notes.db"))
+        notes, has_more = parse_note_list(_note_list_body(
+            ("650000000000000000000001", "周末在家做的番茄牛腩"),
+            ("660000000000000000000002", "番茄炒蛋的三个小技巧"),
+        ))
+        assert has_more and len(notes) == 2
+        assert catalog.upsert(notes) == 2
+        assert catalog.upsert(notes[:1]) == 0
+
+        found = catalog.search("番茄", user_id=USER_ID)
+        logger.info(f"查找结果: {found}")
+        # 新笔记（note_id 时间戳更大）在前，url 带 xsec_token
+        assert [n["note_id"] for n in found] == ["660000000000000000000002", "650000000000000000000001"]
+        assert found[0]["url"].endswith("/explore/660000000000000000000002?xsec_token=tok-02&xsec_source=pc_user")
+        assert [n["title"] for n in catalog.search("三个小技巧")] == ["番茄炒蛋的三个小技巧"]
+        assert catalog.search("番茄", user_id="someone-else") == []
+        assert catalog.search("100%") == []
+
+        # 标题修改后全文索引同步更新
+        notes[0]["title"] = "周末在家做的土豆牛腩"
+        catalog.upsert(notes[:1])
+        assert catalog.search("番茄牛腩") == []
+        assert len(catalog.search("土豆牛腩")) == 1
+
+        catalog.remove("660000000000000000000002")
+        assert catalog.count(USER_ID) == 1
+        assert note_list_user_id(f"https://edith.xiaohongshu.com/api/sns/web/v1/user_posted?num=30&user_id={USER_ID}") == USER_ID
+
+
+class FakeBrowser:
+    """记录导航及导航时的网络配置；个人主页上捕获到一页笔记列表接口响应"""
+
+    def __init__(self, body):
+        self.body = body
+        self.visited = []
+        self.profiles = []
+        self.scripts = []
+        self.network_profile = "default"
+        self.logs = []
+
+    @contextmanager
+    def network_profile_scope(self, name):
+        previous, self.network_profile = self.network_profile, name
+        try:
+            yield
+        finally:
+            self.network_profile = previous
+
+    def navigate_to(self, url, description="页面"):
+        self.visited.append(url)
+        self.profiles.append(self.network_profile)
+        if url == config.xhs.user_profile_url:
+            self.logs = [{"message": json.dumps({"message": {"method": "Network.responseReceived", "params": {
+                "requestId": "r1",
+                "response": {"url": f"https://edith.xiaohongshu.com/api/sns/web/v1/user_posted?user_id={USER_ID}"},
+            }}})}]
+
+    def get_current_url(self):
+        return self.visited[-1]
+
+    @property
+    def page_scripts(self):
+        return self
+
+    def call(self, name, *args):
+        # 页面辅助函数 renderedNotes：个人主页上没有已渲染的笔记卡片
+        self.scripts.append(name)
+        return []
+
+    def get_network_logs(self):
+        logs, self.logs = self.logs, []
+        return logs
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {"body": self.body}
+
+
+def test_search_and_open_note_uses_catalog():
+    """测试目录未命中时从个人主页接口响应建目录，之后同样的查找直接打开笔记"""
+    original = config.xhs.note_catalog_path, config.xhs.user_profile_url
+    with tempfile.TemporaryDirectory() as tmp:
+        config.xhs.note_catalog_path = os.path.join(tmp, "notes.db")
+        config.xhs.user_profile_url = f"https://www.xiaohongshu.com/user/profile/{USER_ID}"
+        try:
+            browser = FakeBrowser(_note_list_body(("670000000000000000000003", "秋天的第一杯奶茶"), has_more=False))
+            manager = NoteManager(browser)
+            before = metrics.snapshot()["xhs_note_catalog_lookups_total"].get("result=hit", 0)
+
+            note = manager.search_and_open_note("第一杯奶茶")
+            assert note.note_id == "670000000000000000000003" and note.title == "秋天的第一杯奶茶"
+            assert browser.visited[0] == config.xhs.user_profile_url and len(browser.visited) == 2
+            # 笔记详情页在评论网络配置下打开，个人主页不切换
+            assert browser.profiles == ["default", config.browser.comment_network_profile]
+            assert browser.scripts == ["renderedNotes"]
+
+            browser.visited.clear()
+            assert manager.search_and_open_note("第一杯奶茶").note_id == "670000000000000000000003"
+            assert browser.visited == [NoteCatalog.note_url("670000000000000000000003", "tok-03")]
+            assert metrics.snapshot()["xhs_note_catalog_lookups_total"]["result=hit"] == before + 1
+
+            # 目录已完整收录且没有新笔记：只打开一次个人主页
+            browser.visited.clear()
+            assert manager.search_and_open_note("不存在的标题") is None
+            assert browser.visited == [config.xhs.user_profile_url]
+        finally:
+            config.xhs.note_catalog_path, config.xhs.user_profile_url = original
+
+
+if __name__ == "__main__":
+    test_catalog_search()
+    test_search_and_open_note_uses_catalog()
+    logger.info("笔记目录测试完成")
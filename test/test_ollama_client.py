@@ -0,0 +1,135 @@
+"""Ollama 客户端测试脚本（使用本地桩服务，不需要真实的 Ollama）"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.ai_client import AIClientFactory, OllamaClient
+from core.config import config
+from core.logger import logger
+from core.models import AIConfig
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """模拟 Ollama 的 /api/chat 与 /api/tags"""
+
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send_json({"models": [{"name": "stub-model"}]})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append((self.client_address[1], payload))
+
+        if not payload["messages"]:
+            self._send_json({"model": payload["model"], "done": True, "done_reason": "load"})
+            return
+
+        words = ["你好", "，", "我是", "本地模型"]
+        if not payload["stream"]:
+            self._send_json({
+                "message": {"role": "assistant", "content": "".join(words)},
+                "done": True, "prompt_eval_count": 5, "eval_count": len(words),
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        lines = [{"message": {"content": w}, "done": False} for w in words]
+        lines.append({"message": {"content": ""}, "done": True, "eval_count": len(words)})
+        for line in lines:
+            data = (json.dumps(line) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def _start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_warm_up_chat_and_keep_alive():
+    """测试构造时预热、原生 chat 接口以及连接复用"""
+    StubOllamaHandler.requests_seen = []
+    server = _start_stub()
+    try:
+        client = OllamaClient(host=f"http://127.0.0.1:{server.server_port}", model="stub-model", keep_alive="1h")
+        assert client.is_available()
+
+        warm_up = StubOllamaHandler.requests_seen[0][1]
+        assert warm_up["messages"] == [] and warm_up["keep_alive"] == "1h"
+
+        reply = client.generate_text("你是谁", system_prompt="你是本地模型")
+        assert reply == "你好，我是本地模型"
+
+        request = StubOllamaHandler.requests_seen[1][1]
+        assert [m["role"] for m in request["messages"]] == ["system", "user"]
+        assert request["keep_alive"] == "1h"
+        assert request["options"]["num_predict"] == client.max_tokens
+
+        # 持久会话：预热和正式请求走同一个 TCP 连接
+        ports = {port for port, _ in StubOllamaHandler.requests_seen}
+        logger.info(f"请求数 {len(StubOllamaHandler.requests_seen)}，连接数 {len(ports)}")
+        assert len(ports) == 1
+        client.close()
+    finally:
+        server.shutdown()
+
+
+def test_stream_and_factory_registration():
+    """测试流式输出，以及通过工厂创建"""
+    server = _start_stub()
+    try:
+        assert "ollama" in AIClientFactory.list_clients()
+        client = AIClientFactory.create_client(
+            "ollama", cached=False, host=f"http://127.0.0.1:{server.server_port}", warm_up=False
+        )
+        deltas = list(client.generate_text_stream("你是谁"))
+        assert deltas == ["你好", "，", "我是", "本地模型"]
+        client.close()
+    finally:
+        server.shutdown()
+
+
+def test_ai_config_does_not_override_ollama_settings():
+    """测试传入 ai_config 时模型和生成参数仍来自 kwargs 或 Ollama 配置，而不是 OpenAI 兼容接口的设置"""
+    openai_settings = AIConfig(model="gpt-3.5-turbo", temperature=0.1, max_tokens=4096, timeout=999)
+    client = OllamaClient(ai_config=openai_settings, warm_up=False)
+    assert client.model == config.ai.ollama_model
+    assert (client.temperature, client.max_tokens, client.timeout) == \
+        (config.ai.temperature, config.ai.max_tokens, config.ai.timeout)
+    client.close()
+
+    client = OllamaClient(ai_config=openai_settings, model="stub-model", max_tokens=64, warm_up=False)
+    assert client.model == "stub-model" and client.max_tokens == 64
+    client.close()
+
+
+def test_unreachable_server():
+    """测试服务不可用时预热失败但不抛异常"""
+    client = OllamaClient(host="http://127.0.0.1:9", timeout=1)
+    assert not client.is_available()
+
+
+if __name__ == "__main__":
+    test_warm_up_chat_and_keep_alive()
+    test_stream_and_factory_registration()
+    test_ai_config_does_not_override_ollama_settings()
+    test_unreachable_server()
+    logger.info("Ollama 客户端测试完成")
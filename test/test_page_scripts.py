@@ -0,0 +1,50 @@
+"""页面辅助脚本测试脚本（使用桩浏览器，不需要 Chrome）"""
+from core.logger import logger
+from core.metrics import metrics
+from core.page_scripts import HELPERS_VERSION, PageScripts, _HELPERS_SCRIPT
+
+
+class FakeBrowser:
+    """模拟 execute_script：记录每次往返，注入脚本后当前文档才有辅助函数库"""
+
+    def __init__(self):
+        self.installed = False
+        self.calls = []
+
+    def navigate(self):
+        self.installed = False
+
+    def execute_script(self, script, *args):
+        self.calls.append(args[0])
+        if script.startswith(_HELPERS_SCRIPT):
+            self.installed = True
+        if not self.installed:
+            return "__xhs_helpers_missing__"
+        return {"helper": args[0], "args": list(args[1:]), "version": HELPERS_VERSION}
+
+
+def test_install_once_per_document():
+    """测试每个文档只注入一次，之后每次调用一个往返"""
+    browser = FakeBrowser()
+    scripts = PageScripts(browser)
+    installs_before = metrics.snapshot()["xhs_page_script_installs_total"].get("", 0)
+
+    result = scripts.call("scrollStep", None, 1200, 500)
+    assert result == {"helper": "scrollStep", "args": [None, 1200, 500], "version": HELPERS_VERSION}
+    assert len(browser.calls) == 2  # 发现未注入 + 注入并调用
+
+    scripts.call("scrollStep", None, 1200, 500)
+    scripts.call("findScrollContainer", None, "div.list-container")
+    assert len(browser.calls) == 4
+
+    # 导航到新文档后重新注入
+    browser.navigate()
+    scripts.call("scrollStep", None, 1200, 500)
+    assert len(browser.calls) == 6
+    logger.info(f"往返记录: {browser.calls}")
+    assert metrics.snapshot()["xhs_page_script_installs_total"][""] == installs_before + 2
+
+
+if __name__ == "__main__":
+    test_install_once_per_document()
+    logger.info("页面辅助脚本测试完成")
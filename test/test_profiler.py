@@ -0,0 +1,44 @@
+"""采样分析器测试脚本（使用临时输出文件）"""
+import os
+import tempfile
+import time
+
+from core.logger import logger
+from core.profiler import SamplingProfiler
+from core.tracing import tracer
+
+
+def busy_loop(seconds):
+    """占用 CPU 一段时间"""
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(1000))
+    return total
+
+
+def test_collapsed_stacks_tagged_with_span():
+    """测试折叠栈中出现被采样的函数，且以当时所在的 workflow span 作为根帧"""
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = SamplingProfiler(os.path.join(tmp, "profile.collapsed"), hz=200)
+        profiler.start()
+        try:
+            with tracer.span("TestWorkflow.busy", category="workflow"):
+                busy_loop(0.2)
+        finally:
+            path = profiler.stop()
+
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    logger.info(f"采样 {profiler.sample_count} 次，{len(lines)} 条调用栈")
+    assert profiler.sample_count > 0
+
+    tagged = [line for line in lines if line.startswith("[TestWorkflow.busy];") and "busy_loop (test_profiler.py)" in line]
+    assert tagged
+    stack, count = tagged[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+if __name__ == "__main__":
+    test_collapsed_stacks_tagged_with_span()
+    logger.info("采样分析器测试完成")
@@ -0,0 +1,96 @@
+"""重试策略与截止时间测试脚本"""
+import time
+
+from core.decorators import RetryPolicy, bounded_timeout, deadline, remaining_time
+from core.exceptions import DeadlineExceeded
+from core.logger import logger
+from core.metrics import metrics
+
+
+def test_retry_until_success():
+    """测试可重试异常会按策略重试直到成功"""
+    calls = []
+
+    @RetryPolicy(max_attempts=3, base_delay=0.01, jitter=0.0, retryable=(ConnectionError,), name="test.flaky")
+    def flaky():
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise ConnectionError("瞬时错误")
+        return "ok"
+
+    assert flaky() == "ok"
+    assert len(calls) == 3
+    attempts = metrics.snapshot()["xhs_retry_attempts_total"]
+    assert attempts["operation=test.flaky,outcome=retry"] == 2.0
+    assert attempts["operation=test.flaky,outcome=success"] == 1.0
+
+
+def test_fatal_error_not_retried():
+    """测试不可重试异常立即抛出"""
+    calls = []
+    policy = RetryPolicy(max_attempts=5, base_delay=0.01, fatal=(ValueError,))
+
+    def broken():
+        calls.append(1)
+        raise ValueError("参数错误")
+
+    try:
+        policy.call(broken)
+    except ValueError:
+        pass
+    assert len(calls) == 1
+
+
+def test_exponential_backoff():
+    """测试指数退避与上限"""
+    policy = RetryPolicy(base_delay=1.0, multiplier=2.0, max_delay=5.0, jitter=0.0)
+    assert [policy.compute_delay(n) for n in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+    jittered = RetryPolicy(base_delay=1.0, jitter=0.5).compute_delay(1)
+    assert 0.5 <= jittered <= 1.0
+
+
+def test_nested_deadline():
+    """测试嵌套截止时间取更早者，且会限制等待时间"""
+    assert remaining_time() is None
+    with deadline(10):
+        with deadline(60):
+            assert remaining_time() <= 10
+            assert bounded_timeout(30) <= 10
+    assert remaining_time() is None
+
+
+def test_deadline_stops_retry():
+    """测试剩余时间不足以等待退避时停止重试"""
+    calls = []
+    policy = RetryPolicy(max_attempts=10, base_delay=1.0, jitter=0.0, retryable=(ConnectionError,))
+
+    def always_fails():
+        calls.append(1)
+        raise ConnectionError("一直失败")
+
+    start = time.monotonic()
+    with deadline(0.2):
+        try:
+            policy.call(always_fails)
+        except ConnectionError:
+            pass
+    logger.info(f"截止时间内尝试 {len(calls)} 次，耗时 {time.monotonic() - start:.2f}s")
+    assert len(calls) == 1
+    assert time.monotonic() - start < 0.5
+
+    with deadline(0):
+        try:
+            bounded_timeout(5)
+            assert False, "预算耗尽时应抛出 DeadlineExceeded"
+        except DeadlineExceeded:
+            pass
+
+
+if __name__ == "__main__":
+    test_retry_until_success()
+    test_fatal_error_not_retried()
+    test_exponential_backoff()
+    test_nested_deadline()
+    test_deadline_stops_retry()
+    logger.info("重试策略测试完成")
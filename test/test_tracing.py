@@ -0,0 +1,64 @@
+"""链路追踪测试脚本（使用独立的追踪器实例）"""
+import json
+import os
+import tempfile
+import threading
+
+from core.logger import logger
+from core.tracing import Tracer, _NoopSpan, tracer
+
+
+def test_disabled_returns_noop():
+    """测试追踪关闭时 span() 返回共享的空 span，traced 直接调用原函数"""
+    local = Tracer()
+    span = local.span("noop", url="x")
+    assert isinstance(span, _NoopSpan)
+    with span as entered:
+        entered.set_attribute("k", "v")
+    assert local.get_events() == []
+    assert local.traced()(lambda x: x + 1)(1) == 2
+    if not os.environ.get("XHS_TRACE"):
+        assert isinstance(tracer.span("global"), _NoopSpan)
+
+
+def test_nested_spans_and_export():
+    """测试 span/traced 嵌套、CPU/墙钟属性以及导出的事件结构"""
+    local = Tracer()
+    local.start()
+
+    @local.traced(category="workflow")
+    def outer():
+        with local.span("inner", category="browser", selector="#a") as span:
+            span.set_attribute("tier", "memory")
+            sum(i * i for i in range(200000))
+
+    outer()
+    local.stop()
+
+    inner, outer_event = local.get_events()
+    assert inner["name"] == "inner" and outer_event["name"].endswith("outer")
+    assert inner["args"]["parent"] == outer_event["name"] and "parent" not in outer_event["args"]
+    assert inner["args"]["selector"] == "#a" and inner["args"]["tier"] == "memory"
+    assert inner["args"]["cpu_ms"] > 0 and inner["dur"] > 0
+    # 子 span 落在父 span 的时间范围内
+    assert outer_event["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer_event["ts"] + outer_event["dur"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = local.export_chrome_trace(os.path.join(tmp, "trace.json"))
+        with open(path, encoding="utf-8") as f:
+            trace = json.load(f)
+    events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    metadata = [e for e in trace["traceEvents"] if e["ph"] == "M"]
+    logger.info(f"导出事件: {events}")
+    assert {e["name"] for e in events} == {"inner", outer_event["name"]}
+    for event in events:
+        assert set(event) >= {"name", "cat", "ph", "ts", "dur", "pid", "tid", "args"}
+        assert event["tid"] == threading.get_ident() and event["pid"] == os.getpid()
+    assert metadata == [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": threading.get_ident(),
+                         "args": {"name": threading.current_thread().name}}]
+
+
+if __name__ == "__main__":
+    test_disabled_returns_noop()
+    test_nested_spans_and_export()
+    logger.info("链路追踪测试完成")